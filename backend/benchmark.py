@@ -0,0 +1,227 @@
+"""Offline scraper benchmark against recorded search pages.
+
+Starts a local fixture server, runs each scraper engine against it and
+appends one JSON record per invocation to the output file, so results can
+be compared across changes:
+
+    python benchmark.py --engines http selenium --num-jobs 75 --runs 3
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import resource
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+from fixture_server import FixtureServer
+from http_scraper import LinkedInHttpScraper
+from rate_limiter import AdaptiveRateLimiter
+from resource_blocking import BLOCK_PROFILES, PAGE_LOAD_STRATEGIES
+from scraper import LinkedInJobScraper, PAGINATION_MODES, SCRAPE_PAGE_PARALLELISM, create_chrome_driver
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("http", "selenium", "selenium-per-card")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class PeakRssSampler:
+    """Tracks the peak resident memory of this process and its children (Chrome, chromedriver)"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        process = psutil.Process()
+        while not self._stop.is_set():
+            total = 0
+            for proc in [process] + process.children(recursive=True):
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            self.peak_bytes = max(self.peak_bytes, total)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if PSUTIL_AVAILABLE:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+        else:
+            # ru_maxrss is in KB on Linux; children only count once they've exited
+            self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            self.peak_bytes = (self_kb + children_kb) * 1024
+
+    @property
+    def peak_mb(self):
+        return round(self.peak_bytes / (1024 * 1024), 1)
+
+
+def run_engine(engine, base_url, args):
+    """Run one engine args.runs times and summarize throughput and latency"""
+    page_seconds = []
+    page_bytes = []
+    run_seconds = []
+    jobs_scraped = 0
+    driver_startup = None
+    driver = None
+
+    with PeakRssSampler() as rss:
+        try:
+            if engine.startswith("selenium"):
+                started = time.monotonic()
+                driver = create_chrome_driver(
+                    page_load_strategy=args.page_load_strategy, block_profile=args.block_profile
+                )
+                driver_startup = time.monotonic() - started
+
+            # The fixture server doesn't need protecting, so measure the scrapers, not the rate limit
+            rate_limiter = AdaptiveRateLimiter(rate=1e6, max_rate=1e6, burst=1e6)
+            for run in range(args.runs):
+                if engine == "http":
+                    scraper = LinkedInHttpScraper(
+                        pacing="fast", page_parallelism=args.page_parallelism, base_url=base_url,
+                        rate_limiter=rate_limiter, pagination=args.pagination
+                    )
+                else:
+                    scraper = LinkedInJobScraper(
+                        driver=driver,
+                        extraction_mode="per_card" if engine == "selenium-per-card" else "bulk",
+                        pacing="fast",
+                        page_parallelism=args.page_parallelism,
+                        base_url=base_url,
+                        rate_limiter=rate_limiter,
+                        pagination=args.pagination
+                    )
+                jobs = scraper.scrape_jobs(args.query, args.location, args.num_jobs)
+                jobs_scraped += len(jobs)
+                run_seconds.append(scraper.run_stats["total_seconds"])
+                page_seconds.extend(scraper.run_stats["page_seconds"])
+                page_bytes.extend(scraper.run_stats["page_bytes"])
+                logger.info(f"{engine} run {run + 1}/{args.runs}: {len(jobs)} jobs in {run_seconds[-1]:.2f}s")
+        except Exception as e:
+            logger.error(f"{engine} benchmark failed: {e}")
+            return {"error": str(e)}
+        finally:
+            if driver:
+                driver.quit()
+
+    total_seconds = sum(run_seconds)
+    return {
+        "runs": args.runs,
+        "jobs": jobs_scraped,
+        "jobs_per_second": round(jobs_scraped / total_seconds, 2) if total_seconds else None,
+        "run_seconds": {
+            "mean": round(total_seconds / len(run_seconds), 4) if run_seconds else None,
+            "max": round(max(run_seconds), 4) if run_seconds else None,
+        },
+        "page_latency_seconds": {
+            "count": len(page_seconds),
+            "p50": percentile(page_seconds, 50),
+            "p90": percentile(page_seconds, 90),
+            "p99": percentile(page_seconds, 99),
+            "max": max(page_seconds) if page_seconds else None,
+        },
+        "page_bytes": {
+            "mean": round(sum(page_bytes) / len(page_bytes)) if page_bytes else None,
+            "total": sum(page_bytes),
+        },
+        "driver_startup_seconds": round(driver_startup, 3) if driver_startup is not None else None,
+        "peak_rss_mb": rss.peak_mb,
+    }
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper engines against recorded search pages")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=["http"])
+    parser.add_argument("--query", default="python developer")
+    parser.add_argument("--location", default="Remote")
+    parser.add_argument("--num-jobs", type=int, default=75)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--page-parallelism", type=int, default=SCRAPE_PAGE_PARALLELISM)
+    parser.add_argument("--block-profile", choices=list(BLOCK_PROFILES), default=None,
+                        help="Network blocking profile for the selenium engines (default: SCRAPE_BLOCK_PROFILE)")
+    parser.add_argument("--page-load-strategy", choices=PAGE_LOAD_STRATEGIES, default=None,
+                        help="Chrome page load strategy for the selenium engines (default: SCRAPE_PAGE_LOAD_STRATEGY)")
+    parser.add_argument("--pagination", choices=PAGINATION_MODES, default=None,
+                        help="How pages after the first are fetched (default: SCRAPE_PAGINATION)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds of delay the fixture server adds to every response")
+    parser.add_argument("--output", default="benchmark_results.jsonl",
+                        help="JSON Lines file that each benchmark run is appended to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Per-card and per-URL log lines would dominate the timings
+    logging.getLogger("scraper").setLevel(logging.WARNING)
+    logging.getLogger("http_scraper").setLevel(logging.WARNING)
+
+    results = {}
+    with FixtureServer(latency=args.latency) as fixture_server:
+        for engine in args.engines:
+            results[engine] = run_engine(engine, fixture_server.base_url, args)
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": git_commit(),
+        "config": {
+            "query": args.query,
+            "location": args.location,
+            "num_jobs": args.num_jobs,
+            "runs": args.runs,
+            "page_parallelism": args.page_parallelism,
+            "block_profile": args.block_profile,
+            "page_load_strategy": args.page_load_strategy,
+            "pagination": args.pagination,
+            "latency": args.latency,
+        },
+        "engines": results,
+    }
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(json.dumps(record, indent=2))
+    print(f"Appended results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import threading
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+    logging.warning("psutil not available. Browser memory limits and orphan reaping are disabled.")
+
+logger = logging.getLogger(__name__)
+
+# A pooled browser is recycled once it reaches any of these limits
+DRIVER_MAX_PAGE_LOADS = int(os.environ.get("DRIVER_MAX_PAGE_LOADS", "200"))
+DRIVER_MAX_RSS_MB = float(os.environ.get("DRIVER_MAX_RSS_MB", "1024"))
+DRIVER_MAX_AGE = float(os.environ.get("DRIVER_MAX_AGE", "1800"))
+# Seconds between checks of idle browsers and orphaned processes
+BROWSER_REAP_INTERVAL = float(os.environ.get("BROWSER_REAP_INTERVAL", "60"))
+# Each server process records the browser processes it started here, so a
+# later run can find and kill the ones it left behind
+BROWSER_REGISTRY_DIR = os.environ.get(
+    "BROWSER_REGISTRY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".browsers")
+)
+
+
+def _process(pid, create_time=None):
+    """psutil.Process for pid, or None if it's gone or the pid was reused"""
+    try:
+        process = psutil.Process(pid)
+        if create_time is not None and abs(process.create_time() - create_time) > 0.01:
+            return None
+        return process
+    except psutil.Error:
+        return None
+
+
+def browser_process_ids(driver):
+    """PIDs of a Chrome session's chromedriver and the browser it launched"""
+    if not PSUTIL_AVAILABLE:
+        return []
+    try:
+        service_pid = driver.service.process.pid
+    except AttributeError:
+        return []
+    process = _process(service_pid)
+    if process is None:
+        return []
+    try:
+        return [service_pid] + [child.pid for child in process.children()]
+    except psutil.Error:
+        return [service_pid]
+
+
+def process_tree_rss(pids):
+    """Combined resident memory, in bytes, of the processes and all their descendants.
+
+    Shared pages are counted once per process, so this overestimates
+    somewhat; it's meant for thresholds, not accounting.
+    """
+    if not PSUTIL_AVAILABLE:
+        return None
+    seen = set()
+    total = 0
+    for pid in pids:
+        process = _process(pid)
+        if process is None:
+            continue
+        try:
+            tree = [process] + process.children(recursive=True)
+        except psutil.Error:
+            tree = [process]
+        for proc in tree:
+            if proc.pid in seen:
+                continue
+            seen.add(proc.pid)
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+    return total
+
+
+def kill_process_tree(pids, create_times=None):
+    """Kill the processes and their descendants; returns how many were killed"""
+    if not PSUTIL_AVAILABLE:
+        return 0
+    create_times = create_times or {}
+    victims = {}
+    for pid in pids:
+        process = _process(pid, create_times.get(pid))
+        if process is None:
+            continue
+        try:
+            for proc in [process] + process.children(recursive=True):
+                victims[proc.pid] = proc
+        except psutil.Error:
+            victims[process.pid] = process
+    for proc in victims.values():
+        try:
+            proc.kill()
+        except psutil.Error:
+            pass
+    psutil.wait_procs(list(victims.values()), timeout=5)
+    return len(victims)
+
+
+class ProcessRegistry:
+    """Browser, chromedriver and Xvfb processes started by this server process.
+
+    Kept in <registry dir>/<pid>.json with each process's start time, so a
+    reused PID is never mistaken for one of ours.
+    """
+
+    def __init__(self, directory=BROWSER_REGISTRY_DIR):
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.json")
+        self._processes = {}
+        self._lock = threading.Lock()
+
+    def _write(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            owner = psutil.Process()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "owner": {"pid": owner.pid, "create_time": owner.create_time()},
+                    "processes": [
+                        {"pid": pid, "create_time": create_time}
+                        for pid, create_time in self._processes.items()
+                    ],
+                }, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write browser registry {self.path}: {e}")
+
+    def register(self, pids):
+        if not PSUTIL_AVAILABLE or not pids:
+            return
+        with self._lock:
+            for pid in pids:
+                process = _process(pid)
+                if process is not None:
+                    self._processes[pid] = process.create_time()
+            self._write()
+
+    def unregister(self, pids):
+        if not PSUTIL_AVAILABLE or not pids:
+            return
+        with self._lock:
+            for pid in pids:
+                self._processes.pop(pid, None)
+            self._write()
+
+    def create_times(self, pids):
+        with self._lock:
+            return {pid: self._processes[pid] for pid in pids if pid in self._processes}
+
+    def close(self):
+        with self._lock:
+            self._processes.clear()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def reap_orphans(directory=BROWSER_REGISTRY_DIR):
+    """Kill processes registered by server processes that are no longer running.
+
+    Returns the number of processes killed.
+    """
+    if not PSUTIL_AVAILABLE or not os.path.isdir(directory):
+        return 0
+    killed = 0
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        owner = record.get("owner", {})
+        if _process(owner.get("pid", -1), owner.get("create_time")) is not None:
+            continue  # Still running: its browsers aren't orphans
+        processes = record.get("processes", [])
+        count = kill_process_tree(
+            [p["pid"] for p in processes], {p["pid"]: p["create_time"] for p in processes}
+        )
+        if count:
+            logger.warning(f"Killed {count} orphaned browser processes left by server process {owner.get('pid')}")
+        killed += count
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return killed
@@ -0,0 +1,204 @@
+"""Scrape a file of searches with a pool of workers, streaming jobs to disk.
+
+Each job is written to the NDJSON, CSV or Parquet output as soon as it's
+scraped, and every finished search is recorded in a checkpoint file, so an
+interrupted run picks up where it stopped when started again:
+
+    python bulk_scrape.py searches.txt --output jobs.ndjson --workers 4
+
+A .txt input has one "query<TAB>location" per line (location optional);
+a .jsonl input has one {"query", "location", "num_jobs"} object per line.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from driver_pool import DriverPool
+from engines import SCRAPE_ENGINE, create_engines
+from exporters import EXPORT_FORMATS, detect_format, open_exporter
+from rate_limiter import CircuitOpen
+from result_cache import normalize_search
+from scraper import ScrapeCancelled
+
+logger = logging.getLogger(__name__)
+
+
+def read_searches(path, default_num_jobs):
+    """Searches from a .jsonl file or a tab-separated text file, in order, without duplicates"""
+    searches = {}
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith((".jsonl", ".ndjson")):
+                try:
+                    entry = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON: {e}")
+                query, location = entry.get("query"), entry.get("location")
+                num_jobs = int(entry.get("num_jobs") or default_num_jobs)
+            else:
+                query, _, location = line.partition("\t")
+                num_jobs = default_num_jobs
+            if not (query or "").strip():
+                raise ValueError(f"{path}:{line_number}: missing query")
+            search = {"query": query.strip(), "location": (location or "").strip() or None, "num_jobs": num_jobs}
+            searches.setdefault(normalize_search(search["query"], search["location"]), search)
+    return searches
+
+
+class Checkpoint:
+    """Append-only log of finished searches.
+
+    A search is only recorded after the exporter has flushed its jobs, so
+    everything listed here is safely in the output.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Cut short by an interrupted run
+                    self.completed.add(normalize_search(entry["query"], entry["location"]))
+        self._file = open(path, "a", encoding="utf-8")
+
+    def mark_completed(self, results):
+        """Record (search, jobs_written) pairs as finished"""
+        for search, jobs_written in results:
+            self._file.write(json.dumps({
+                "query": search["query"],
+                "location": search["location"],
+                "jobs": jobs_written,
+                "completed_at": datetime.now().isoformat(),
+            }) + "\n")
+            self.completed.add(normalize_search(search["query"], search["location"]))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("searches", help="File of searches (.txt or .jsonl)")
+    parser.add_argument("--output", "-o", required=True,
+                        help="Output file (.ndjson, .csv) or directory (.parquet); appended to if it exists")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Output format (default: from the output's extension)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--engine", choices=("selenium", "http", "auto"), default=SCRAPE_ENGINE)
+    parser.add_argument("--workers", type=int, default=4, help="Searches scraped at once")
+    parser.add_argument("--num-jobs", type=int, default=25, help="Jobs per search, unless the input says otherwise")
+    parser.add_argument("--checkpoint-every", type=int,
+                        help="Finished searches per flush and checkpoint (default: 1, or 50 for Parquet, "
+                             "where each flush writes a part file)")
+    args = parser.parse_args()
+
+    export_format = args.format or detect_format(args.output)
+    checkpoint_every = args.checkpoint_every or (50 if export_format == "parquet" else 1)
+
+    searches = read_searches(args.searches, args.num_jobs)
+    checkpoint = Checkpoint(args.checkpoint or args.output.rstrip("/") + ".checkpoint")
+    pending = [search for key, search in searches.items() if key not in checkpoint.completed]
+    logger.info(f"{len(searches)} searches, {len(searches) - len(pending)} already done, {len(pending)} to scrape")
+
+    exporter = open_exporter(args.output, export_format)
+    # Jobs an interrupted run already wrote for searches it didn't finish,
+    # so resuming doesn't write them twice
+    written = {}
+    if pending:
+        pending_keys = {normalize_search(search["query"], search["location"]) for search in pending}
+        for record in exporter.existing_records():
+            key = normalize_search(record.get("query"), record.get("searchLocation"))
+            if key in pending_keys:
+                written.setdefault(key, set()).add(record.get("id"))
+
+    driver_pool = DriverPool(min_size=0, max_size=max(1, args.workers))
+    if args.engine != "http":
+        driver_pool.start()
+    engine = create_engines(driver_pool)[args.engine]
+
+    write_lock = threading.Lock()
+    cancel_event = threading.Event()
+    uncommitted = []
+    failed = 0
+    started = time.monotonic()
+
+    def scrape(search):
+        job_ids = written.setdefault(normalize_search(search["query"], search["location"]), set())
+
+        def on_job(job):
+            with write_lock:
+                if job["id"] in job_ids:
+                    return
+                job_ids.add(job["id"])
+                exporter.write({**job, "query": search["query"], "searchLocation": search["location"]})
+
+        while True:
+            try:
+                engine.scrape_jobs(search["query"], search["location"], search["num_jobs"],
+                                   on_job=on_job, cancel_event=cancel_event)
+                return len(job_ids)
+            except CircuitOpen as e:
+                # Every worker shares the rate limiter, so wait out the pause rather than fail the rest of the file
+                logger.warning(f"{e}; {search['query']!r} will be retried")
+                if cancel_event.wait(e.retry_after):
+                    raise ScrapeCancelled()
+
+    def commit():
+        exporter.flush()
+        checkpoint.mark_completed(uncommitted)
+        uncommitted.clear()
+
+    executor = ThreadPoolExecutor(max_workers=max(1, args.workers), thread_name_prefix="bulk-scrape")
+    try:
+        futures = {executor.submit(scrape, search): search for search in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            search = futures[future]
+            try:
+                jobs_written = future.result()
+            except ScrapeCancelled:
+                continue
+            except Exception as e:
+                # Left out of the checkpoint, so the next run retries it
+                failed += 1
+                logger.error(f"[{done}/{len(pending)}] {search['query']!r} in {search['location']!r} failed: {e}")
+                continue
+            logger.info(f"[{done}/{len(pending)}] {search['query']!r} in {search['location']!r}: {jobs_written} jobs")
+            with write_lock:
+                uncommitted.append((search, jobs_written))
+                if len(uncommitted) >= checkpoint_every:
+                    commit()
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; stopping running searches and saving progress")
+        cancel_event.set()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        with write_lock:
+            commit()
+        exporter.close()
+        checkpoint.close()
+        driver_pool.close()
+
+    remaining = len(searches) - len(checkpoint.completed & set(searches))
+    logger.info(
+        f"Wrote {exporter.records_written} jobs to {args.output} in {time.monotonic() - started:.1f}s; "
+        f"{failed} searches failed, {remaining} left to scrape"
+    )
+    return 0 if remaining == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
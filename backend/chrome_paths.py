@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Where the resolved Chrome and ChromeDriver paths are remembered between runs
+CHROME_PATHS_CACHE = os.environ.get(
+    "CHROME_PATHS_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".chrome_paths.json")
+)
+
+CHROME_BINARIES = [
+    '/usr/bin/chromium-browser',
+    '/usr/bin/chromium',
+    '/usr/bin/google-chrome-stable',
+    '/usr/bin/google-chrome',
+    '/snap/bin/chromium',
+    '/usr/bin/chrome',
+    '/usr/bin/chromium-browser-stable',
+]
+CHROME_NAMES = ["chromium-browser", "chromium", "google-chrome-stable", "google-chrome"]
+CHROMEDRIVER_PATHS = [
+    '/usr/bin/chromedriver',
+    '/usr/bin/chromium-chromedriver',
+    '/usr/local/bin/chromedriver',
+]
+# Where each executable is looked for: fixed paths, then names on PATH
+SEARCH_LOCATIONS = {
+    "chrome_binary": (CHROME_BINARIES, CHROME_NAMES),
+    "chromedriver": (CHROMEDRIVER_PATHS, ["chromedriver"]),
+}
+
+_resolved = None
+_lock = threading.Lock()
+
+
+def _find_executable(paths, names):
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    for name in names:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def _executable_version(path):
+    try:
+        result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except Exception as e:
+        logger.warning(f"Could not get version of {path}: {e}")
+        return None
+
+
+def _file_signature(path):
+    """Size and mtime, so an upgraded binary invalidates the cache"""
+    try:
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime]
+    except OSError:
+        return None
+
+
+def _major_version(version):
+    for word in (version or "").split():
+        if word[:1].isdigit():
+            return word.split(".")[0]
+    return None
+
+
+def _discover():
+    chrome_binary = _find_executable(*SEARCH_LOCATIONS["chrome_binary"])
+    if chrome_binary:
+        logger.info(f"Found Chrome/Chromium at: {chrome_binary}")
+    else:
+        logger.warning("No Chrome/Chromium binary found in standard locations")
+
+    chromedriver = _find_executable(*SEARCH_LOCATIONS["chromedriver"])
+    if chromedriver:
+        logger.info(f"Found system ChromeDriver at: {chromedriver}")
+    else:
+        # Downloads a driver, so only done when nothing is installed and the cache is cold
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            logger.info("No system ChromeDriver found, trying webdriver-manager...")
+            chromedriver = ChromeDriverManager().install()
+        except Exception as e:
+            logger.warning(f"WebDriver-manager failed: {e}")
+
+    paths = {
+        "chrome_binary": chrome_binary,
+        "chrome_version": _executable_version(chrome_binary) if chrome_binary else None,
+        "chrome_binary_signature": _file_signature(chrome_binary) if chrome_binary else None,
+        "chromedriver": chromedriver,
+        "chromedriver_version": _executable_version(chromedriver) if chromedriver else None,
+        "chromedriver_signature": _file_signature(chromedriver) if chromedriver else None,
+        "resolved_at": time.time(),
+    }
+    chrome_major = _major_version(paths["chrome_version"])
+    driver_major = _major_version(paths["chromedriver_version"])
+    if chrome_major and driver_major and chrome_major != driver_major:
+        logger.warning(
+            f"ChromeDriver {paths['chromedriver_version']} does not match {paths['chrome_version']}"
+        )
+    return paths
+
+
+def _load_cached():
+    """Cached paths if each executable is unchanged, or still in none of the places it's looked for; else None.
+
+    Remembering that nothing was found keeps hosts that only use the HTTP
+    engine from searching (and trying webdriver-manager) on every start.
+    """
+    try:
+        with open(CHROME_PATHS_CACHE, encoding="utf-8") as f:
+            paths = json.load(f)
+    except (OSError, ValueError):
+        return None
+    for key, (locations, names) in SEARCH_LOCATIONS.items():
+        path = paths.get(key)
+        if path:
+            if _file_signature(path) != paths.get(f"{key}_signature"):
+                return None
+        elif _find_executable(locations, names):
+            # Installed since the cache was written
+            return None
+    return paths
+
+
+def _save(paths):
+    try:
+        with open(CHROME_PATHS_CACHE, "w", encoding="utf-8") as f:
+            json.dump(paths, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not write {CHROME_PATHS_CACHE}: {e}")
+
+
+def resolve_chrome_paths(refresh=False):
+    """Chrome binary and ChromeDriver paths and versions.
+
+    Resolved once per process and cached on disk, so later starts skip the
+    filesystem search, the --version calls and any webdriver-manager
+    download. refresh=True ignores both caches.
+    """
+    global _resolved
+    with _lock:
+        if _resolved is not None and not refresh:
+            return _resolved
+        paths = None if refresh else _load_cached()
+        if paths is None:
+            paths = _discover()
+            _save(paths)
+        else:
+            logger.info(f"Using cached Chrome paths from {CHROME_PATHS_CACHE}")
+        _resolved = paths
+        return paths
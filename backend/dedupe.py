@@ -0,0 +1,295 @@
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("numpy not available. Near-duplicate job detection is disabled.")
+
+from file_locks import try_lock
+from metrics import DEDUPE_BATCH_SECONDS, JOBS_CLUSTERED
+from scraper import CARD_DESCRIPTION, parse_job_id
+
+logger = logging.getLogger(__name__)
+
+# Estimated similarity above which two postings are treated as the same role
+DEDUPE_THRESHOLD = float(os.environ.get("DEDUPE_THRESHOLD", "0.8"))
+# Stored jobs clustered per batch when catching up on jobs stored before
+# clustering existed
+DEDUPE_BACKFILL_BATCH = int(os.environ.get("DEDUPE_BACKFILL_BATCH", "2000"))
+
+MINHASH_PERMUTATIONS = 64
+# 16 bands of 4 rows: a pair 80% similar shares at least one band 99.9% of
+# the time, one 50% similar only 64% of the time
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+# Only the most recent jobs in a bucket are compared against; a bucket that
+# big is one role reposted many times, so any of them gives the cluster
+LSH_BUCKET_CANDIDATES = 20
+# Hashes are kept below 2**31 so a * x + b fits in 64 bits
+MERSENNE_PRIME = (1 << 31) - 1
+# Features hashed per chunk when signing, bounding the permutation matrix
+# to MINHASH_PERMUTATIONS * 32768 * 8 bytes = 16MB
+SIGNING_CHUNK_FEATURES = 32768
+DESCRIPTION_SHINGLE_WORDS = 5
+
+COMPANY_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+    "gmbh", "ag", "plc", "sa", "bv", "pty", "the",
+}
+TITLE_ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "eng": "engineer", "engr": "engineer",
+    "dev": "developer", "mgr": "manager", "swe": "software engineer", "ii": "2", "iii": "3",
+}
+# Work arrangement and gender markers recruiters add to otherwise identical titles
+TITLE_NOISE_PATTERN = re.compile(
+    r"\b(?:remote|hybrid|on ?site|in office|wfh|urgent|hiring|immediate start|m w d|f m d|w m d|h f)\b"
+)
+
+
+def normalize_text(text):
+    """Lowercase ASCII words separated by single spaces"""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def normalize_title(title):
+    words = TITLE_NOISE_PATTERN.sub(" ", normalize_text(title)).split()
+    return " ".join(TITLE_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def normalize_company(company):
+    return " ".join(word for word in normalize_text(company).split() if word not in COMPANY_SUFFIXES)
+
+
+def has_description(job):
+    description = job.get("description")
+    return bool(description) and description != CARD_DESCRIPTION
+
+
+def job_features(job):
+    """The set of features MinHash compares two postings on.
+
+    Character 4-grams of the title, the company repeated so it weighs as
+    much as the title (the same title at another company isn't a duplicate),
+    and word shingles of the description once the job has been enriched.
+    Location is left out, so a role reposted for several cities clusters.
+    """
+    title = f" {normalize_title(job['title'])} "
+    features = {"t:" + title[i:i + 4] for i in range(max(1, len(title) - 3))}
+    company = normalize_company(job["company"])
+    if company:
+        features.update(f"c{i}:{company}" for i in range(len(features)))
+    if has_description(job):
+        words = normalize_text(job["description"]).split()
+        features.update(
+            "d:" + " ".join(words[i:i + DESCRIPTION_SHINGLE_WORDS])
+            for i in range(max(1, len(words) - DESCRIPTION_SHINGLE_WORDS + 1))
+        )
+    return features
+
+
+if NUMPY_AVAILABLE:
+    # Fixed seed, so signatures stored by one run compare with the next
+    _random = np.random.RandomState(20240601)
+    _PERMUTATION_A = _random.randint(1, MERSENNE_PRIME, MINHASH_PERMUTATIONS).astype(np.uint64)
+    _PERMUTATION_B = _random.randint(0, MERSENNE_PRIME, MINHASH_PERMUTATIONS).astype(np.uint64)
+
+
+def minhash_signatures(feature_sets):
+    """MinHash signatures of many feature sets at once, as a (len(feature_sets), MINHASH_PERMUTATIONS) uint32 array"""
+    signatures = np.empty((len(feature_sets), MINHASH_PERMUTATIONS), dtype=np.uint32)
+    start = 0
+    while start < len(feature_sets):
+        # Sign as many sets as fit in one chunk, and always at least one
+        end, chunk_features = start + 1, len(feature_sets[start])
+        while end < len(feature_sets) and chunk_features + len(feature_sets[end]) <= SIGNING_CHUNK_FEATURES:
+            chunk_features += len(feature_sets[end])
+            end += 1
+        chunk = feature_sets[start:end]
+        # crc32 rather than hash(), which is salted per process
+        hashes = np.fromiter(
+            (zlib.crc32(feature.encode()) & MERSENNE_PRIME for features in chunk for feature in features),
+            dtype=np.uint64, count=chunk_features
+        )
+        permuted = (hashes[np.newaxis, :] * _PERMUTATION_A[:, np.newaxis] + _PERMUTATION_B[:, np.newaxis]) % MERSENNE_PRIME
+        offsets = np.cumsum([0] + [len(features) for features in chunk[:-1]])
+        signatures[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+    return signatures
+
+
+def lsh_buckets(signatures):
+    """One LSH bucket per band of each signature, as an (n, LSH_BANDS) int64 array.
+
+    Jobs whose signatures agree on every row of a band share that band's
+    bucket; the band number is mixed in so different bands never collide.
+    """
+    bands = signatures.reshape(len(signatures), LSH_BANDS, LSH_ROWS).astype(np.uint64)
+    buckets = np.arange(LSH_BANDS, dtype=np.uint64)[np.newaxis, :].repeat(len(signatures), axis=0)
+    for row in range(LSH_ROWS):
+        # Wraps around on overflow, which is fine for a hash
+        buckets = buckets * np.uint64(0x100000001B3) + bands[:, :, row]
+    return buckets.view(np.int64)
+
+
+def similarity(signature, others):
+    """Estimated Jaccard similarity between one signature and each row of others"""
+    return (others == signature).mean(axis=1)
+
+
+class JobDeduper:
+    """Gives every stored job a near-duplicate cluster ID.
+
+    A job joins the cluster of the most similar stored job above the
+    threshold, or starts its own cluster named after its job ID. Signatures
+    and LSH buckets are kept in the job store, so finding a job's matches is
+    a few indexed lookups however many jobs are stored, and only jobs that
+    share a bucket are compared.
+    """
+
+    def __init__(self, job_store, threshold=DEDUPE_THRESHOLD):
+        self.job_store = job_store
+        self.threshold = threshold
+        # Assignments are serialized so two batches can't each start a
+        # cluster for the same role
+        self._lock = threading.Lock()
+        self._backfill_thread = None
+        self._stop = threading.Event()
+
+    def assign_clusters(self, jobs):
+        """Cluster IDs keyed by job ID, clustering jobs that are new or have gained a description"""
+        if not NUMPY_AVAILABLE:
+            return {}
+        by_id = {}
+        for job in jobs:
+            job_id = parse_job_id(job["url"])
+            if job_id:
+                by_id[job_id] = job
+
+        with self._lock:
+            stored = self.job_store.get_clusters(by_id)
+            clusters = {job_id: entry["cluster_id"] for job_id, entry in stored.items()}
+            to_sign = [
+                job_id for job_id, job in by_id.items()
+                if job_id not in stored or (has_description(job) and not stored[job_id]["with_description"])
+            ]
+            if to_sign:
+                clusters.update(self._cluster(to_sign, [by_id[job_id] for job_id in to_sign], stored))
+        return clusters
+
+    def annotate(self, jobs):
+        """Set clusterId on each job dict in place; returns jobs"""
+        try:
+            clusters = self.assign_clusters(jobs)
+        except Exception as e:
+            logger.error(f"Failed to cluster jobs: {e}")
+            return jobs
+        for job in jobs:
+            job["clusterId"] = clusters.get(parse_job_id(job["url"]))
+        return jobs
+
+    def _cluster(self, job_ids, jobs, stored):
+        started = time.monotonic()
+        signatures = minhash_signatures([job_features(job) for job in jobs])
+        buckets = lsh_buckets(signatures)
+
+        bucket_members = self.job_store.get_lsh_candidates(np.unique(buckets).tolist(), LSH_BUCKET_CANDIDATES)
+        candidate_ids = {job_id for members in bucket_members.values() for job_id in members} - set(job_ids)
+        candidates = self.job_store.get_clusters(candidate_ids)
+
+        assigned = {}
+        entries = []
+        new_clusters = 0
+        # Earlier jobs in the batch are candidates for later ones
+        batch_members = {}
+        positions = {job_id: i for i, job_id in enumerate(job_ids)}
+        for i, job_id in enumerate(job_ids):
+            job_buckets = buckets[i].tolist()
+            matches = {
+                member for bucket in job_buckets for member in bucket_members.get(bucket, ())
+                if member in candidates
+            }
+            matches.update(member for bucket in job_buckets for member in batch_members.get(bucket, ()))
+            cluster_id = job_id
+            if matches:
+                matches = list(matches)
+                others = np.stack([
+                    signatures[positions[match]] if match in assigned
+                    else np.frombuffer(candidates[match]["signature"], dtype=np.uint32)
+                    for match in matches
+                ])
+                scores = similarity(signatures[i], others)
+                best = int(scores.argmax())
+                if scores[best] >= self.threshold:
+                    cluster_id = assigned.get(matches[best]) or candidates[matches[best]]["cluster_id"]
+            # A job that is already clustered keeps its cluster unless it now matches a different one
+            if cluster_id == job_id and job_id in stored:
+                cluster_id = stored[job_id]["cluster_id"]
+            assigned[job_id] = cluster_id
+            for bucket in job_buckets:
+                members = batch_members.setdefault(bucket, [])
+                members.append(job_id)
+                if len(members) > LSH_BUCKET_CANDIDATES:
+                    del members[0]
+            new_clusters += cluster_id == job_id
+            entries.append((job_id, cluster_id, signatures[i].tobytes(), has_description(jobs[i]), job_buckets))
+
+        # Re-signed jobs leave the buckets of their old signature
+        resigned = [job_id for job_id in job_ids if job_id in stored]
+        old_buckets = []
+        if resigned:
+            old_signatures = np.stack([np.frombuffer(stored[job_id]["signature"], dtype=np.uint32) for job_id in resigned])
+            old_buckets = [
+                (bucket, job_id) for job_id, row in zip(resigned, lsh_buckets(old_signatures).tolist()) for bucket in row
+            ]
+        self.job_store.save_clusters(entries, old_buckets)
+        JOBS_CLUSTERED.labels(outcome="new_cluster").inc(new_clusters)
+        JOBS_CLUSTERED.labels(outcome="joined_cluster").inc(len(job_ids) - new_clusters)
+        DEDUPE_BATCH_SECONDS.observe(time.monotonic() - started)
+        return assigned
+
+    def backfill(self, batch_size=DEDUPE_BACKFILL_BATCH):
+        """Cluster stored jobs that have no cluster yet, a batch at a time; returns how many were clustered"""
+        if not NUMPY_AVAILABLE:
+            return 0
+        clustered = 0
+        while not self._stop.is_set():
+            jobs = self.job_store.get_unclustered_jobs(batch_size)
+            if not jobs:
+                break
+            if not self.assign_clusters(jobs):
+                break
+            clustered += len(jobs)
+            logger.info(f"Clustered {clustered} previously stored jobs")
+        return clustered
+
+    def start_backfill(self):
+        """Run backfill() on a background thread"""
+        if not NUMPY_AVAILABLE or self._backfill_thread is not None:
+            return
+
+        def run():
+            # With several server workers on one job store, one of them does it
+            lock = try_lock(self.job_store.path + ".backfill.lock")
+            if lock is None:
+                return
+            try:
+                self.backfill()
+            except Exception as e:
+                logger.error(f"Clustering stored jobs failed: {e}")
+            finally:
+                lock.close()
+
+        self._backfill_thread = threading.Thread(target=run, name="dedupe-backfill", daemon=True)
+        self._backfill_thread.start()
+
+    def shutdown(self):
+        self._stop.set()
@@ -0,0 +1,428 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from browser_lifecycle import (
+    BROWSER_REAP_INTERVAL, DRIVER_MAX_AGE, DRIVER_MAX_PAGE_LOADS, DRIVER_MAX_RSS_MB,
+    ProcessRegistry, browser_process_ids, kill_process_tree, process_tree_rss, reap_orphans
+)
+from chrome_paths import resolve_chrome_paths
+from file_locks import default_browser_slots
+from metrics import DRIVERS_RECYCLED, ORPHANS_REAPED, observe_phase
+from resource_blocking import apply_block_profile
+from scraper import create_chrome_driver, start_virtual_display
+
+logger = logging.getLogger(__name__)
+
+DRIVER_POOL_MIN_SIZE = int(os.environ.get("DRIVER_POOL_MIN_SIZE", "1"))
+DRIVER_POOL_MAX_SIZE = int(os.environ.get("DRIVER_POOL_MAX_SIZE", "4"))
+DRIVER_POOL_ACQUIRE_TIMEOUT = float(os.environ.get("DRIVER_POOL_ACQUIRE_TIMEOUT", "30"))
+# How often a request waiting on other workers' browsers checks for a free slot
+BROWSER_SLOT_POLL_INTERVAL = 0.25
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no browser session becomes available in time"""
+
+
+class PooledDriver:
+    """A Chrome session owned by a DriverPool"""
+
+    def __init__(self, driver, pids=(), slot=None):
+        self.driver = driver
+        self.pids = list(pids)  # chromedriver and the browser it launched
+        self.slot = slot  # Machine-wide browser slot held while this browser runs
+        self.created_at = time.time()
+        self.uses = 0
+        self.page_loads = 0
+        self.rss_bytes = None  # As of the last check
+
+    @property
+    def age(self):
+        return time.time() - self.created_at
+
+    def info(self):
+        return {
+            "pids": self.pids,
+            "age_seconds": round(self.age, 1),
+            "uses": self.uses,
+            "page_loads": self.page_loads,
+            "rss_mb": round(self.rss_bytes / (1024 * 1024), 1) if self.rss_bytes is not None else None,
+        }
+
+
+class DriverPool:
+    """Bounded pool of pre-started Chrome sessions shared across requests.
+
+    Sessions are health-checked when leased and reset (extra tabs closed,
+    cookies cleared) when returned. Broken sessions are discarded and
+    replaced on demand, so the pool never holds more than max_size browsers.
+    Sessions past max_page_loads, max_rss_mb or max_age are recycled, and
+    browser processes left behind by earlier server runs are killed.
+    With browser_slots, every browser also needs one of a machine-wide set
+    of slots shared with the other server workers.
+    """
+
+    def __init__(self, min_size=DRIVER_POOL_MIN_SIZE, max_size=DRIVER_POOL_MAX_SIZE,
+                 acquire_timeout=DRIVER_POOL_ACQUIRE_TIMEOUT, driver_factory=create_chrome_driver,
+                 max_page_loads=DRIVER_MAX_PAGE_LOADS, max_rss_mb=DRIVER_MAX_RSS_MB, max_age=DRIVER_MAX_AGE,
+                 browser_slots=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.driver_factory = driver_factory
+        self.max_page_loads = max_page_loads
+        self.max_rss_mb = max_rss_mb
+        self.max_age = max_age
+        self.browser_slots = browser_slots if browser_slots is not None else default_browser_slots()
+        self.virtual_display = None
+        self.registry = ProcessRegistry()
+        self.recycled = {}
+        self.orphans_reaped = 0
+        self._idle = []
+        self._sessions = set()
+        self._leased = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stop_maintenance = threading.Event()
+        self.warmed_up = threading.Event()
+        self.warmup_error = None
+
+    def start(self):
+        """Start the shared virtual display and pre-start min_size browsers"""
+        logger.info(f"Starting driver pool (min={self.min_size}, max={self.max_size})")
+        self.reap_orphans()
+        threading.Thread(target=self._maintenance_loop, name="driver-pool-maintenance", daemon=True).start()
+        self.virtual_display = start_virtual_display()
+        if self.virtual_display is not None:
+            self.registry.register([self.virtual_display.pid])
+        if self.driver_factory is create_chrome_driver:
+            resolve_chrome_paths()
+        while True:
+            slot = None
+            with self._cond:
+                # Browsers acquire() started on demand meanwhile count too
+                if self._closed or self._size >= self.min_size:
+                    break
+                if self.browser_slots is not None:
+                    slot = self.browser_slots.try_acquire()
+                    if slot is None:
+                        logger.info("Every browser slot is taken by other workers; not warming up more browsers")
+                        break
+                self._size += 1
+            session = self._create(slot=slot)
+            with self._cond:
+                if not self._closed:
+                    self._idle.append(session)
+                    self._cond.notify()
+                    continue
+            # Closed while warming up
+            self._discard(session)
+            return
+        logger.info(f"Driver pool ready with {len(self._idle)} warm session(s)")
+
+    def start_in_background(self):
+        """Run start() on a daemon thread; warmed_up is set when it finishes, even on failure.
+
+        Requests can lease browsers meanwhile: one is started on demand if
+        none is warm yet.
+        """
+        def warm_up():
+            try:
+                self.start()
+            except Exception as e:
+                self.warmup_error = str(e)
+                logger.error(f"Driver pool warm-up failed: {e}")
+            finally:
+                self.warmed_up.set()
+
+        threading.Thread(target=warm_up, name="driver-pool-warmup", daemon=True).start()
+
+    def _create(self, slot=None):
+        """Start a browser the caller has already counted in _size; slot is its browser slot"""
+        try:
+            started = time.monotonic()
+            driver = self.driver_factory()
+            pids = browser_process_ids(driver)
+            self.registry.register(pids)
+            session = PooledDriver(driver, pids, slot)
+            observe_phase("selenium", "setup_driver", time.monotonic() - started)
+            with self._cond:
+                self._sessions.add(session)
+            return session
+        except Exception:
+            self._release_slot(slot)
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _release_slot(self, slot):
+        if slot is not None:
+            self.browser_slots.release(slot)
+
+    def _discard(self, session):
+        try:
+            session.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing pooled WebDriver: {e}")
+        # quit() can fail or leave Chrome behind when the session is broken
+        leftover = kill_process_tree(session.pids, self.registry.create_times(session.pids))
+        if leftover:
+            logger.warning(f"Killed {leftover} browser processes that outlived their session")
+        self.registry.unregister(session.pids)
+        self._release_slot(session.slot)
+        with self._cond:
+            self._sessions.discard(session)
+            self._size -= 1
+            self._cond.notify()
+
+    def _recycle_reason(self, session):
+        """Why the session should be replaced, or None"""
+        if self.max_page_loads and session.page_loads >= self.max_page_loads:
+            return "page_loads"
+        if self.max_age and session.age >= self.max_age:
+            return "age"
+        session.rss_bytes = process_tree_rss(session.pids)
+        if self.max_rss_mb and session.rss_bytes and session.rss_bytes >= self.max_rss_mb * 1024 * 1024:
+            return "memory"
+        return None
+
+    def _recycle(self, session, reason):
+        logger.info(f"Recycling pooled WebDriver ({reason}): {session.info()}")
+        with self._cond:
+            self.recycled[reason] = self.recycled.get(reason, 0) + 1
+        DRIVERS_RECYCLED.labels(reason=reason).inc()
+        self._discard(session)
+        self._replenish()
+
+    def _replenish(self):
+        """Start browsers in the background until min_size are running again"""
+        def create():
+            slot = None
+            if self.browser_slots is not None:
+                slot = self.browser_slots.try_acquire()
+                if slot is None:
+                    # Started on demand once a slot frees up
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    return
+            try:
+                session = self._create(slot=slot)
+            except Exception as e:
+                logger.warning(f"Could not replace recycled WebDriver: {e}")
+                return
+            with self._cond:
+                if not self._closed:
+                    self._idle.append(session)
+                    self._cond.notify()
+                    return
+            self._discard(session)
+
+        with self._cond:
+            missing = 0 if self._closed else max(0, self.min_size - self._size)
+            self._size += missing
+        for _ in range(missing):
+            threading.Thread(target=create, name="driver-pool-replenish", daemon=True).start()
+
+    def _is_healthy(self, session):
+        try:
+            session.driver.execute_script("return 1")
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled WebDriver failed health check: {e}")
+            return False
+
+    def _reset(self, session):
+        driver = session.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+        # A scraper may have switched to another blocking profile
+        apply_block_profile(driver)
+
+    def acquire(self, timeout=None):
+        """Lease a healthy session, starting a new browser if below max_size"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            create = False
+            slot = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    if self._idle:
+                        session = self._idle.pop()
+                        break
+                    remaining = deadline - time.monotonic()
+                    wait = remaining
+                    if self._size < self.max_size:
+                        if self.browser_slots is not None:
+                            slot = self.browser_slots.try_acquire()
+                        if self.browser_slots is None or slot is not None:
+                            # Counted now, so concurrent acquires can't all see room for one more
+                            self._size += 1
+                            create = True
+                            break
+                        # Other workers' browsers hold every slot, and they don't notify us
+                        wait = min(remaining, BROWSER_SLOT_POLL_INTERVAL)
+                    if remaining <= 0:
+                        raise DriverPoolTimeout(f"No browser available after {timeout:g} seconds")
+                    self._cond.wait(wait)
+
+            if create:
+                session = self._create(slot=slot)
+            elif not self._is_healthy(session):
+                self._discard(session)
+                continue
+
+            session.uses += 1
+            with self._cond:
+                self._leased[id(session.driver)] = session
+            return session
+
+    def release(self, session, broken=False):
+        """Return a leased session, resetting it for the next request"""
+        with self._cond:
+            self._leased.pop(id(session.driver), None)
+        if not broken:
+            try:
+                started = time.monotonic()
+                self._reset(session)
+                observe_phase("selenium", "teardown", time.monotonic() - started)
+            except Exception as e:
+                logger.warning(f"Failed to reset pooled WebDriver: {e}")
+                broken = True
+
+        reason = None if broken else self._recycle_reason(session)
+        with self._cond:
+            closed = self._closed
+            if not broken and not closed and reason is None:
+                self._idle.append(session)
+                self._cond.notify()
+                return
+        if reason and not closed:
+            self._recycle(session, reason)
+        else:
+            self._discard(session)
+
+    def add_page_loads(self, driver, count):
+        """Count page loads against a leased driver's recycling limit"""
+        with self._cond:
+            session = self._leased.get(id(driver))
+            if session is not None:
+                session.page_loads += count
+
+    def reap_orphans(self):
+        """Kill browser processes registered by server processes that have exited"""
+        killed = reap_orphans(self.registry.directory)
+        if killed:
+            ORPHANS_REAPED.inc(killed)
+            with self._cond:
+                self.orphans_reaped += killed
+        return killed
+
+    def maintain(self):
+        """Recycle idle sessions that have outgrown their limits and reap orphans"""
+        with self._cond:
+            idle = list(self._idle)
+        for session in idle:
+            reason = self._recycle_reason(session)
+            if reason is None:
+                continue
+            with self._cond:
+                if session not in self._idle:
+                    continue  # Leased in the meantime; checked again on release
+                self._idle.remove(session)
+            self._recycle(session, reason)
+        self.reap_orphans()
+
+    def _maintenance_loop(self):
+        while not self._stop_maintenance.wait(BROWSER_REAP_INTERVAL):
+            try:
+                self.maintain()
+            except Exception as e:
+                logger.error(f"Driver pool maintenance failed: {e}")
+
+    @contextmanager
+    def lease(self, timeout=None):
+        session = self.acquire(timeout)
+        broken = False
+        try:
+            yield session.driver
+        except Exception:
+            broken = not self._is_healthy(session)
+            raise
+        finally:
+            self.release(session, broken=broken)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "warmed_up": self.warmed_up.is_set(),
+                "warmup_error": self.warmup_error,
+                "recycled": dict(self.recycled),
+                "orphans_reaped": self.orphans_reaped,
+                "browser_slots": self.browser_slots.stats() if self.browser_slots else None,
+            }
+
+    def browser_stats(self):
+        """Per-session age, usage and current memory, plus the recycling limits"""
+        with self._cond:
+            sessions = list(self._sessions)
+            idle = set(map(id, self._idle))
+        browsers = []
+        for session in sessions:
+            session.rss_bytes = process_tree_rss(session.pids)
+            browsers.append({**session.info(), "state": "idle" if id(session) in idle else "in_use"})
+        return {
+            "pool": self.stats(),
+            "limits": {
+                "max_page_loads": self.max_page_loads,
+                "max_rss_mb": self.max_rss_mb,
+                "max_age_seconds": self.max_age,
+            },
+            "virtual_display_pid": self.virtual_display.pid if self.virtual_display else None,
+            "browsers": browsers,
+        }
+
+    def close(self):
+        """Quit every idle browser; leased ones are quit when released"""
+        self._stop_maintenance.set()
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for session in idle:
+            self._discard(session)
+
+        if self.virtual_display:
+            try:
+                self.virtual_display.stop()
+                logger.info("Virtual display stopped")
+            except Exception as e:
+                logger.error(f"Error stopping virtual display: {str(e)}")
+            self.registry.unregister([self.virtual_display.pid])
+            self.virtual_display = None
+        with self._cond:
+            leased = self._size
+        if not leased:
+            # Otherwise the next run reaps whatever the leased sessions leave behind
+            self.registry.close()
+        logger.info("Driver pool closed")
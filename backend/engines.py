@@ -0,0 +1,152 @@
+import logging
+import os
+import time
+
+from metrics import record_scrape
+from rate_limiter import CircuitOpen, get_rate_limiter
+from scraper import LinkedInJobScraper, ScrapeCancelled
+from http_scraper import LinkedInHttpScraper
+from timing import RunTimer
+
+logger = logging.getLogger(__name__)
+
+# "auto" tries the browserless HTTP engine first and falls back to Selenium
+SCRAPE_ENGINE = os.environ.get("SCRAPE_ENGINE", "auto")
+
+
+class ScrapeEngine:
+    """Common interface for the ways we can fetch and parse job search results.
+
+    timer, if given, is a RunTimer that collects the scrape's phase timings
+    and counters; each engine also exports them to /metrics.
+    """
+
+    name = None
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        raise NotImplementedError
+
+
+class SeleniumEngine(ScrapeEngine):
+    """Renders the search page in a Chrome session leased from the driver pool"""
+
+    name = "selenium"
+
+    def __init__(self, driver_pool, pacing=None):
+        self.driver_pool = driver_pool
+        self.pacing = pacing
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        timer = timer or RunTimer()
+        jobs = []
+        try:
+            lease_started = time.monotonic()
+            with self.driver_pool.lease() as driver:
+                timer.add_phase("acquire_driver", time.monotonic() - lease_started)
+                pages_before = len(timer.page_seconds)
+                try:
+                    scraper = LinkedInJobScraper(driver=driver, pacing=self.pacing)
+                    jobs = scraper.scrape_jobs(
+                        search_query, location, num_jobs, known_job_ids, on_job, cancel_event, timer
+                    )
+                    return jobs
+                finally:
+                    # Counts towards recycling the browser after DRIVER_MAX_PAGE_LOADS
+                    self.driver_pool.add_page_loads(driver, len(timer.page_seconds) - pages_before)
+        finally:
+            record_scrape(self.name, timer, len(jobs))
+
+
+class HttpEngine(ScrapeEngine):
+    """Fetches the guest search page over pooled keep-alive HTTP and parses it with lxml"""
+
+    name = "http"
+
+    def __init__(self, session=None, pacing=None):
+        self.session = session
+        self.pacing = pacing
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        timer = timer or RunTimer()
+        jobs = []
+        try:
+            # Scrapers keep per-run state, so each call gets its own; the HTTP session is shared
+            scraper = LinkedInHttpScraper(session=self.session, pacing=self.pacing)
+            jobs = scraper.scrape_jobs(
+                search_query, location, num_jobs, known_job_ids, on_job, cancel_event, timer
+            )
+            return jobs
+        finally:
+            record_scrape(self.name, timer, len(jobs))
+
+
+class FallbackEngine(ScrapeEngine):
+    """Uses the primary engine and retries with the fallback if it fails or finds nothing.
+
+    Both attempts are one search to the rate limiter, so LinkedIn blocking
+    each of them is counted as a single block signal, and a half-open
+    probe taken by the primary lets the fallback through too.
+    """
+
+    name = "auto"
+
+    def __init__(self, primary, fallback, rate_limiter=None):
+        self.primary = primary
+        self.fallback = fallback
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        with self.rate_limiter.search():
+            return self._scrape_with_fallback(
+                search_query, location, num_jobs, known_job_ids, on_job, cancel_event, timer
+            )
+
+    def _scrape_with_fallback(self, search_query, location, num_jobs, known_job_ids, on_job, cancel_event, timer):
+        # Each engine gets its own timer so its metrics are exported once
+        owner = timer.owner if timer is not None else object()
+        primary_timer = RunTimer(owner)
+        try:
+            jobs = self.primary.scrape_jobs(
+                search_query, location, num_jobs, known_job_ids, on_job, cancel_event, primary_timer
+            )
+            # An empty incremental scrape just means nothing new was posted,
+            # and LinkedIn's no-results page that the search matched nothing
+            if jobs or known_job_ids or primary_timer.counters.get("no_results_page"):
+                return jobs
+            logger.warning(f"{self.primary.name} engine found no jobs, falling back to {self.fallback.name}")
+        except (ScrapeCancelled, CircuitOpen):
+            # The fallback shares the rate limiter, so it would be turned away too
+            raise
+        except Exception as e:
+            logger.warning(f"{self.primary.name} engine failed, falling back to {self.fallback.name}: {e}")
+        finally:
+            if timer is not None:
+                timer.merge(primary_timer)
+
+        fallback_timer = RunTimer(owner)
+        fallback_timer.count("engine_fallback")
+        try:
+            return self.fallback.scrape_jobs(
+                search_query, location, num_jobs, known_job_ids, on_job, cancel_event, fallback_timer
+            )
+        finally:
+            if timer is not None:
+                timer.merge(fallback_timer)
+
+
+def create_engines(driver_pool):
+    """Build every available engine, keyed by name"""
+    selenium_engine = SeleniumEngine(driver_pool)
+    http_engine = HttpEngine()
+    engines = {
+        selenium_engine.name: selenium_engine,
+        http_engine.name: http_engine,
+    }
+    engines["auto"] = FallbackEngine(http_engine, selenium_engine)
+    if SCRAPE_ENGINE not in engines:
+        raise ValueError(f"Unknown SCRAPE_ENGINE: {SCRAPE_ENGINE}")
+    return engines
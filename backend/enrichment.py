@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import lxml.html
+
+from http_scraper import HTTP_TIMEOUT, check_response, get_http_session
+from metrics import JOBS_ENRICHED
+from rate_limiter import get_rate_limiter
+from scraper import LINKEDIN_BASE_URL, parse_job_id
+from timing import RunTimer
+
+logger = logging.getLogger(__name__)
+
+# Detail pages fetched at once, shared by every request
+ENRICH_CONCURRENCY = int(os.environ.get("ENRICH_CONCURRENCY", "4"))
+
+DESCRIPTION_SELECTOR = "div.show-more-less-html__markup, div.description__text"
+CRITERIA_ITEM_SELECTOR = "li.description__job-criteria-item"
+POSTED_AGO_SELECTOR = "span.posted-time-ago__text"
+# "3 days ago", "1 week ago", "30+ minutes ago"
+RELATIVE_DATE_PATTERN = re.compile(r"(\d+)\+?\s+(minute|hour|day|week|month|year)s?\s+ago", re.IGNORECASE)
+RELATIVE_DATE_UNITS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "year": timedelta(days=365),
+}
+BLOCK_TAGS = ("p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6")
+
+
+def _description_text(element):
+    """Plain text of the description markup, one line per paragraph or list item"""
+    for block in element.iter(*BLOCK_TAGS):
+        if block.tag == "li":
+            block.text = "- " + (block.text or "")
+        block.tail = "\n" + (block.tail or "")
+    lines = (" ".join(line.split()) for line in element.text_content().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _posted_date(document, now):
+    """The posting date as YYYY-MM-DD from structured data, a <time> tag or "N days ago" text"""
+    for script in document.xpath("//script[@type='application/ld+json']"):
+        try:
+            date_posted = json.loads(script.text_content()).get("datePosted")
+        except (ValueError, AttributeError):
+            continue
+        if date_posted:
+            return date_posted[:10]
+
+    time_elements = document.cssselect("time[datetime]")
+    if time_elements:
+        return time_elements[0].get("datetime")[:10]
+
+    for element in document.cssselect(POSTED_AGO_SELECTOR):
+        match = RELATIVE_DATE_PATTERN.search(element.text_content())
+        if match:
+            amount, unit = int(match.group(1)), match.group(2).lower()
+            return (now - amount * RELATIVE_DATE_UNITS[unit]).strftime("%Y-%m-%d")
+    return None
+
+
+def parse_job_detail(html, now=None):
+    """Parse description, seniority, employment type and posted date from a job detail page.
+
+    Fields the page doesn't have are None.
+    """
+    document = lxml.html.fromstring(html)
+    descriptions = document.cssselect(DESCRIPTION_SELECTOR)
+    criteria = {}
+    for item in document.cssselect(CRITERIA_ITEM_SELECTOR):
+        header = item.cssselect("h3")
+        value = item.cssselect("span")
+        if header and value:
+            criteria[header[0].text_content().strip().lower()] = value[0].text_content().strip()
+    return {
+        "description": _description_text(descriptions[0]) if descriptions else None,
+        "seniority": criteria.get("seniority level"),
+        "employmentType": criteria.get("employment type"),
+        "postedDate": _posted_date(document, now or datetime.now()),
+    }
+
+
+def apply_details(job, details):
+    """A copy of job with the fields its detail page provided"""
+    if not details:
+        return job
+    return {
+        **job,
+        "description": details["description"] or job["description"],
+        "postedDate": details["postedDate"] or job["postedDate"],
+        "seniority": details["seniority"],
+        "employmentType": details["employmentType"],
+    }
+
+
+class JobEnricher:
+    """Fills in job details from each posting's guest detail page.
+
+    Pages are fetched concurrently on a pool shared by every request, and
+    the parsed details are kept in the job store, so a posting is only
+    ever fetched once.
+    """
+
+    def __init__(self, job_store, session=None, concurrency=ENRICH_CONCURRENCY, base_url=None, rate_limiter=None):
+        self.job_store = job_store
+        self.session = session or get_http_session()
+        # Detail pages count against the same request budget as searches
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.base_url = (base_url or LINKEDIN_BASE_URL).rstrip("/")
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="enrich")
+
+    def detail_url(self, job_id):
+        return f"{self.base_url}/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+    def fetch_details(self, job_id):
+        self.rate_limiter.acquire()
+        response = self.session.get(self.detail_url(job_id), timeout=HTTP_TIMEOUT)
+        check_response(response, self.rate_limiter)
+        self.rate_limiter.record_success()
+        return parse_job_detail(response.text)
+
+    def _try_fetch_details(self, job_id):
+        try:
+            return self.fetch_details(job_id)
+        except Exception as e:
+            # Not cached, so the next search that returns this job tries again
+            logger.warning(f"Could not fetch details for job {job_id}: {e}")
+            return None
+
+    def enrich(self, jobs, timer=None):
+        """Return copies of jobs with their details filled in; jobs that fail keep their card fields"""
+        timer = timer or RunTimer()
+        job_ids = [parse_job_id(job["url"]) for job in jobs]
+        with timer.phase("enrichment"):
+            details = self.job_store.get_job_details(job_id for job_id in job_ids if job_id)
+            missing = [job_id for job_id in dict.fromkeys(job_ids) if job_id and job_id not in details]
+
+            fetched = {}
+            if missing:
+                logger.info(f"Fetching details for {len(missing)} jobs, {len(details)} already cached")
+                for job_id, job_details in zip(missing, self._pool.map(self._try_fetch_details, missing)):
+                    if job_details:
+                        fetched[job_id] = job_details
+                self.job_store.save_job_details(fetched)
+
+        JOBS_ENRICHED.labels(source="cache").inc(len(details))
+        JOBS_ENRICHED.labels(source="fetched").inc(len(fetched))
+        JOBS_ENRICHED.labels(source="failed").inc(len(missing) - len(fetched))
+        timer.count("details_cached", len(details))
+        timer.count("details_fetched", len(fetched))
+        timer.count("details_failed", len(missing) - len(fetched))
+
+        details.update(fetched)
+        return [apply_details(job, details.get(job_id)) for job, job_id in zip(jobs, job_ids)]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
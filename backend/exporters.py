@@ -0,0 +1,215 @@
+import csv
+import json
+import logging
+import os
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Columns of an exported job: the Job fields plus the search that found it
+EXPORT_FIELDS = [
+    "id", "title", "company", "location", "description", "postedDate", "url",
+    "seniority", "employmentType", "query", "searchLocation",
+]
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+
+def detect_format(path):
+    """Export format from the output path's extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    if extension == ".csv":
+        return "csv"
+    if extension == ".parquet" or os.path.isdir(path):
+        return "parquet"
+    raise ValueError(f"Can't tell the export format of {path}; pass one of: {', '.join(EXPORT_FORMATS)}")
+
+
+def _truncate_partial_line(path):
+    """Drop a final line left half-written by an interrupted run"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Scan back to the last complete line
+        position = size
+        while position > 0:
+            step = min(65536, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                break
+        else:
+            f.truncate(0)
+    logger.warning(f"Removed a partially written record from the end of {path}")
+
+
+class JobExporter:
+    """Writes job records to a file as they arrive, without holding them in memory.
+
+    Opening an existing output appends to it. flush() makes everything
+    written so far durable, so the searches behind it can be checkpointed.
+    """
+
+    format = None
+
+    def __init__(self, path):
+        self.path = path
+        self.records_written = 0
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def existing_records(self):
+        """Yield the records already in the output, e.g. to skip them when resuming"""
+        return iter(())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class NdjsonExporter(JobExporter):
+    """One JSON object per line"""
+
+    format = "ndjson"
+
+    def __init__(self, path):
+        super().__init__(path)
+        _truncate_partial_line(path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record):
+        self._file.write(json.dumps({field: record.get(field) for field in EXPORT_FIELDS}, ensure_ascii=False) + "\n")
+        self.records_written += 1
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def existing_records(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class CsvExporter(JobExporter):
+    """CSV with a header row of EXPORT_FIELDS"""
+
+    format = "csv"
+
+    def __init__(self, path):
+        super().__init__(path)
+        _truncate_partial_line(path)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        if is_new:
+            self._writer.writeheader()
+
+    def write(self, record):
+        self._writer.writerow(record)
+        self.records_written += 1
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def existing_records(self):
+        with open(self.path, encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+
+
+class ParquetExporter(JobExporter):
+    """A directory of Parquet part files, readable as one dataset.
+
+    Parquet files can't be appended to, so records are buffered and each
+    flush writes them out as a new part file. Large buffers are written out
+    early to bound memory.
+    """
+
+    format = "parquet"
+
+    def __init__(self, path, max_buffered_records=10000):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+        super().__init__(path)
+        os.makedirs(path, exist_ok=True)
+        self.max_buffered_records = max_buffered_records
+        self._schema = pa.schema([(field, pa.string()) for field in EXPORT_FIELDS])
+        self._buffer = []
+        self._run_id = time.strftime("%Y%m%d-%H%M%S")
+        self._parts = 0
+
+    def write(self, record):
+        self._buffer.append({field: record.get(field) for field in EXPORT_FIELDS})
+        self.records_written += 1
+        if len(self._buffer) >= self.max_buffered_records:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self._parts += 1
+        part_path = os.path.join(self.path, f"part-{self._run_id}-{self._parts:05d}.parquet")
+        # Written under a temporary name so a crash never leaves a truncated part
+        pq.write_table(pa.Table.from_pylist(self._buffer, schema=self._schema), part_path + ".tmp")
+        os.replace(part_path + ".tmp", part_path)
+        self._buffer = []
+
+    def existing_records(self):
+        for name in sorted(os.listdir(self.path)):
+            if name.endswith(".parquet"):
+                table = pq.read_table(os.path.join(self.path, name), columns=["id", "query", "searchLocation"])
+                yield from table.to_pylist()
+
+
+EXPORTERS = {
+    "ndjson": NdjsonExporter,
+    "csv": CsvExporter,
+    "parquet": ParquetExporter,
+}
+
+
+def open_exporter(path, export_format=None):
+    """Exporter for path, appending if it exists; the format defaults to the path's extension"""
+    export_format = export_format or detect_format(path)
+    if export_format not in EXPORTERS:
+        raise ValueError(f"Unknown export format: {export_format}. Choose from: {', '.join(EXPORT_FORMATS)}")
+    return EXPORTERS[export_format](path)
@@ -0,0 +1,92 @@
+import logging
+import os
+import random
+import threading
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Browsers that may be running at once across every server worker on this
+# machine; 0 leaves each worker limited only by DRIVER_POOL_MAX_SIZE
+BROWSER_SLOTS = int(os.environ.get("BROWSER_SLOTS", "0"))
+BROWSER_SLOTS_DIR = os.environ.get(
+    "BROWSER_SLOTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".browser_slots")
+)
+
+
+def try_lock(path):
+    """Take an exclusive lock on path without waiting; returns the open file holding it, or None.
+
+    The lock is held until the file is closed or the process exits, so a
+    crashed worker never leaves it behind. Without fcntl (Windows) the lock
+    always succeeds, which is only safe with a single worker.
+    """
+    lock_file = open(path, "a+")
+    if not FCNTL_AVAILABLE:
+        return lock_file
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return lock_file
+    except OSError:
+        lock_file.close()
+        return None
+
+
+class BrowserSlots:
+    """A machine-wide limit on live browsers, shared by every server worker.
+
+    Each slot is a lock file in directory. A worker holds a slot for as long
+    as one of its browsers is running, and the OS releases it if the worker
+    dies, so slots can't leak.
+    """
+
+    def __init__(self, slots=BROWSER_SLOTS, directory=BROWSER_SLOTS_DIR):
+        if slots < 1:
+            raise ValueError(f"Invalid number of browser slots: {slots}")
+        if not FCNTL_AVAILABLE:
+            raise RuntimeError("Browser slots need fcntl file locks, which this platform doesn't have")
+        self.slots = slots
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._held = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """Claim a free slot without waiting; returns its number, or None if all are taken"""
+        # Start somewhere random so workers don't all contend for the first slots
+        first = random.randrange(self.slots)
+        with self._lock:
+            for offset in range(self.slots):
+                slot = (first + offset) % self.slots
+                if slot in self._held:
+                    continue
+                lock_file = try_lock(os.path.join(self.directory, f"slot-{slot}.lock"))
+                if lock_file is not None:
+                    self._held[slot] = lock_file
+                    return slot
+        return None
+
+    def release(self, slot):
+        with self._lock:
+            lock_file = self._held.pop(slot, None)
+        if lock_file is not None:
+            lock_file.close()
+
+    def stats(self):
+        with self._lock:
+            return {"slots": self.slots, "held_by_this_worker": len(self._held)}
+
+
+def default_browser_slots():
+    """BrowserSlots for BROWSER_SLOTS, or None when there is no machine-wide limit"""
+    if BROWSER_SLOTS <= 0:
+        return None
+    if not FCNTL_AVAILABLE:
+        logger.warning("BROWSER_SLOTS is set but file locks aren't available here; it is ignored")
+        return None
+    return BrowserSlots()
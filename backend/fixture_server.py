@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class FixtureServer:
+    """Serves recorded LinkedIn pages from fixtures/ on a local port.
+
+    /jobs/search?start=N returns search_page_<N/25 + 1>.html, or
+    search_empty.html past the last recorded page, for any keywords and
+    location. The "see more jobs" fragment endpoint does the same with
+    search_fragment_<N/25 + 1>.html and an empty body, and every job's
+    guest posting endpoint returns job_posting.html. Point a scraper at it
+    with base_url=server.base_url.
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, host="127.0.0.1", port=0, latency=0.0):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.requests_served = 0
+        self._pages = {}
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _load(self, name):
+        if name not in self._pages:
+            path = os.path.join(self.fixtures_dir, name)
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                self._pages[name] = f.read()
+        return self._pages[name]
+
+    def resolve(self, path, query):
+        """Fixture file name for a request, or None for a 404"""
+        if path.rstrip("/") == "/jobs/search":
+            start = int(query.get("start", ["0"])[0] or 0)
+            name = f"search_page_{start // 25 + 1}.html"
+            return name if self._load(name) is not None else "search_empty.html"
+        if path.rstrip("/") == "/jobs-guest/jobs/api/seeMoreJobPostings/search":
+            start = int(query.get("start", ["0"])[0] or 0)
+            name = f"search_fragment_{start // 25 + 1}.html"
+            return name if self._load(name) is not None else "search_fragment_empty.html"
+        if path.startswith("/jobs-guest/jobs/api/jobPosting/"):
+            return "job_posting.html"
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                name = server.resolve(parsed.path, urllib.parse.parse_qs(parsed.query))
+                body = server._load(name) if name else None
+                if server.latency:
+                    time.sleep(server.latency)
+                server.requests_served += 1
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fixture server listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve recorded LinkedIn pages for offline runs")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay added to every response")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    fixture_server = FixtureServer(port=args.port, latency=args.latency).start()
+    print(f"Serving fixtures at {fixture_server.base_url} (set LINKEDIN_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fixture_server.stop()
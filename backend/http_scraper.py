@@ -0,0 +1,232 @@
+import logging
+import os
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import lxml.html
+import requests
+from requests.adapters import HTTPAdapter
+
+from pacing import get_pacing_policy
+from rate_limiter import RATE_LIMIT_STATUS_CODES, ScrapeBlocked, get_rate_limiter, is_authwall_url
+from timing import RunTimer
+from scraper import (
+    JOB_CARD_SELECTORS, TITLE_SELECTOR, COMPANY_SELECTOR, LOCATION_SELECTOR,
+    LINK_SELECTOR, FALLBACK_LINK_SELECTOR, LINKEDIN_BASE_URL, NO_RESULTS_SELECTOR,
+    SCRAPE_PAGE_PARALLELISM, NoResultsPage, ScrapeCancelled, card_record_to_fields, add_page_jobs, count_card_events,
+    get_pagination_mode, is_fragment_url, record_page_outcome, results_page_url, wait_for_request_slot
+)
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "10"))
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", "15"))
+
+# The guest search page serves the job cards in its initial HTML, so a plain
+# request gets the same markup Chrome would render
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_session = None
+
+
+def get_http_session():
+    """Shared keep-alive session so connections to LinkedIn are reused across scrapes"""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=1)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(DEFAULT_HEADERS)
+        _session = session
+    return _session
+
+
+def check_response(response, rate_limiter):
+    """Raise ScrapeBlocked, after telling the rate limiter, if LinkedIn rate limited us or redirected to the authwall"""
+    if response.status_code in RATE_LIMIT_STATUS_CODES:
+        rate_limiter.record_block("rate_limited")
+        raise ScrapeBlocked("rate_limited", response.url)
+    if is_authwall_url(response.url):
+        rate_limiter.record_block("authwall")
+        raise ScrapeBlocked("authwall", response.url)
+    response.raise_for_status()
+
+
+def _element_text(card, selector):
+    elements = card.cssselect(selector)
+    if not elements:
+        return None
+    # Collapse whitespace the way innerText does for the rendered card
+    return " ".join(elements[0].text_content().split())
+
+
+def parse_job_cards(html, page_url, timer=None):
+    """Parse job card records out of a search results page or fragment, counting selector fallbacks on timer.
+
+    A results page that matched no jobs gives a NoResultsPage.
+    """
+    if not html.strip():
+        return []
+    document = lxml.html.fromstring(html)
+    for selector in JOB_CARD_SELECTORS:
+        cards = document.cssselect(selector)
+        if not cards:
+            continue
+        logger.info(f"Found job cards using selector: {selector}")
+        records = []
+        for card in cards:
+            links = card.cssselect(LINK_SELECTOR) or card.cssselect(FALLBACK_LINK_SELECTOR)
+            href = links[0].get("href") if links else None
+            records.append({
+                "title": _element_text(card, TITLE_SELECTOR),
+                "company": _element_text(card, COMPANY_SELECTOR),
+                "location": _element_text(card, LOCATION_SELECTOR),
+                "url": urllib.parse.urljoin(page_url, href) if href else None,
+                "linkFallback": bool(links) and not card.cssselect(LINK_SELECTOR)
+            })
+        if timer is not None:
+            count_card_events(timer, selector, records)
+        return records
+    if document.cssselect(NO_RESULTS_SELECTOR):
+        logger.info("Search returned no results")
+        if timer is not None:
+            timer.count("no_results_page")
+        return NoResultsPage()
+    return []
+
+
+class LinkedInHttpScraper:
+    """Scrapes the public guest search page with plain HTTP requests, no browser"""
+
+    def __init__(self, session=None, pacing=None, page_parallelism=SCRAPE_PAGE_PARALLELISM, base_url=None,
+                 rate_limiter=None, pagination=None):
+        self.session = session or get_http_session()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.cancel_event = None
+        self.jobs_per_page = 25
+        self.base_url = base_url or LINKEDIN_BASE_URL
+        self.page_parallelism = max(1, page_parallelism)
+        self.pacing = get_pacing_policy(pacing)
+        # "fragment" fetches pages after the first from the "see more jobs" endpoint
+        self.pagination = get_pagination_mode(pagination)
+        self.timer = RunTimer()
+        self.run_stats = None
+
+    def read_page(self, url, response):
+        """The body of a fetched page; raises ScrapeBlocked, after telling the rate limiter, on a block"""
+        if response.status_code in (400, 404) and is_fragment_url(url):
+            # The fragment endpoint's way of saying the results ran out
+            return ""
+        check_response(response, self.rate_limiter)
+        self.timer.record_bytes(len(response.content))
+        return response.text
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        """Same contract as LinkedInJobScraper.scrape_jobs, including incremental mode"""
+        self.timer = timer or RunTimer()
+        self.cancel_event = cancel_event
+        try:
+            return self._scrape_pages(search_query, location, num_jobs, known_job_ids, on_job, cancel_event)
+        finally:
+            self.run_stats = self.timer.summary()
+            logger.info(
+                f"Scrape took {self.run_stats['total_seconds']:.2f}s: "
+                f"{self.run_stats['wait_seconds']:.2f}s waiting, {self.run_stats['work_seconds']:.2f}s working "
+                f"({self.pacing.name} pacing)"
+            )
+
+    def _timed_fetch(self, url):
+        started = time.monotonic()
+        return self.session.get(url, timeout=HTTP_TIMEOUT), time.monotonic() - started
+
+    def fetch_pages(self, urls):
+        """Fetch several result pages concurrently over the shared session.
+
+        Returns (html, seconds) per page, in the same order as urls.
+        Responses are checked here rather than on the fetching threads, so a
+        batch that LinkedIn blocks sends one block signal, not one per page.
+        """
+        for _ in urls:
+            wait_for_request_slot(self.rate_limiter, self.timer, self.cancel_event)
+        with self.timer.phase("navigation"):
+            if len(urls) == 1:
+                fetched = [self._timed_fetch(urls[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+                    fetched = list(pool.map(self._timed_fetch, urls))
+        return [(self.read_page(url, response), seconds) for url, (response, seconds) in zip(urls, fetched)]
+
+    def _scrape_pages(self, search_query, location, num_jobs, known_job_ids, on_job, cancel_event):
+        jobs = []
+        seen_ids = set()
+        start = 0
+        pages_without_new_jobs = 0
+        max_pages_without_new_jobs = 2
+
+        start_time = time.time()
+        timeout = 60
+
+        while len(jobs) < num_jobs and pages_without_new_jobs < max_pages_without_new_jobs:
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info("Scrape cancelled. Stopping scraping.")
+                raise ScrapeCancelled()
+            if time.time() - start_time > timeout:
+                logger.info("Timeout reached (60 seconds). Stopping scraping.")
+                break
+
+            # Fetch as many pages at once as could still be needed, up to page_parallelism
+            pages_needed = -(-(num_jobs - len(jobs)) // self.jobs_per_page)
+            offsets = [start + i * self.jobs_per_page for i in range(min(self.page_parallelism, pages_needed))]
+            urls = [
+                results_page_url(search_query, location, offset, self.jobs_per_page, self.base_url, self.pagination)
+                for offset in offsets
+            ]
+
+            reached_known_jobs = False
+            for offset, url, (html, fetch_seconds) in zip(offsets, urls, self.fetch_pages(urls)):
+                page_number = offset // self.jobs_per_page + 1
+                parse_started = time.monotonic()
+                with self.timer.phase("get_job_cards"):
+                    records = parse_job_cards(html, url, self.timer)
+                self.timer.record_page(fetch_seconds + time.monotonic() - parse_started)
+                record_page_outcome(self.rate_limiter, offset, records)
+                if not records:
+                    logger.warning(f"No job cards found on page {page_number}")
+                    pages_without_new_jobs += 1
+                    continue
+
+                initial_jobs_count = len(jobs)
+                logger.info(f"Found {len(records)} job cards on page {page_number}")
+                page_fields = [card_record_to_fields(record) for record in records]
+                self.timer.count("cards_skipped", page_fields.count(None))
+                reached_known_jobs = add_page_jobs(
+                    jobs, seen_ids, page_fields, num_jobs, known_job_ids, on_job
+                )
+                if len(jobs) == initial_jobs_count:
+                    pages_without_new_jobs += 1
+                else:
+                    pages_without_new_jobs = 0
+
+                if len(jobs) >= num_jobs or reached_known_jobs:
+                    break
+
+            if reached_known_jobs:
+                logger.info("Reached jobs already stored for this search. Stopping scraping.")
+                break
+
+            start = offsets[-1] + self.jobs_per_page
+            if len(jobs) < num_jobs:
+                self.timer.sleep(self.pacing.delay("page"))
+
+        logger.info(f"Completed scraping with {len(jobs)} jobs found")
+        return jobs
@@ -0,0 +1,416 @@
+import base64
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from result_cache import normalize_search
+from scraper import parse_job_id
+
+logger = logging.getLogger(__name__)
+
+JOB_STORE_PATH = os.environ.get(
+    "JOB_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    location TEXT NOT NULL,
+    description TEXT NOT NULL,
+    posted_date TEXT NOT NULL,
+    url TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company);
+CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location);
+CREATE INDEX IF NOT EXISTS idx_jobs_first_seen ON jobs(first_seen);
+CREATE INDEX IF NOT EXISTS idx_jobs_last_seen ON jobs(last_seen);
+
+-- Which searches returned which jobs, for incremental scraping
+CREATE TABLE IF NOT EXISTS search_results (
+    query TEXT NOT NULL,
+    location TEXT NOT NULL,
+    job_id TEXT NOT NULL REFERENCES jobs(job_id),
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (query, location, job_id)
+);
+
+-- Fields parsed from each job's detail page, so it is only fetched once
+CREATE TABLE IF NOT EXISTS job_details (
+    job_id TEXT PRIMARY KEY,
+    description TEXT,
+    seniority TEXT,
+    employment_type TEXT,
+    posted_date TEXT,
+    fetched_at REAL NOT NULL
+);
+
+-- Near-duplicate clusters (see dedupe.py): each job's MinHash signature,
+-- and whether it was signed with the job's description
+CREATE TABLE IF NOT EXISTS job_clusters (
+    job_id TEXT PRIMARY KEY,
+    cluster_id TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    with_description INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_clusters_cluster ON job_clusters(cluster_id);
+
+-- LSH index: jobs whose signatures agree on a whole band share a bucket
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    bucket INTEGER NOT NULL,
+    job_id TEXT NOT NULL,
+    PRIMARY KEY (bucket, job_id)
+) WITHOUT ROWID;
+
+-- Full-text index over stored jobs, rowid = jobs.rowid. Scraped cards
+-- have no description, so it is only indexed once a job is enriched.
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, company, location, description, tokenize = 'porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, title, company, location, description)
+    VALUES (NEW.rowid, NEW.title, NEW.company, NEW.location,
+            COALESCE((SELECT description FROM job_details WHERE job_id = NEW.job_id), ''));
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, location ON jobs
+WHEN OLD.title IS NOT NEW.title OR OLD.company IS NOT NEW.company OR OLD.location IS NOT NEW.location BEGIN
+    DELETE FROM jobs_fts WHERE rowid = OLD.rowid;
+    INSERT INTO jobs_fts (rowid, title, company, location, description)
+    VALUES (NEW.rowid, NEW.title, NEW.company, NEW.location,
+            COALESCE((SELECT description FROM job_details WHERE job_id = NEW.job_id), ''));
+END;
+CREATE TRIGGER IF NOT EXISTS job_details_fts AFTER INSERT ON job_details BEGIN
+    DELETE FROM jobs_fts WHERE rowid = (SELECT rowid FROM jobs WHERE job_id = NEW.job_id);
+    INSERT INTO jobs_fts (rowid, title, company, location, description)
+    SELECT rowid, title, company, location, COALESCE(NEW.description, '') FROM jobs WHERE job_id = NEW.job_id;
+END;
+"""
+
+# Stored job columns plus the detail page fields that override them and the
+# job's near-duplicate cluster, selected with JOB_JOINS
+JOB_COLUMNS = (
+    "jobs.*, job_details.description AS detail_description, "
+    "job_details.posted_date AS detail_posted_date, job_details.seniority, job_details.employment_type, "
+    "job_clusters.cluster_id"
+)
+JOB_JOINS = (
+    "LEFT JOIN job_details ON job_details.job_id = jobs.job_id "
+    "LEFT JOIN job_clusters ON job_clusters.job_id = jobs.job_id"
+)
+# SQLite's default limit on ? parameters per statement is 999 on older versions
+MAX_SQL_PARAMS = 900
+# bm25 weights for title, company, location and description matches
+SEARCH_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+
+def _row_to_job(row):
+    return {
+        "id": row["job_id"],
+        "title": row["title"],
+        "company": row["company"],
+        "location": row["location"],
+        "description": row["detail_description"] or row["description"],
+        "postedDate": row["detail_posted_date"] or row["posted_date"],
+        "url": row["url"],
+        "seniority": row["seniority"],
+        "employmentType": row["employment_type"],
+        "clusterId": row["cluster_id"],
+    }
+
+
+def build_match_query(keywords=None, location=None):
+    """FTS5 query matching every keyword anywhere and the location phrase in the location column.
+
+    Only word characters are kept, so user input can't inject FTS syntax.
+    Returns None when there is nothing to match on.
+    """
+    clauses = [f'"{term}"' for term in re.findall(r"\w+", (keywords or "").lower())]
+    location_terms = re.findall(r"\w+", (location or "").lower())
+    if location_terms:
+        clauses.append(f'location : "{" ".join(location_terms)}"')
+    return " AND ".join(clauses) or None
+
+
+def encode_cursor(score, rowid):
+    return base64.urlsafe_b64encode(json.dumps([score, rowid]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(score, rowid) of the last result on the previous page; raises ValueError if malformed"""
+    try:
+        score, rowid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(rowid)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def _row_to_details(row):
+    return {
+        "description": row["description"],
+        "seniority": row["seniority"],
+        "employmentType": row["employment_type"],
+        "postedDate": row["posted_date"],
+    }
+
+
+class JobStore:
+    """Embedded SQLite store of every job we've scraped, keyed on LinkedIn's job ID"""
+
+    def __init__(self, path=JOB_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._backfill_index()
+        logger.info(f"Job store opened at {path}")
+
+    def _backfill_index(self):
+        """Index jobs stored before the full-text index existed"""
+        jobs = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        indexed = self._conn.execute("SELECT COUNT(*) FROM jobs_fts").fetchone()[0]
+        if jobs == indexed:
+            return
+        logger.info(f"Rebuilding full-text index for {jobs} jobs")
+        with self._conn:
+            self._conn.execute("DELETE FROM jobs_fts")
+            self._conn.execute(
+                "INSERT INTO jobs_fts (rowid, title, company, location, description) "
+                "SELECT jobs.rowid, title, company, location, COALESCE(job_details.description, '') "
+                "FROM jobs LEFT JOIN job_details ON job_details.job_id = jobs.job_id"
+            )
+
+    def save_jobs(self, jobs, query=None, location=None):
+        """Insert or refresh jobs and record them against the search; returns the new job IDs"""
+        now = time.time()
+        search_key = normalize_search(query, location) if query is not None else None
+        new_ids = []
+        with self._lock, self._conn:
+            for job in jobs:
+                job_id = parse_job_id(job["url"])
+                if not job_id:
+                    logger.warning(f"Not storing job without a LinkedIn job ID: {job['url']}")
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT INTO jobs (job_id, title, company, location, description, posted_date, url, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(job_id) DO NOTHING",
+                    (job_id, job["title"], job["company"], job["location"], job["description"],
+                     job["postedDate"], job["url"], now, now)
+                )
+                if cursor.rowcount:
+                    new_ids.append(job_id)
+                else:
+                    self._conn.execute(
+                        "UPDATE jobs SET title = ?, company = ?, location = ?, url = ?, last_seen = ? WHERE job_id = ?",
+                        (job["title"], job["company"], job["location"], job["url"], now, job_id)
+                    )
+                if search_key:
+                    self._conn.execute(
+                        "INSERT INTO search_results (query, location, job_id, first_seen, last_seen) "
+                        "VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(query, location, job_id) DO UPDATE SET last_seen = excluded.last_seen",
+                        (search_key[0], search_key[1], job_id, now, now)
+                    )
+        return new_ids
+
+    def known_job_ids(self, query, location=None):
+        """IDs of jobs already stored for this search"""
+        search_key = normalize_search(query, location)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM search_results WHERE query = ? AND location = ?", search_key
+            ).fetchall()
+        return {row["job_id"] for row in rows}
+
+    def get_search_results(self, query, location=None, limit=None):
+        """Stored jobs this search has returned, most recently posted first"""
+        search_key = normalize_search(query, location)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM search_results "
+                f"JOIN jobs ON jobs.job_id = search_results.job_id {JOB_JOINS} "
+                "WHERE search_results.query = ? AND search_results.location = ? "
+                "ORDER BY search_results.first_seen DESC, jobs.rowid DESC LIMIT ?",
+                (*search_key, -1 if limit is None else limit)
+            ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def get_jobs(self, job_ids):
+        """Stored jobs for the given IDs, in the same order; unknown IDs are skipped"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs {JOB_JOINS} "
+                f"WHERE jobs.job_id IN ({', '.join('?' * len(job_ids))})", job_ids
+            ).fetchall()
+        by_id = {row["job_id"]: _row_to_job(row) for row in rows}
+        return [by_id[job_id] for job_id in job_ids if job_id in by_id]
+
+    def get_job_details(self, job_ids):
+        """Cached detail page fields keyed by job ID, for the IDs that have them"""
+        job_ids = list(set(job_ids))
+        if not job_ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM job_details WHERE job_id IN ({', '.join('?' * len(job_ids))})", job_ids
+            ).fetchall()
+        return {row["job_id"]: _row_to_details(row) for row in rows}
+
+    def save_job_details(self, details_by_id):
+        """Cache detail page fields, keyed by job ID"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_details "
+                "(job_id, description, seniority, employment_type, posted_date, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, details["description"], details["seniority"], details["employmentType"],
+                     details["postedDate"], now)
+                    for job_id, details in details_by_id.items()
+                ]
+            )
+
+    def get_clusters(self, job_ids):
+        """Near-duplicate cluster, MinHash signature and whether it covers the description, keyed by job ID"""
+        job_ids = list(job_ids)
+        rows = []
+        with self._lock:
+            for start in range(0, len(job_ids), MAX_SQL_PARAMS):
+                chunk = job_ids[start:start + MAX_SQL_PARAMS]
+                rows += self._conn.execute(
+                    f"SELECT * FROM job_clusters WHERE job_id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+        return {
+            row["job_id"]: {
+                "cluster_id": row["cluster_id"],
+                "signature": row["signature"],
+                "with_description": bool(row["with_description"]),
+            }
+            for row in rows
+        }
+
+    def get_lsh_candidates(self, buckets, per_bucket):
+        """Job IDs in each LSH bucket, keyed by bucket; only the per_bucket newest of each"""
+        buckets = list(buckets)
+        members = {}
+        with self._lock:
+            for start in range(0, len(buckets), MAX_SQL_PARAMS):
+                chunk = buckets[start:start + MAX_SQL_PARAMS]
+                # LinkedIn job IDs grow over time, so the highest are the newest;
+                # they're stored as text, so compare them as numbers
+                rows = self._conn.execute(
+                    "SELECT bucket, job_id FROM ("
+                    "SELECT bucket, job_id, "
+                    "ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY CAST(job_id AS INTEGER) DESC) AS position "
+                    f"FROM lsh_buckets WHERE bucket IN ({', '.join('?' * len(chunk))})"
+                    ") WHERE position <= ?", chunk + [per_bucket]
+                ).fetchall()
+                for row in rows:
+                    members.setdefault(row["bucket"], []).append(row["job_id"])
+        return members
+
+    def save_clusters(self, entries, old_buckets=()):
+        """Store (job_id, cluster_id, signature, with_description, buckets) entries.
+
+        old_buckets are (bucket, job_id) pairs to drop first, for jobs whose
+        signature has changed.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM lsh_buckets WHERE bucket = ? AND job_id = ?", old_buckets)
+            self._conn.executemany(
+                "INSERT INTO job_clusters (job_id, cluster_id, signature, with_description, updated_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET cluster_id = excluded.cluster_id, signature = excluded.signature, "
+                "with_description = excluded.with_description, updated_at = excluded.updated_at",
+                [
+                    (job_id, cluster_id, signature, int(with_description), now)
+                    for job_id, cluster_id, signature, with_description, _ in entries
+                ]
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO lsh_buckets (bucket, job_id) VALUES (?, ?)",
+                [(bucket, entry[0]) for entry in entries for bucket in entry[4]]
+            )
+
+    def get_unclustered_jobs(self, limit):
+        """Stored jobs that haven't been given a near-duplicate cluster yet"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs {JOB_JOINS} WHERE job_clusters.job_id IS NULL LIMIT ?", (limit,)
+            ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def search(self, keywords=None, location=None, limit=20, cursor=None):
+        """Ranked full-text search over stored jobs.
+
+        Results are ordered by relevance, or newest first without a query.
+        Returns (jobs, total_results, next_cursor); pass next_cursor back to
+        get the following page. It is None on the last page.
+        """
+        match = build_match_query(keywords, location)
+        if match:
+            weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+            select = (
+                f"SELECT {JOB_COLUMNS}, bm25(jobs_fts, {weights}) AS score, jobs_fts.rowid AS doc "
+                f"FROM jobs_fts JOIN jobs ON jobs.rowid = jobs_fts.rowid {JOB_JOINS} "
+                "WHERE jobs_fts MATCH ?"
+            )
+            params = [match]
+            count_sql, count_params = "SELECT COUNT(*) FROM jobs_fts WHERE jobs_fts MATCH ?", [match]
+        else:
+            select = (
+                f"SELECT {JOB_COLUMNS}, -jobs.first_seen AS score, jobs.rowid AS doc "
+                f"FROM jobs {JOB_JOINS} WHERE 1"
+            )
+            params = []
+            count_sql, count_params = "SELECT COUNT(*) FROM jobs", []
+
+        if cursor:
+            # Keyset pagination: resume right after the previous page's last (score, rowid)
+            score, rowid = decode_cursor(cursor)
+            select += " AND (score > ? OR (score = ? AND doc > ?))"
+            params += [score, score, rowid]
+
+        with self._lock:
+            # One extra row tells us whether there is another page
+            rows = self._conn.execute(f"{select} ORDER BY score, doc LIMIT ?", params + [limit + 1]).fetchall()
+            total = self._conn.execute(count_sql, count_params).fetchone()[0]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["score"], rows[-1]["doc"])
+        return [_row_to_job(row) for row in rows], total, next_cursor
+
+    def stats(self):
+        with self._lock:
+            jobs = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            searches = self._conn.execute(
+                "SELECT COUNT(*) FROM (SELECT DISTINCT query, location FROM search_results)"
+            ).fetchone()[0]
+            enriched = self._conn.execute("SELECT COUNT(*) FROM job_details").fetchone()[0]
+            clustered, clusters = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT cluster_id) FROM job_clusters"
+            ).fetchone()
+        return {"jobs": jobs, "searches": searches, "enriched": enriched, "clustered": clustered, "clusters": clusters}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,352 @@
+"""Load test the API server with a fake scraper engine.
+
+Starts server.py in a subprocess with every engine replaced by a fake that
+sleeps instead of scraping, drives /jobs/ requests at it and reports
+throughput, latency and queueing delay percentiles and error rates per
+load level, so the server's concurrency, caching and admission control can
+be measured without Chrome or network access:
+
+    python load_test.py --concurrency 1 4 16 64 --duration 20
+    python load_test.py --rates 5 10 20 40 --latency 2 --failure-rate 0.05
+
+--concurrency runs a closed loop: that many clients, each sending its next
+request as soon as the last one returns. --rates runs an open loop:
+requests arrive at that many per second whether or not earlier ones have
+finished, as real traffic does. Server settings such as SCRAPE_MAX_QUEUE
+or RESULT_CACHE_TTL are read from the environment as usual.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from benchmark import git_commit, percentile
+from engines import ScrapeEngine
+from metrics import record_scrape
+from scraper import LINKEDIN_BASE_URL, ScrapeCancelled, build_job
+from timing import RunTimer
+
+logger = logging.getLogger(__name__)
+
+# Server settings recorded with each run, since they shape the results
+SERVER_SETTINGS = (
+    "SCRAPE_MAX_CONCURRENCY", "SCRAPE_MAX_QUEUE", "RESULT_CACHE_TTL", "RESULT_CACHE_STALE_TTL",
+    "RESULT_CACHE_MAX_ENTRIES", "DRIVER_POOL_MAX_SIZE",
+)
+
+
+class FakeEngine(ScrapeEngine):
+    """Stands in for the real engines: sleeps for a while, then returns made-up jobs.
+
+    Each search always gets the same job IDs, so the job store and
+    near-duplicate clustering see realistic repeat traffic.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency=1.0, jitter=0.5, failure_rate=0.0, result_size=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.result_size = result_size
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        timer = timer or RunTimer()
+        jobs = []
+        try:
+            # Uniform in latency * (1 +/- jitter)
+            delay = max(0.0, self.latency * (1 + self.jitter * (2 * random.random() - 1)))
+            with timer.phase("navigation"):
+                if cancel_event is not None:
+                    if cancel_event.wait(delay):
+                        raise ScrapeCancelled()
+                else:
+                    time.sleep(delay)
+            if random.random() < self.failure_rate:
+                raise RuntimeError("Simulated scrape failure")
+
+            first_id = 3_000_000_000 + zlib.crc32(f"{search_query}|{location}".encode()) % 1_000_000 * 1000
+            for i in range(num_jobs if self.result_size is None else self.result_size):
+                job = build_job(i + 1, {
+                    "title": f"{search_query.title()} {i + 1}",
+                    "company": f"Company {i % 50}",
+                    "location": location or "Remote",
+                    "url": f"{LINKEDIN_BASE_URL}/jobs/view/{first_id + i}",
+                })
+                jobs.append(job)
+                if on_job:
+                    on_job(job)
+            return jobs
+        finally:
+            record_scrape(self.name, timer, len(jobs))
+
+
+def serve(args):
+    """Run the API server with every engine replaced by a FakeEngine"""
+    import uvicorn
+    import server
+
+    app = server.create_app()
+    fake = FakeEngine(args.latency, args.jitter, args.failure_rate, args.result_size)
+    # Requests look engines up by name, so every name leads to the fake
+    for name in list(server.engines):
+        server.engines[name] = fake
+    # Nothing needs a browser, so skip the pool's warm-up and the Xvfb display it starts
+    server.driver_pool.start_in_background = server.driver_pool.warmed_up.set
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, workdir):
+    """Start `load_test.py --serve` in a subprocess; returns (process, base_url)"""
+    port = free_port()
+    env = dict(os.environ)
+    # Keep the load test's jobs, cache and browser bookkeeping out of the
+    # real ones, and don't start Chrome
+    env["JOB_STORE_PATH"] = os.path.join(workdir, "jobs.db")
+    env["BROWSER_REGISTRY_DIR"] = os.path.join(workdir, "browsers")
+    env["BROWSER_SLOTS_DIR"] = os.path.join(workdir, "browser_slots")
+    if env.get("RESULT_CACHE_PATH"):
+        # Still load tests the shared cache, just not the real one's entries
+        env["RESULT_CACHE_PATH"] = os.path.join(workdir, "result_cache.db")
+    if env.get("CIRCUIT_STATE_PATH"):
+        env["CIRCUIT_STATE_PATH"] = os.path.join(workdir, "result_cache.db")
+    env["DRIVER_POOL_MIN_SIZE"] = "0"
+    command = [
+        sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+        "--latency", str(args.latency), "--jitter", str(args.jitter), "--failure-rate", str(args.failure_rate),
+    ]
+    if args.result_size is not None:
+        command += ["--result-size", str(args.result_size)]
+    log_path = os.path.join(workdir, "server.log")
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            with open(log_path) as log:
+                raise RuntimeError(f"Server exited during startup:\n{log.read()}")
+        try:
+            requests.get(f"{base_url}/health", timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Server didn't start within 60s")
+
+
+class LoadGenerator:
+    """Sends /jobs/ requests and records how each one went"""
+
+    def __init__(self, base_url, args):
+        self.url = f"{base_url}/jobs/"
+        self.args = args
+        self._local = threading.local()
+
+    def _session(self):
+        # requests sessions aren't safe to share between threads
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def request_body(self, level):
+        # Queries are namespaced per level so one level's cached results don't serve the next
+        return {
+            "query": f"{self.args.query} {level}-{random.randrange(self.args.distinct_queries)}",
+            "location": self.args.location,
+            "num_jobs": self.args.num_jobs,
+        }
+
+    def send(self, body, scheduled_at=None):
+        """POST one search; latency counts from scheduled_at, so time spent waiting to send counts too"""
+        started = scheduled_at if scheduled_at is not None else time.monotonic()
+        result = {"outcome": "ok", "queue_time": None, "cache": None}
+        try:
+            response = self._session().post(self.url, json=body, timeout=self.args.timeout)
+            if response.status_code == 200:
+                data = response.json()
+                result["queue_time"] = data.get("queue_time")
+                result["cache"] = (data.get("cache") or {}).get("status")
+            elif response.status_code == 503:
+                result["outcome"] = "rejected"
+            else:
+                result["outcome"] = f"http_{response.status_code}"
+        except requests.Timeout:
+            result["outcome"] = "timeout"
+        except requests.RequestException:
+            result["outcome"] = "connection_error"
+        result["latency"] = time.monotonic() - started
+        return result
+
+    def closed_loop(self, level, concurrency):
+        """concurrency clients each sending back-to-back requests for the test duration"""
+        results = []
+        deadline = time.monotonic() + self.args.duration
+
+        def client():
+            while time.monotonic() < deadline:
+                results.append(self.send(self.request_body(level)))
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.monotonic() - started
+
+    def open_loop(self, level, rate):
+        """Requests arriving at rate per second (Poisson arrivals) for the test duration"""
+        futures = []
+        started = time.monotonic()
+        next_at = started
+        with ThreadPoolExecutor(max_workers=self.args.max_in_flight) as pool:
+            while True:
+                next_at += random.expovariate(rate)
+                if next_at >= started + self.args.duration:
+                    break
+                time.sleep(max(0.0, next_at - time.monotonic()))
+                futures.append(pool.submit(self.send, self.request_body(level), next_at))
+            results = [future.result() for future in futures]
+        return results, time.monotonic() - started
+
+
+def summarize(results, elapsed):
+    ok = [result for result in results if result["outcome"] == "ok"]
+    latencies = [result["latency"] for result in ok]
+    queue_times = [result["queue_time"] for result in ok if result["queue_time"] is not None]
+
+    def percentiles(values):
+        summary = {
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": max(values) if values else None,
+        }
+        return {name: None if value is None else round(value, 4) for name, value in summary.items()}
+
+    return {
+        "requests": len(results),
+        "throughput": round(len(ok) / elapsed, 2) if elapsed else None,
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else None,
+        "outcomes": dict(Counter(result["outcome"] for result in results)),
+        "cache": dict(Counter(result["cache"] for result in ok if result["cache"])),
+        "latency_seconds": percentiles(latencies),
+        # Time scrapes waited for a worker, as reported by the server
+        "queue_seconds": percentiles(queue_times),
+    }
+
+
+def format_seconds(value):
+    return "-" if value is None else f"{value:.3f}"
+
+
+def print_table(mode, levels):
+    print(f"{mode:>12} {'req/s':>8} {'errors':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'queue p95':>10}  outcomes")
+    for level, summary in levels.items():
+        latency, queue = summary["latency_seconds"], summary["queue_seconds"]
+        print(
+            f"{level:>12} {summary['throughput']:>8} {summary['error_rate'] or 0:>7.1%} "
+            f"{format_seconds(latency['p50']):>7} {format_seconds(latency['p95']):>7} "
+            f"{format_seconds(latency['p99']):>7} {format_seconds(queue['p95']):>10}  {summary['outcomes']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, nargs="+", help="Closed loop: concurrent clients per level")
+    load.add_argument("--rates", type=float, nargs="+", help="Open loop: requests per second per level")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds each level runs for")
+    parser.add_argument("--latency", type=float, default=1.0, help="Mean seconds the fake engine takes per scrape")
+    parser.add_argument("--jitter", type=float, default=0.5,
+                        help="Fake scrape times are spread uniformly over latency * (1 +/- jitter)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of fake scrapes that fail")
+    parser.add_argument("--result-size", type=int, default=None,
+                        help="Jobs per fake scrape (default: the request's num_jobs)")
+    parser.add_argument("--num-jobs", type=int, default=25)
+    parser.add_argument("--query", default="load test")
+    parser.add_argument("--location", default="Remote")
+    parser.add_argument("--distinct-queries", type=int, default=1000,
+                        help="Queries are drawn from this many per level; lower it to exercise the result cache")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Client timeout per request")
+    parser.add_argument("--max-in-flight", type=int, default=512, help="Open loop: most requests outstanding at once")
+    parser.add_argument("--output", default="load_test_results.jsonl",
+                        help="JSON Lines file that each load test run is appended to")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=8000, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+    logging.basicConfig(level=logging.INFO)
+
+    if args.rates:
+        mode, levels = "rate", args.rates
+    else:
+        mode, levels = "concurrency", args.concurrency or [1, 4, 16, 64]
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="load-test-") as workdir:
+        process, base_url = start_server(args, workdir)
+        try:
+            generator = LoadGenerator(base_url, args)
+            for index, level in enumerate(levels):
+                logger.info(f"Running {mode} {level} for {args.duration:.0f}s")
+                if mode == "rate":
+                    level_results, elapsed = generator.open_loop(index, level)
+                else:
+                    level_results, elapsed = generator.closed_loop(index, level)
+                results[str(level)] = summarize(level_results, elapsed)
+        finally:
+            process.terminate()
+            process.wait()
+
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": git_commit(),
+        "config": {
+            "mode": mode,
+            "duration": args.duration,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "failure_rate": args.failure_rate,
+            "result_size": args.result_size,
+            "num_jobs": args.num_jobs,
+            "distinct_queries": args.distinct_queries,
+            "server": {name: os.environ[name] for name in SERVER_SETTINGS if name in os.environ},
+        },
+        "levels": results,
+    }
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print_table(mode, results)
+    print(f"Appended results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Scrape phases run from a few milliseconds (parsing) to tens of seconds (page loads)
+PHASE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+SCRAPE_PHASE_SECONDS = Histogram(
+    "scraper_phase_seconds",
+    "Duration of each scrape phase occurrence",
+    ["engine", "phase"],
+    buckets=PHASE_BUCKETS,
+)
+SCRAPE_PAGE_SECONDS = Histogram(
+    "scraper_page_seconds",
+    "Time from requesting a result page to having its cards parsed",
+    ["engine"],
+    buckets=PHASE_BUCKETS,
+)
+SCRAPE_PAGE_BYTES = Histogram(
+    "scraper_page_bytes",
+    "Bytes downloaded per result page load, including subresources that weren't blocked",
+    ["engine"],
+    buckets=(10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000),
+)
+SCRAPE_RUN_SECONDS = Histogram(
+    "scraper_run_seconds",
+    "Total duration of a scrape",
+    ["engine"],
+    buckets=PHASE_BUCKETS,
+)
+SCRAPE_WAIT_SECONDS = Counter(
+    "scraper_wait_seconds_total",
+    "Time scrapes spent sleeping or waiting for pages to become ready",
+    ["engine"],
+)
+SCRAPE_EVENTS = Counter(
+    "scraper_events_total",
+    "Scrape events such as selector fallbacks hit and cards skipped",
+    ["engine", "event"],
+)
+JOBS_SCRAPED = Counter(
+    "scraper_jobs_total",
+    "Jobs returned by scrapes",
+    ["engine"],
+)
+JOBS_ENRICHED = Counter(
+    "jobs_enriched_total",
+    "Jobs given detail page fields, by whether the details were cached, fetched or failed to fetch",
+    ["source"],
+)
+JOB_SEARCH_REQUESTS = Counter(
+    "job_search_requests_total",
+    "Job search requests by endpoint and outcome",
+    ["endpoint", "outcome"],
+)
+JOB_SEARCH_SECONDS = Histogram(
+    "job_search_seconds",
+    "End-to-end job search request duration",
+    ["endpoint"],
+    buckets=PHASE_BUCKETS,
+)
+DRIVERS_RECYCLED = Counter(
+    "driver_pool_recycled_total",
+    "Pooled browsers replaced for reaching a page load, memory or age limit",
+    ["reason"],
+)
+ORPHANS_REAPED = Counter(
+    "driver_pool_orphans_reaped_total",
+    "Browser, chromedriver and Xvfb processes killed after their server process exited",
+)
+SCRAPE_BLOCKS = Counter(
+    "scraper_blocks_total",
+    "Block signals from LinkedIn: authwall redirects, rate limit responses and empty first pages",
+    ["signal"],
+)
+CIRCUIT_OPENED = Counter(
+    "scraper_circuit_opened_total",
+    "Times scraping was paused because LinkedIn kept blocking us",
+)
+JOBS_CLUSTERED = Counter(
+    "dedupe_jobs_total",
+    "Jobs given a near-duplicate cluster, by whether they started a new cluster or joined one",
+    ["outcome"],
+)
+DEDUPE_BATCH_SECONDS = Histogram(
+    "dedupe_batch_seconds",
+    "Time to sign and cluster one batch of jobs",
+    buckets=PHASE_BUCKETS,
+)
+SCRAPE_REQUEST_RATE = Gauge("scraper_request_rate", "Current requests per second allowed by the adaptive rate limiter")
+SCRAPE_CIRCUIT_OPEN = Gauge("scraper_circuit_open", "1 while scraping is paused by the circuit breaker, else 0")
+SCRAPE_QUEUE_DEPTH = Gauge("scrape_queue_depth", "Scrapes waiting for a worker")
+SCRAPE_RUNNING = Gauge("scrape_running", "Scrapes currently running")
+DRIVER_POOL_SIZE = Gauge("driver_pool_size", "Chrome sessions in the driver pool", ["state"])
+
+
+def observe_phase(engine, phase, seconds):
+    """Record a phase that happens outside a scraper's RunTimer, e.g. pooled driver startup"""
+    SCRAPE_PHASE_SECONDS.labels(engine=engine, phase=phase).observe(seconds)
+
+
+def record_scrape(engine, timer, jobs_count):
+    """Export one finished scrape's RunTimer"""
+    for phase, durations in timer.phases.items():
+        histogram = SCRAPE_PHASE_SECONDS.labels(engine=engine, phase=phase)
+        for seconds in durations:
+            histogram.observe(seconds)
+    page_histogram = SCRAPE_PAGE_SECONDS.labels(engine=engine)
+    for seconds in timer.page_seconds:
+        page_histogram.observe(seconds)
+    bytes_histogram = SCRAPE_PAGE_BYTES.labels(engine=engine)
+    for num_bytes in timer.page_bytes:
+        bytes_histogram.observe(num_bytes)
+    for event, count in timer.counters.items():
+        SCRAPE_EVENTS.labels(engine=engine, event=event).inc(count)
+    summary = timer.summary()
+    SCRAPE_RUN_SECONDS.labels(engine=engine).observe(summary["total_seconds"])
+    SCRAPE_WAIT_SECONDS.labels(engine=engine).inc(summary["wait_seconds"])
+    JOBS_SCRAPED.labels(engine=engine).inc(jobs_count)
@@ -0,0 +1,50 @@
+import os
+import random
+
+# Readiness is detected with WebDriverWait, so these delays only exist to
+# keep our request pattern polite; they are not needed for correctness.
+SCRAPE_PACING = os.environ.get("SCRAPE_PACING", "polite")
+
+
+class PacingPolicy:
+    """Random delays between scraping steps, in seconds as (min, max) ranges"""
+
+    def __init__(self, name, navigation=(0, 0), page=(0, 0), retry=(0, 0), card=(0, 0),
+                 page_ready_timeout=10):
+        self.name = name
+        self.delays = {
+            "navigation": navigation,  # after a page has loaded
+            "page": page,              # between result pages
+            "retry": retry,            # before looking for job cards again
+            "card": card,              # after scrolling a card into view
+        }
+        self.page_ready_timeout = page_ready_timeout
+
+    def delay(self, kind):
+        low, high = self.delays[kind]
+        return random.uniform(low, high) if high > 0 else 0.0
+
+
+PACING_PROFILES = {
+    # Fixture and benchmark runs: no artificial delays at all
+    "fast": PacingPolicy("fast", page_ready_timeout=5),
+    # Production traffic against LinkedIn
+    "polite": PacingPolicy(
+        "polite",
+        navigation=(1, 2),
+        page=(1.5, 2),
+        retry=(2, 3),
+        card=(0.5, 1),
+        page_ready_timeout=10
+    ),
+}
+
+
+def get_pacing_policy(pacing=None):
+    """Look up a pacing profile by name; a PacingPolicy is returned unchanged"""
+    if isinstance(pacing, PacingPolicy):
+        return pacing
+    name = pacing or SCRAPE_PACING
+    if name not in PACING_PROFILES:
+        raise ValueError(f"Unknown pacing profile: {name}. Choose from: {', '.join(PACING_PROFILES)}")
+    return PACING_PROFILES[name]
@@ -0,0 +1,367 @@
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+
+from metrics import CIRCUIT_OPENED, SCRAPE_BLOCKS
+
+logger = logging.getLogger(__name__)
+
+# Requests per second to LinkedIn, shared by every engine and worker in the
+# process, or split evenly between SERVER_WORKERS server processes
+SCRAPE_RATE = float(os.environ.get("SCRAPE_RATE", "2"))
+SCRAPE_RATE_MIN = float(os.environ.get("SCRAPE_RATE_MIN", "0.2"))
+SCRAPE_RATE_MAX = float(os.environ.get("SCRAPE_RATE_MAX", "8"))
+# Requests that may go out back to back after an idle period
+SCRAPE_BURST = float(os.environ.get("SCRAPE_BURST", "4"))
+# Additive increase per page that came back with results, multiplicative
+# decrease per block signal
+SCRAPE_RATE_STEP = float(os.environ.get("SCRAPE_RATE_STEP", "0.05"))
+SCRAPE_RATE_BACKOFF = float(os.environ.get("SCRAPE_RATE_BACKOFF", "0.5"))
+# Block signals in a row that open the circuit, and how long it stays open;
+# the pause doubles each time a probe is blocked again, up to the maximum
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_OPEN_SECONDS = float(os.environ.get("CIRCUIT_OPEN_SECONDS", "60"))
+CIRCUIT_MAX_OPEN_SECONDS = float(os.environ.get("CIRCUIT_MAX_OPEN_SECONDS", "900"))
+# SQLite file the circuit breaker's state is kept in, so a block seen by one
+# server worker pauses all of them; unset keeps it in this process
+CIRCUIT_STATE_PATH = os.environ.get("CIRCUIT_STATE_PATH")
+# Server processes sharing the rates above
+SERVER_WORKERS = max(1, int(os.environ.get("SERVER_WORKERS", "1")))
+
+# Login and challenge pages LinkedIn redirects guests to when it wants them gone
+AUTHWALL_PATH_PATTERN = re.compile(r"^/(authwall|login|uas/login|checkpoint)\b")
+# LinkedIn answers 999 instead of 429 to clients it thinks are bots
+RATE_LIMIT_STATUS_CODES = (429, 999)
+
+
+def is_authwall_url(url):
+    return bool(AUTHWALL_PATH_PATTERN.match(urllib.parse.urlparse(url or "").path))
+
+
+class ScrapeBlocked(Exception):
+    """LinkedIn answered with an authwall or a rate limit instead of results"""
+
+    def __init__(self, signal, url=None):
+        self.signal = signal
+        super().__init__(f"Blocked by LinkedIn ({signal})" + (f" at {url}" if url else ""))
+
+
+class CircuitOpen(Exception):
+    """Scraping is paused because LinkedIn has been blocking our requests"""
+
+    def __init__(self, retry_after):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"LinkedIn is throttling us; scraping is paused for {self.retry_after}s")
+
+
+class CircuitBreaker:
+    """Stops all scraping after repeated block signals, then probes before resuming.
+
+    Closed: requests go out. Open: they fail with CircuitOpen until the
+    pause is over. Half-open: one scrape gets to probe; results close the
+    circuit, another block signal reopens it for twice as long. The scrape
+    holding the probe may take the rest of its pages' slots, since they're
+    often reserved together before any page comes back.
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, open_seconds=CIRCUIT_OPEN_SECONDS,
+                 max_open_seconds=CIRCUIT_MAX_OPEN_SECONDS, probe_timeout=60.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max(open_seconds, max_open_seconds)
+        # A probe that never reports back (e.g. a network error) stops
+        # blocking the next one after this long
+        self.probe_timeout = probe_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.pause = open_seconds
+        self._opened_at = None
+        self._probe_started_at = None
+        self._probe_owner = None
+        self._lock = threading.Lock()
+
+    def _now(self):
+        return time.monotonic()
+
+    def _synced(self):
+        """Guards the state; SharedCircuitBreaker also loads and saves it here"""
+        return self._lock
+
+    def _owner_key(self, owner):
+        return owner
+
+    def _open(self, now):
+        self.state = "open"
+        self._opened_at = now
+        self._probe_started_at = None
+        self._probe_owner = None
+        CIRCUIT_OPENED.inc()
+        logger.warning(f"Circuit opened after {self.failures} block signals; pausing scraping for {self.pause:.0f}s")
+
+    def retry_after(self, now=None):
+        """Seconds until requests may go out again; 0 unless open"""
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self._opened_at + self.pause - (now or self._now()))
+
+    def _probe_in_flight(self, now):
+        return (self.state == "half_open" and self._probe_started_at is not None
+                and now - self._probe_started_at < self.probe_timeout)
+
+    def raise_if_open(self):
+        """Raise CircuitOpen while paused or another scrape is probing, without using up the probe"""
+        now = self._now()
+        with self._synced():
+            remaining = self.retry_after(now)
+            if remaining > 0:
+                raise CircuitOpen(remaining)
+            if self._probe_in_flight(now):
+                raise CircuitOpen(1)
+
+    def before_request(self, owner=None):
+        """Raise CircuitOpen unless a request may go out now.
+
+        owner identifies the scrape making the request; while half-open,
+        requests from the scrape holding the probe go out too.
+        """
+        now = self._now()
+        with self._synced():
+            if self.state == "open":
+                remaining = self.retry_after(now)
+                if remaining > 0:
+                    raise CircuitOpen(remaining)
+                self.state = "half_open"
+                logger.info("Circuit half-open; sending a probe request")
+            if self.state == "half_open":
+                key = self._owner_key(owner)
+                if self._probe_in_flight(now):
+                    if key is not None and key == self._probe_owner:
+                        return
+                    raise CircuitOpen(1)
+                self._probe_started_at = now
+                self._probe_owner = key
+
+    def record_success(self):
+        with self._synced():
+            self.failures = 0
+            if self.state != "closed":
+                logger.info("Circuit closed; LinkedIn is serving results again")
+            self.state = "closed"
+            self.pause = self.open_seconds
+            self._probe_started_at = None
+            self._probe_owner = None
+
+    def record_block(self):
+        now = self._now()
+        with self._synced():
+            self.failures += 1
+            if self.state == "half_open":
+                self.pause = min(self.pause * 2, self.max_open_seconds)
+                self._open(now)
+            elif self.state == "closed" and self.failures >= self.failure_threshold:
+                self._open(now)
+
+    def stats(self):
+        with self._synced():
+            return {
+                "state": self.state,
+                "consecutive_blocks": self.failures,
+                "retry_after": round(self.retry_after(), 1),
+            }
+
+
+class SharedCircuitBreaker(CircuitBreaker):
+    """CircuitBreaker whose state lives in SQLite, shared by every server worker.
+
+    A block seen by any worker counts towards opening the circuit for all of
+    them, and only one scrape across the workers gets the half-open probe.
+    Times are wall-clock so they mean the same in every process.
+    """
+
+    def __init__(self, path=CIRCUIT_STATE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS circuit_breaker (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                state TEXT NOT NULL,
+                failures INTEGER NOT NULL,
+                pause REAL NOT NULL,
+                opened_at REAL,
+                probe_started_at REAL,
+                probe_owner TEXT
+            )
+        """)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO circuit_breaker VALUES (0, 'closed', 0, ?, NULL, NULL, NULL)",
+            (self.open_seconds,)
+        )
+
+    def _now(self):
+        return time.time()
+
+    def _owner_key(self, owner):
+        # Owners are in-process objects; the pid keeps other workers' apart
+        return None if owner is None else f"{os.getpid()}:{id(owner)}"
+
+    @contextmanager
+    def _synced(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (self.state, self.failures, self.pause, self._opened_at, self._probe_started_at,
+                 self._probe_owner) = self._conn.execute(
+                    "SELECT state, failures, pause, opened_at, probe_started_at, probe_owner "
+                    "FROM circuit_breaker WHERE id = 0"
+                ).fetchone()
+                yield
+                self._conn.execute(
+                    "UPDATE circuit_breaker SET state = ?, failures = ?, pause = ?, opened_at = ?, "
+                    "probe_started_at = ?, probe_owner = ? WHERE id = 0",
+                    (self.state, self.failures, self.pause, self._opened_at, self._probe_started_at,
+                     self._probe_owner)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                # CircuitOpen is raised before anything changes, so nothing is lost
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+class AdaptiveRateLimiter:
+    """Token bucket for requests to LinkedIn that adapts to how it responds.
+
+    The rate creeps up by `step` for every page that comes back with results
+    and is cut by `backoff` on every block signal (authwall, HTTP 429, a
+    first results page with no cards), so it settles just under the rate
+    LinkedIn tolerates. Repeated block signals open the circuit breaker.
+    """
+
+    def __init__(self, rate=SCRAPE_RATE, min_rate=SCRAPE_RATE_MIN, max_rate=SCRAPE_RATE_MAX,
+                 burst=SCRAPE_BURST, step=SCRAPE_RATE_STEP, backoff=SCRAPE_RATE_BACKOFF, breaker=None):
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError(f"Invalid scrape rate: {rate} (min={min_rate}, max={max_rate})")
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1.0, burst)
+        self.step = step
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.blocks = {}
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self, cancel_event=None, owner=None):
+        """Wait for a request slot; returns the seconds waited.
+
+        Raises CircuitOpen while the circuit is open; owner is passed on to
+        CircuitBreaker.before_request. Returns early, without a slot, once
+        cancel_event is set, so check it afterwards.
+        """
+        self.breaker.before_request(owner)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            started = time.monotonic()
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    return waited + time.monotonic() - started
+            else:
+                time.sleep(delay)
+            waited += time.monotonic() - started
+
+    def record_success(self):
+        """A request came back with results"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.step)
+        self.breaker.record_success()
+
+    @contextmanager
+    def search(self):
+        """Count at most one block signal from this thread inside the block.
+
+        For a search retried on another engine, so LinkedIn turning away
+        both attempts counts once towards the backoff and the circuit.
+        """
+        if getattr(self._local, "search_blocked", None) is not None:
+            yield
+            return
+        self._local.search_blocked = False
+        try:
+            yield
+        finally:
+            self._local.search_blocked = None
+
+    def record_block(self, signal):
+        """A request hit a block signal: "authwall", "rate_limited" or "empty_page" """
+        search_blocked = getattr(self._local, "search_blocked", None)
+        if search_blocked:
+            logger.info(f"Block signal from LinkedIn ({signal}) already counted for this search")
+            return
+        if search_blocked is not None:
+            self._local.search_blocked = True
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.backoff)
+            # Requests already queued behind the bucket shouldn't burst out
+            self._tokens = min(self._tokens, 0.0)
+            self.blocks[signal] = self.blocks.get(signal, 0) + 1
+            rate = self.rate
+        SCRAPE_BLOCKS.labels(signal=signal).inc()
+        logger.warning(f"Block signal from LinkedIn ({signal}); request rate lowered to {rate:.2f}/s")
+        self.breaker.record_block()
+
+    def stats(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            limiter = {
+                "rate": round(self.rate, 3),
+                "tokens": round(self._tokens, 2),
+                "blocks": dict(self.blocks),
+            }
+        return {**limiter, "circuit": self.breaker.stats()}
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """The process-wide limiter every engine, worker and enrichment fetch shares.
+
+    With several server workers each one gets an even share of the rates,
+    and they share the circuit breaker through CIRCUIT_STATE_PATH if set.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            share = SERVER_WORKERS
+            _rate_limiter = AdaptiveRateLimiter(
+                rate=SCRAPE_RATE / share,
+                min_rate=SCRAPE_RATE_MIN / share,
+                max_rate=SCRAPE_RATE_MAX / share,
+                burst=SCRAPE_BURST / share,
+                step=SCRAPE_RATE_STEP / share,
+                breaker=SharedCircuitBreaker(CIRCUIT_STATE_PATH) if CIRCUIT_STATE_PATH else None
+            )
+        return _rate_limiter
@@ -0,0 +1,89 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Default network blocking profile for Chrome sessions; see BLOCK_PROFILES
+SCRAPE_BLOCK_PROFILE = os.environ.get("SCRAPE_BLOCK_PROFILE", "cards-only")
+# "normal" waits for the load event, "eager" for DOMContentLoaded, "none" for nothing;
+# job card readiness is waited for explicitly either way
+SCRAPE_PAGE_LOAD_STRATEGY = os.environ.get("SCRAPE_PAGE_LOAD_STRATEGY", "eager")
+
+
+def _extension_patterns(*extensions):
+    # "*.png" and "*.png?*" rather than "*.png*", which would also match a
+    # search URL whose keywords contain ".png"
+    return [pattern for ext in extensions for pattern in (f"*.{ext}", f"*.{ext}?*")]
+
+
+IMAGE_PATTERNS = _extension_patterns("png", "jpg", "jpeg", "gif", "webp", "svg", "ico") + [
+    "*media.licdn.com/dms/image/*",
+]
+FONT_PATTERNS = _extension_patterns("woff", "woff2", "ttf", "otf", "eot")
+MEDIA_PATTERNS = _extension_patterns("mp4", "webm", "mp3", "m3u8")
+TRACKER_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*px.ads.linkedin.com*", "*linkedin.com/li/track*", "*linkedin.com/realtime*",
+    "*bat.bing.com*", "*facebook.net*",
+]
+STYLE_PATTERNS = _extension_patterns("css")
+SCRIPT_PATTERNS = _extension_patterns("js")
+
+# Wildcard URL patterns for Network.setBlockedURLs, by profile
+BLOCK_PROFILES = {
+    "none": [],
+    # Search results: the cards are in the server-rendered HTML, so nothing
+    # else on the page is needed
+    "cards-only": IMAGE_PATTERNS + FONT_PATTERNS + MEDIA_PATTERNS + TRACKER_PATTERNS + STYLE_PATTERNS + SCRIPT_PATTERNS,
+    # Job detail pages: keep scripts and styles for the expandable description
+    "detail-page": IMAGE_PATTERNS + FONT_PATTERNS + MEDIA_PATTERNS + TRACKER_PATTERNS,
+}
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+
+# Bytes transferred for the current document and its subresources, from the
+# Resource Timing API; cross-origin responses without Timing-Allow-Origin
+# report 0, so this is a lower bound
+PAGE_BYTES_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return entries.reduce((total, entry) => total + (entry.transferSize || entry.encodedBodySize || 0), 0);
+"""
+
+
+def get_block_patterns(profile=None):
+    """URL patterns for a blocking profile name; defaults to SCRAPE_BLOCK_PROFILE"""
+    name = profile or SCRAPE_BLOCK_PROFILE
+    if name not in BLOCK_PROFILES:
+        raise ValueError(f"Unknown block profile: {name}. Choose from: {', '.join(BLOCK_PROFILES)}")
+    return BLOCK_PROFILES[name]
+
+
+def get_page_load_strategy(strategy=None):
+    strategy = strategy or SCRAPE_PAGE_LOAD_STRATEGY
+    if strategy not in PAGE_LOAD_STRATEGIES:
+        raise ValueError(f"Unknown page load strategy: {strategy}. Choose from: {', '.join(PAGE_LOAD_STRATEGIES)}")
+    return strategy
+
+
+def apply_block_profile(driver, profile=None):
+    """Block the profile's URLs in the driver's current tab through the DevTools protocol.
+
+    Blocking is per tab, so call it again after switching to a new one.
+    Returns False if the driver doesn't support CDP commands.
+    """
+    patterns = get_block_patterns(profile)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        return True
+    except Exception as e:
+        logger.warning(f"Could not apply block profile {profile or SCRAPE_BLOCK_PROFILE}: {e}")
+        return False
+
+
+def page_transfer_bytes(driver):
+    """Bytes downloaded for the page in the driver's current tab, or None if unavailable"""
+    try:
+        return int(driver.execute_script(PAGE_BYTES_SCRIPT) or 0)
+    except Exception as e:
+        logger.warning(f"Could not measure page bytes: {e}")
+        return None
@@ -0,0 +1,447 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "300"))
+RESULT_CACHE_STALE_TTL = float(os.environ.get("RESULT_CACHE_STALE_TTL", "600"))
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "256"))
+# SQLite file the cache is kept in so every server worker shares it; unset
+# keeps it in this process's memory
+RESULT_CACHE_PATH = os.environ.get("RESULT_CACHE_PATH")
+# How long a worker's claim on scraping a search lasts if it dies without
+# finishing
+RESULT_CACHE_LEASE_SECONDS = float(os.environ.get("RESULT_CACHE_LEASE_SECONDS", "300"))
+# How often a worker waiting on another worker's scrape checks for its result
+SHARED_CACHE_POLL_INTERVAL = 0.2
+
+SHARED_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    query TEXT NOT NULL,
+    location TEXT NOT NULL,
+    num_jobs INTEGER NOT NULL,
+    jobs TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (query, location)
+);
+CREATE INDEX IF NOT EXISTS idx_results_stored_at ON results(stored_at);
+
+-- Searches a worker is scraping right now; identical requests in other
+-- workers wait for its result instead of scraping too
+CREATE TABLE IF NOT EXISTS leases (
+    query TEXT NOT NULL,
+    location TEXT NOT NULL,
+    num_jobs INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    claimed_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (query, location)
+);
+"""
+
+
+def normalize_search(query, location=None):
+    """Cache key for a search: case and whitespace don't change LinkedIn's results"""
+    normalize = lambda value: " ".join((value or "").lower().split())
+    return normalize(query), normalize(location)
+
+
+class CacheEntry:
+    def __init__(self, jobs, num_jobs):
+        self.jobs = jobs
+        self.num_jobs = num_jobs
+        self.stored_at = time.monotonic()
+
+    def age(self):
+        return time.monotonic() - self.stored_at
+
+    def covers(self, num_jobs):
+        # A scrape asked for at least as many jobs can answer a smaller request
+        return self.num_jobs >= num_jobs
+
+
+class ResultCache:
+    """TTL + LRU cache of scrape results with stale-while-revalidate and single-flight.
+
+    Fresh entries (younger than ttl) are served directly. Stale entries
+    (younger than ttl + stale_ttl) are served immediately while a single
+    background scrape refreshes them. Concurrent identical misses share one
+    in-flight scrape instead of each starting their own. Must be used from
+    the event loop thread.
+    """
+
+    def __init__(self, ttl=RESULT_CACHE_TTL, stale_ttl=RESULT_CACHE_STALE_TTL,
+                 max_entries=RESULT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def get(self, query, location, num_jobs):
+        """Fresh cached jobs for the search, or None; counts as a hit"""
+        key = normalize_search(query, location)
+        entry = self._entries.get(key)
+        if entry and entry.covers(num_jobs) and entry.age() < self.ttl:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.jobs[:num_jobs]
+        return None
+
+    def peek(self, query, location, num_jobs):
+        """Cached jobs for the search however old they are, or None.
+
+        For when scraping is paused and old results beat none.
+        """
+        entry = self._entries.get(normalize_search(query, location))
+        if entry and entry.covers(num_jobs):
+            return entry.jobs[:num_jobs]
+        return None
+
+    def put(self, query, location, num_jobs, jobs):
+        """Store jobs scraped outside get_or_load"""
+        self._store(normalize_search(query, location), jobs, num_jobs)
+
+    async def get_async(self, query, location, num_jobs):
+        """get() for callers on the event loop"""
+        return self.get(query, location, num_jobs)
+
+    async def put_async(self, query, location, num_jobs, jobs):
+        """put() for callers on the event loop"""
+        self.put(query, location, num_jobs, jobs)
+
+    def _store(self, key, jobs, num_jobs, replace=True):
+        """Cache jobs for key; replace=False keeps an existing entry that covers more jobs"""
+        # Don't cache empty results; they usually mean we were blocked
+        if not jobs or self.max_entries <= 0:
+            return
+        existing = self._entries.get(key)
+        if not replace and existing and existing.num_jobs > num_jobs:
+            return
+        self._entries[key] = CacheEntry(jobs, num_jobs)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _start_load(self, key, num_jobs, loader):
+        async def load():
+            try:
+                jobs = await loader(num_jobs)
+                # A load overtaken by a bigger one for the same search
+                # (e.g. a slow stale refresh) mustn't replace its result
+                self._store(key, jobs, num_jobs, replace=self._inflight.get(key, (None, None))[1] is task)
+                return jobs
+            finally:
+                if self._inflight.get(key, (None, None))[1] is task:
+                    del self._inflight[key]
+
+        task = asyncio.ensure_future(load())
+        self._inflight[key] = (num_jobs, task)
+        return task
+
+    def _refresh_in_background(self, key, num_jobs, loader):
+        if key in self._inflight:
+            return
+        task = self._start_load(key, num_jobs, loader)
+
+        def log_failure(task):
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Background refresh failed for {key}: {task.exception()}")
+
+        task.add_done_callback(log_failure)
+
+    async def get_or_load(self, query, location, num_jobs, loader):
+        """Return (jobs, status) where status is "hit", "stale", "coalesced" or "miss".
+
+        loader is an async callable taking num_jobs and returning the scraped jobs.
+        """
+        key = normalize_search(query, location)
+
+        entry = self._entries.get(key)
+        if entry and entry.covers(num_jobs):
+            age = entry.age()
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.jobs[:num_jobs], "hit"
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._refresh_in_background(key, entry.num_jobs, loader)
+                return entry.jobs[:num_jobs], "stale"
+
+        inflight = self._inflight.get(key)
+        if inflight and inflight[0] >= num_jobs:
+            self.coalesced += 1
+            jobs = await asyncio.shield(inflight[1])
+            return jobs[:num_jobs], "coalesced"
+
+        self.misses += 1
+        task = self._start_load(key, num_jobs, loader)
+        return await asyncio.shield(task), "miss"
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+        }
+
+
+class SharedResultCache(ResultCache):
+    """ResultCache kept in a SQLite file that every server worker on the machine shares.
+
+    TTLs, stale-while-revalidate and single-flight work across workers: the
+    first worker to miss on a search takes a lease on it, and identical
+    requests in other workers wait for its result to land instead of
+    scraping too. A lease left by a crashed worker expires after
+    lease_seconds. Entries are evicted oldest first beyond max_entries.
+    The SQLite work runs on worker threads so it never blocks the event loop.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, ttl=RESULT_CACHE_TTL, stale_ttl=RESULT_CACHE_STALE_TTL,
+                 max_entries=RESULT_CACHE_MAX_ENTRIES, lease_seconds=RESULT_CACHE_LEASE_SECONDS):
+        super().__init__(ttl, stale_ttl, max_entries)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # Background refreshes waiting to find out if they won the lease
+        self._claims = {}
+        # The load in this worker that holds each lease and releases it
+        self._lease_holders = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SHARED_CACHE_SCHEMA)
+        self._conn.commit()
+        logger.info(f"Shared result cache opened at {path}")
+
+    def _read(self, key, num_jobs):
+        """(jobs, num_jobs, stored_at) for the search if it covers num_jobs, else None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT num_jobs, jobs, stored_at FROM results WHERE query = ? AND location = ?", key
+            ).fetchone()
+        if row is None or row["num_jobs"] < num_jobs:
+            return None
+        return json.loads(row["jobs"]), row["num_jobs"], row["stored_at"]
+
+    def get(self, query, location, num_jobs):
+        entry = self._read(normalize_search(query, location), num_jobs)
+        if entry and time.time() - entry[2] < self.ttl:
+            self.hits += 1
+            return entry[0][:num_jobs]
+        return None
+
+    def peek(self, query, location, num_jobs):
+        entry = self._read(normalize_search(query, location), num_jobs)
+        return entry[0][:num_jobs] if entry else None
+
+    async def get_async(self, query, location, num_jobs):
+        return await asyncio.to_thread(self.get, query, location, num_jobs)
+
+    async def put_async(self, query, location, num_jobs, jobs):
+        await asyncio.to_thread(self.put, query, location, num_jobs, jobs)
+
+    def _store(self, key, jobs, num_jobs, replace=True):
+        if not jobs or self.max_entries <= 0:
+            return
+        payload = json.dumps(jobs)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO results (query, location, num_jobs, jobs, stored_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(query, location) DO UPDATE SET num_jobs = excluded.num_jobs, jobs = excluded.jobs, "
+                "stored_at = excluded.stored_at WHERE ? OR excluded.num_jobs >= results.num_jobs",
+                (*key, num_jobs, payload, time.time(), replace)
+            )
+            self._conn.execute(
+                "DELETE FROM results WHERE rowid IN "
+                "(SELECT rowid FROM results ORDER BY stored_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+            )
+
+    def _claim_lease(self, key, num_jobs):
+        """Take the lease on scraping a search unless another worker holds an unexpired one"""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO leases (query, location, num_jobs, owner, claimed_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(query, location) DO UPDATE SET num_jobs = excluded.num_jobs, owner = excluded.owner, "
+                "claimed_at = excluded.claimed_at, expires_at = excluded.expires_at "
+                "WHERE leases.expires_at < excluded.claimed_at",
+                (*key, num_jobs, self.owner, now, now + self.lease_seconds)
+            )
+            return cursor.rowcount == 1
+
+    def _extend_lease(self, key, num_jobs):
+        """Hand this worker's lease on a search to a bigger scrape of it"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE leases SET num_jobs = ?, expires_at = ? WHERE query = ? AND location = ? AND owner = ?",
+                (num_jobs, time.time() + self.lease_seconds, *key, self.owner)
+            )
+
+    def _read_lease(self, key):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT num_jobs, owner, claimed_at, expires_at FROM leases WHERE query = ? AND location = ?", key
+            ).fetchone()
+
+    def _release_lease(self, key):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM leases WHERE query = ? AND location = ? AND owner = ?", (*key, self.owner)
+            )
+
+    def _start_load(self, key, num_jobs, loader, leased=True):
+        async def load():
+            try:
+                jobs = await loader(num_jobs)
+                replace = self._inflight.get(key, (None, None))[1] is task
+                await asyncio.to_thread(self._store, key, jobs, num_jobs, replace)
+                return jobs
+            finally:
+                # A bigger load that took the lease over releases it instead
+                if leased and self._lease_holders.get(key) is task:
+                    del self._lease_holders[key]
+                    await asyncio.to_thread(self._release_lease, key)
+                if self._inflight.get(key, (None, None))[1] is task:
+                    del self._inflight[key]
+
+        task = asyncio.ensure_future(load())
+        self._inflight[key] = (num_jobs, task)
+        if leased:
+            self._lease_holders[key] = task
+        return task
+
+    def _refresh_in_background(self, key, num_jobs, loader):
+        if key in self._inflight or key in self._claims:
+            return
+
+        async def claim():
+            try:
+                claimed = await asyncio.to_thread(self._claim_lease, key, num_jobs)
+            finally:
+                del self._claims[key]
+            # Only the worker that wins the lease refreshes
+            if not claimed:
+                return
+            if key in self._inflight:
+                # A miss started a scrape meanwhile; it will store the result,
+                # and release the lease too if it holds it
+                if key not in self._lease_holders:
+                    await asyncio.to_thread(self._release_lease, key)
+                return
+            super(SharedResultCache, self)._refresh_in_background(key, num_jobs, loader)
+
+        def log_failure(task):
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Background refresh failed for {key}: {task.exception()}")
+
+        self._claims[key] = asyncio.ensure_future(claim())
+        self._claims[key].add_done_callback(log_failure)
+
+    def _covering_load(self, key, num_jobs):
+        """This worker's in-flight load of the search if it scrapes at least num_jobs, else None"""
+        inflight = self._inflight.get(key)
+        return inflight[1] if inflight and inflight[0] >= num_jobs else None
+
+    async def _wait_for_result(self, key, num_jobs, lease):
+        """Jobs another worker's scrape stores under lease, or None if it ends without storing any"""
+        while True:
+            await asyncio.sleep(SHARED_CACHE_POLL_INTERVAL)
+            entry = await asyncio.to_thread(self._read, key, num_jobs)
+            if entry and entry[2] >= lease["claimed_at"]:
+                return entry[0][:num_jobs]
+            current = await asyncio.to_thread(self._read_lease, key)
+            if current is None or current["owner"] != lease["owner"] or current["expires_at"] < time.time():
+                # Released (results are stored before that) or abandoned
+                entry = await asyncio.to_thread(self._read, key, num_jobs)
+                if entry and entry[2] >= lease["claimed_at"]:
+                    return entry[0][:num_jobs]
+                return None
+
+    async def get_or_load(self, query, location, num_jobs, loader):
+        key = normalize_search(query, location)
+
+        leased = False
+        # Retried when another worker's scrape fails, so a different worker (maybe this one) gets the lease
+        for _ in range(3):
+            entry = await asyncio.to_thread(self._read, key, num_jobs)
+            if entry:
+                jobs, entry_num_jobs, stored_at = entry
+                age = time.time() - stored_at
+                if age < self.ttl:
+                    self.hits += 1
+                    return jobs[:num_jobs], "hit"
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    self._refresh_in_background(key, entry_num_jobs, loader)
+                    return jobs[:num_jobs], "stale"
+
+            task = self._covering_load(key, num_jobs)
+            if task is not None:
+                self.coalesced += 1
+                jobs = await asyncio.shield(task)
+                return jobs[:num_jobs], "coalesced"
+
+            if await asyncio.to_thread(self._claim_lease, key, num_jobs):
+                leased = True
+                break
+            lease = await asyncio.to_thread(self._read_lease, key)
+            if lease is None:
+                continue  # Released just now; its result may have landed
+            if lease["owner"] == self.owner:
+                # A request in this worker may have started the scrape while we were claiming
+                task = self._covering_load(key, num_jobs)
+                if task is not None:
+                    self.coalesced += 1
+                    jobs = await asyncio.shield(task)
+                    return jobs[:num_jobs], "coalesced"
+                if key in self._lease_holders:
+                    # Our own smaller scrape can't answer this request. This one
+                    # takes over its lease, so other workers wait for it instead
+                    self.misses += 1
+                    task = self._start_load(key, num_jobs, loader)
+                    await asyncio.to_thread(self._extend_lease, key, num_jobs)
+                    return await asyncio.shield(task), "miss"
+                # Being released, or claimed for a background refresh, just now
+                await asyncio.sleep(SHARED_CACHE_POLL_INTERVAL)
+                continue
+            if lease["num_jobs"] < num_jobs:
+                # Another worker's smaller scrape can't answer it either
+                break
+            jobs = await self._wait_for_result(key, num_jobs, lease)
+            if jobs is not None:
+                self.coalesced += 1
+                return jobs, "coalesced"
+
+        self.misses += 1
+        task = self._start_load(key, num_jobs, loader, leased)
+        return await asyncio.shield(task), "miss"
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            leases = self._conn.execute("SELECT COUNT(*) FROM leases").fetchone()[0]
+        return {
+            **super().stats(),
+            "entries": entries,
+            "shared_path": self.path,
+            "leases": leases,
+        }
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from driver_pool import DRIVER_POOL_MAX_SIZE
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_MAX_CONCURRENCY = int(os.environ.get("SCRAPE_MAX_CONCURRENCY", str(DRIVER_POOL_MAX_SIZE)))
+SCRAPE_MAX_QUEUE = int(os.environ.get("SCRAPE_MAX_QUEUE", "16"))
+SCRAPE_DEFAULT_RETRY_AFTER = 30
+
+
+class ScrapeQueueFull(Exception):
+    """Raised when the admission queue is full and a request must be rejected"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Scrape queue is full, retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class ScrapeExecutor:
+    """Runs blocking scrapes on a bounded thread pool so the event loop stays free.
+
+    At most max_concurrency scrapes run at once and at most max_queue more
+    wait for a worker; anything beyond that is rejected immediately with
+    ScrapeQueueFull instead of piling up behind a minute-long scrape.
+    """
+
+    def __init__(self, max_concurrency=SCRAPE_MAX_CONCURRENCY, max_queue=SCRAPE_MAX_QUEUE):
+        if max_concurrency < 1 or max_queue < 0:
+            raise ValueError(f"Invalid executor limits: concurrency={max_concurrency}, queue={max_queue}")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="scrape")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._started = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    def _retry_after(self):
+        # Estimate how long until a queue slot frees up from the average run time
+        if not self._completed:
+            return SCRAPE_DEFAULT_RETRY_AFTER
+        avg_run = self._total_run / self._completed
+        return max(1, math.ceil(avg_run * (self._queued + 1) / self.max_concurrency))
+
+    def _admit(self):
+        with self._lock:
+            if self._queued + self._running >= self.max_concurrency + self.max_queue:
+                self._rejected += 1
+                raise ScrapeQueueFull(self._retry_after())
+            self._queued += 1
+
+    def _run(self, submitted_at, fn, args, kwargs):
+        started_at = time.monotonic()
+        wait = started_at - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._started += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+        try:
+            return fn(*args, **kwargs), wait
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._total_run += time.monotonic() - started_at
+
+    def submit(self, fn, *args, **kwargs):
+        """Admit fn to the queue now and return an awaitable for (result, seconds spent queued).
+
+        Raises ScrapeQueueFull immediately, so callers can reject a request
+        before they start responding to it.
+        """
+        self._admit()
+        future = self._pool.submit(self._run, time.monotonic(), fn, args, kwargs)
+        return self._wait(future)
+
+    async def _wait(self, future):
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A request that goes away before a worker picks it up frees its slot
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn in a worker thread; returns (result, seconds spent queued)"""
+        return await self.submit(fn, *args, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": self._queued,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_seconds": round(self._total_wait / self._started, 3) if self._started else 0.0,
+                "max_wait_seconds": round(self._max_wait, 3),
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
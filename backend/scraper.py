@@ -4,7 +4,6 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.keys import Keys
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 import json
 import time
@@ -13,8 +12,15 @@ import urllib.parse
 import logging
 import os
 import glob
-import random
+import re
 from selenium.webdriver.chrome.options import Options
+from chrome_paths import resolve_chrome_paths
+from pacing import get_pacing_policy
+from rate_limiter import (
+    AUTHWALL_PATH_PATTERN, RATE_LIMIT_STATUS_CODES, ScrapeBlocked, get_rate_limiter, is_authwall_url
+)
+from resource_blocking import apply_block_profile, get_page_load_strategy, page_transfer_bytes
+from timing import RunTimer
 
 # Import virtual display for headless servers
 try:
@@ -27,191 +33,740 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Job card selectors, tried in order until one matches
+JOB_CARD_SELECTORS = [
+    "div.job-card-container",
+    "li.jobs-search-results__list-item",
+    "div.base-card",
+    "div.job-search-card"
+]
+# The usual cards of the signed-in and the guest results pages; a page
+# whose cards only another selector found counts as a selector fallback
+PRIMARY_JOB_CARD_SELECTORS = ("div.job-card-container", "div.base-card")
+TITLE_SELECTOR = "h3.base-search-card__title, h3.job-card-list__title"
+COMPANY_SELECTOR = "h4.base-search-card__subtitle, h4.job-card-container__company-name"
+LOCATION_SELECTOR = "span.job-search-card__location, div.job-card-container__metadata-item"
+LINK_SELECTOR = "a.base-card__full-link, a.job-card-list__title-link"
+FALLBACK_LINK_SELECTOR = "a[href*='/jobs/view/']"
+# Overridable so benchmarks can point the scrapers at a local fixture server
+LINKEDIN_BASE_URL = os.environ.get("LINKEDIN_BASE_URL", "https://www.linkedin.com")
+# Result pages fetched at once per search when more than one page is needed
+SCRAPE_PAGE_PARALLELISM = int(os.environ.get("SCRAPE_PAGE_PARALLELISM", "3"))
+# "fragment" fetches every results page after the first from the guest
+# "see more jobs" endpoint, which returns just the cards as an HTML fragment;
+# "page" loads the full search page each time
+SCRAPE_PAGINATION = os.environ.get("SCRAPE_PAGINATION", "fragment")
+PAGINATION_MODES = ("fragment", "page")
+FRAGMENT_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+# /jobs/view/<id> or /jobs/view/<slug>-<id>
+JOB_ID_PATTERN = re.compile(r"/jobs/view/(?:[^/?#]*-)?(\d+)")
+# A results page that matched nothing still has the (empty) results list or
+# LinkedIn's no-results banner; a block page served instead has neither
+NO_RESULTS_SELECTOR = "ul.jobs-search__results-list, .jobs-search-no-results-banner"
+# Search cards have no description; enrichment replaces this with the real one
+CARD_DESCRIPTION = "Click the link to view full job description on LinkedIn"
+
+# Reads every card under root. Returns {selector, cards: [{title, company,
+# location, url, linkFallback}]} using the same selector fallbacks as the
+# per-card extraction; missing fields are null. Whitespace is collapsed
+# because fetched fragments aren't rendered, so innerText is the raw text.
+EXTRACT_CARDS_FUNCTION = """
+const extractCards = (root, cardSelectors, fields, scroll) => {
+    const text = (card, selector) => {
+        const el = card.querySelector(selector);
+        return el ? el.innerText.replace(/\\s+/g, ' ').trim() : null;
+    };
+    for (const selector of cardSelectors) {
+        const cards = Array.from(root.querySelectorAll(selector));
+        if (!cards.length) continue;
+        return {
+            selector: selector,
+            cards: cards.map(card => {
+                if (scroll) card.scrollIntoView({block: 'center'});
+                const primaryLink = card.querySelector(fields.link);
+                const link = primaryLink || card.querySelector(fields.fallbackLink);
+                return {
+                    title: text(card, fields.title),
+                    company: text(card, fields.company),
+                    location: text(card, fields.location),
+                    url: link ? link.href : null,
+                    linkFallback: !primaryLink && link !== null
+                };
+            })
+        };
+    }
+    return {selector: null, cards: []};
+};
+"""
+# Reads every card on the page in a single WebDriver round trip
+EXTRACT_CARDS_SCRIPT = EXTRACT_CARDS_FUNCTION + "return extractCards(document, ...arguments);"
+# Fetches "see more jobs" fragments from inside the current page, all at
+# once, and extracts their cards; the fetches share the page's cookies and
+# connection. Calls back with {status, url, bytes, seconds, result} per URL.
+FETCH_FRAGMENTS_SCRIPT = EXTRACT_CARDS_FUNCTION + """
+const [urls, cardSelectors, fields, done] = arguments;
+Promise.all(urls.map(async url => {
+    const started = performance.now();
+    try {
+        const response = await fetch(url, {credentials: 'include'});
+        const html = await response.text();
+        const fragment = new DOMParser().parseFromString(html, 'text/html');
+        return {
+            status: response.status,
+            url: response.url,
+            bytes: new TextEncoder().encode(html).length,
+            seconds: (performance.now() - started) / 1000,
+            result: response.ok ? extractCards(fragment, cardSelectors, fields, false) : null
+        };
+    } catch (e) {
+        return {status: 0, error: String(e)};
+    }
+})).then(done);
+"""
+
+def start_virtual_display():
+    """Start an Xvfb display for headless servers, or return None if unavailable"""
+    if not VIRTUAL_DISPLAY_AVAILABLE:
+        return None
+    try:
+        logger.info("Setting up virtual display...")
+        display = Display(visible=0, size=(1920, 1080))
+        display.start()
+        logger.info("Virtual display started successfully")
+        return display
+    except Exception as e:
+        logger.warning(f"Failed to setup virtual display: {e}")
+        return None
+
+def create_chrome_driver(page_load_strategy=None, block_profile=None):
+    """Start a new Chrome WebDriver session.
+
+    page_load_strategy and block_profile default to SCRAPE_PAGE_LOAD_STRATEGY
+    and SCRAPE_BLOCK_PROFILE (see resource_blocking.py).
+    """
+    try:
+        options = Options()
+        options.page_load_strategy = get_page_load_strategy(page_load_strategy)
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-plugins')
+        # Images, fonts, scripts and trackers are blocked per request through
+        # the DevTools protocol instead; see apply_block_profile
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--disable-web-security')
+        options.add_argument('--allow-running-insecure-content')
+        options.add_argument('--disable-features=VizDisplayCompositor')
+        options.add_argument('--window-size=1920,1080')
+        options.add_argument('--start-maximized')
+        
+        # Paths are looked up once and cached on disk (see chrome_paths.py)
+        paths = resolve_chrome_paths()
+        for attempt in range(2):
+            if paths["chrome_binary"]:
+                options.binary_location = paths["chrome_binary"]
+            else:
+                logger.warning("No Chrome/Chromium binary found, trying default")
+            try:
+                if paths["chromedriver"]:
+                    driver = webdriver.Chrome(service=Service(paths["chromedriver"]), options=options)
+                else:
+                    # Let Selenium locate a driver itself
+                    driver = webdriver.Chrome(options=options)
+                logger.info(f"Chrome WebDriver setup successful ({paths['chrome_version'] or 'unknown version'})")
+                break
+            except Exception as e:
+                if attempt == 0:
+                    # The cached paths may be stale, e.g. Chrome was upgraded in place
+                    logger.warning(f"Chrome setup failed, resolving Chrome paths again: {e}")
+                    paths = resolve_chrome_paths(refresh=True)
+                    continue
+                logger.error(f"All Chrome setup attempts failed: {e}")
+                raise Exception(f"Could not setup Chrome WebDriver. Please install Chrome/Chromium: sudo apt install -y chromium-browser")
+
+        apply_block_profile(driver, block_profile)
+        return driver
+
+    except Exception as e:
+        logger.error(f"Failed to setup Chrome WebDriver: {str(e)}")
+        raise
+
+def construct_linkedin_url(search_query, location=None, start=0, jobs_per_page=25, base_url=None):
+    base_url = (base_url or LINKEDIN_BASE_URL).rstrip("/") + "/jobs/search?"
+    params = {
+        "keywords": search_query,
+        "location": location if location else "",
+        "position": 1,
+        "pageNum": start // jobs_per_page,
+        "start": start,
+        "sortBy": "DD"  # Most recent
+    }
+    url = base_url + urllib.parse.urlencode({k: v for k, v in params.items() if v})
+    logger.info(f"Constructed URL: {url}")
+    return url
+
+def construct_fragment_url(search_query, location=None, start=0, base_url=None):
+    """URL of the guest "see more jobs" fragment with the results from start onwards"""
+    base_url = (base_url or LINKEDIN_BASE_URL).rstrip("/") + FRAGMENT_PATH + "?"
+    params = {
+        "keywords": search_query,
+        "location": location if location else "",
+        "start": start,
+        "sortBy": "DD"
+    }
+    return base_url + urllib.parse.urlencode({k: v for k, v in params.items() if v})
+
+def is_fragment_url(url):
+    return urllib.parse.urlparse(url).path == FRAGMENT_PATH
+
+def get_pagination_mode(mode=None):
+    mode = mode or SCRAPE_PAGINATION
+    if mode not in PAGINATION_MODES:
+        raise ValueError(f"Unknown pagination mode: {mode}. Choose from: {', '.join(PAGINATION_MODES)}")
+    return mode
+
+def results_page_url(search_query, location, start, jobs_per_page, base_url, pagination):
+    """The full search page for the first page, or a fragment for later ones in fragment mode"""
+    if start > 0 and pagination == "fragment":
+        return construct_fragment_url(search_query, location, start, base_url)
+    return construct_linkedin_url(search_query, location, start, jobs_per_page, base_url)
+
+def parse_job_id(url):
+    """Extract LinkedIn's numeric job ID from a /jobs/view/ URL, or None"""
+    match = JOB_ID_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+def build_job(job_number, fields):
+    """Create a job record from extracted card fields"""
+    return {
+        "id": parse_job_id(fields["url"]) or str(job_number),
+        "title": fields["title"],
+        "company": fields["company"],
+        "location": fields["location"],
+        "description": CARD_DESCRIPTION,
+        "postedDate": datetime.now().strftime("%Y-%m-%d"),
+        "url": fields["url"]
+    }
+
+def card_record_to_fields(record):
+    """Apply the per-card field rules to a raw {title, company, location, url} record"""
+    if not record.get("title"):
+        logger.warning("Could not extract title")
+        return None
+    if not record.get("url"):
+        logger.warning("Could not extract job URL")
+        return None
+    if record.get("company") is None:
+        logger.warning("Could not extract company")
+    if record.get("location") is None:
+        logger.warning("Could not extract location")
+    return {
+        "title": record["title"],
+        "company": record.get("company") or "Not available",
+        "location": record.get("location") or "Not available",
+        "url": record["url"]
+    }
+
+def count_card_events(timer, selector, records):
+    """Count selector fallbacks hit and cards skipped for one page of raw card records"""
+    if selector not in PRIMARY_JOB_CARD_SELECTORS:
+        timer.count("card_selector_fallback")
+    timer.count("link_selector_fallback", sum(1 for record in records if record.get("linkFallback")))
+
+class ScrapeCancelled(Exception):
+    """Raised inside a scrape when its cancel_event is set, e.g. the client went away"""
+
+class NoResultsPage(list):
+    """The (empty) cards of a results page that loaded fine but matched no jobs"""
+
+def wait_for_request_slot(rate_limiter, timer, cancel_event=None):
+    """Take a slot from the shared rate limiter before requesting a page; raises CircuitOpen while paused.
+
+    The run's timer identifies the scrape to the circuit breaker, so a
+    scrape holding the half-open probe can reserve all of its pages.
+    """
+    waited = rate_limiter.acquire(cancel_event, owner=timer.owner)
+    if waited:
+        timer.add_phase("rate_limit", waited)
+        timer.add_wait(waited)
+    if cancel_event is not None and cancel_event.is_set():
+        logger.info("Scrape cancelled. Stopping scraping.")
+        raise ScrapeCancelled()
+
+def record_page_outcome(rate_limiter, offset, found_cards):
+    """Tell the rate limiter how a results page went.
+
+    A first page without cards is how LinkedIn usually serves blocked
+    guests, unless it is a NoResultsPage; an empty later page just means
+    the results ran out.
+    """
+    if found_cards or isinstance(found_cards, NoResultsPage):
+        rate_limiter.record_success()
+    elif offset == 0:
+        rate_limiter.record_block("empty_page")
+
+def add_page_jobs(jobs, seen_ids, page_fields, num_jobs, known_job_ids=None, on_job=None):
+    """Append one page's jobs in rank order, skipping duplicates and known jobs.
+
+    on_job, if given, is called with each job as it is added. Returns True
+    if the page contained a job from known_job_ids.
+    """
+    reached_known_jobs = False
+    for fields in page_fields:
+        if not fields:
+            continue
+        job = build_job(len(jobs) + 1, fields)
+        if job["id"] in seen_ids:
+            continue
+        if known_job_ids and job["id"] in known_job_ids:
+            reached_known_jobs = True
+            continue
+        seen_ids.add(job["id"])
+        jobs.append(job)
+        if on_job:
+            on_job(job)
+        if len(jobs) >= num_jobs:
+            logger.info(f"Reached target of {num_jobs} jobs")
+            break
+    return reached_known_jobs
+
 class LinkedInJobScraper:
-    def __init__(self):
-        self.driver = None
+    def __init__(self, driver=None, extraction_mode="bulk", scroll_cards=False, pacing=None,
+                 page_parallelism=SCRAPE_PAGE_PARALLELISM, base_url=None, block_profile=None,
+                 rate_limiter=None, pagination=None):
+        # A driver passed in (e.g. leased from a DriverPool) belongs to the
+        # caller and is left running when scraping finishes
+        self.driver = driver
+        self.owns_driver = driver is None
         self.jobs_per_page = 25
+        self.base_url = base_url or LINKEDIN_BASE_URL
         self.virtual_display = None
+        # "bulk" reads all cards with one execute_script call, "per_card"
+        # queries each card's fields through separate WebDriver calls
+        if extraction_mode not in ("bulk", "per_card"):
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        self.extraction_mode = extraction_mode
+        self.scroll_cards = scroll_cards
+        # "fast" or "polite" (see pacing.py); defaults to SCRAPE_PACING
+        self.pacing = get_pacing_policy(pacing)
+        self.timer = RunTimer()
+        self.run_stats = None
+        self.page_parallelism = max(1, page_parallelism)
+        # "fragment" or "page"; defaults to SCRAPE_PAGINATION
+        self.pagination = get_pagination_mode(pagination)
+        # Overrides the driver's network blocking profile for this scraper's pages
+        self.block_profile = block_profile
+        # Shared with every other scraper in the process unless one is given
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.on_job = None
+        self.cancel_event = None
 
     def setup_driver(self):
-        try:
-            # Setup virtual display for headless servers
-            if VIRTUAL_DISPLAY_AVAILABLE:
-                try:
-                    logger.info("Setting up virtual display...")
-                    self.virtual_display = Display(visible=0, size=(1920, 1080))
-                    self.virtual_display.start()
-                    logger.info("Virtual display started successfully")
-                except Exception as e:
-                    logger.warning(f"Failed to setup virtual display: {e}")
-                    self.virtual_display = None
-            
-            options = Options()
-            options.add_argument('--headless')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-gpu')
-            options.add_argument('--disable-extensions')
-            options.add_argument('--disable-plugins')
-            options.add_argument('--disable-images')
-            options.add_argument('--disable-javascript')
-            options.add_argument('--blink-settings=imagesEnabled=false')
-            options.add_argument('--remote-debugging-port=9222')
-            options.add_argument('--disable-web-security')
-            options.add_argument('--allow-running-insecure-content')
-            options.add_argument('--disable-features=VizDisplayCompositor')
-            options.add_argument('--window-size=1920,1080')
-            options.add_argument('--start-maximized')
-            
-            # Try multiple Chrome/Chromium binaries with better detection
-            chrome_binaries = [
-                '/usr/bin/chromium-browser',
-                '/usr/bin/chromium',
-                '/usr/bin/google-chrome-stable',
-                '/usr/bin/google-chrome',
-                '/snap/bin/chromium',
-                '/usr/bin/chrome',
-                '/usr/bin/chromium-browser-stable',
-            ]
-            
-            chrome_found = False
-            for binary in chrome_binaries:
-                if os.path.exists(binary):
-                    options.binary_location = binary
-                    chrome_found = True
-                    logger.info(f"Found Chrome/Chromium at: {binary}")
-                    break
-            
-            if not chrome_found:
-                logger.warning("No Chrome/Chromium binary found in standard locations")
-                # Try to find it using which command
-                try:
-                    import subprocess
-                    result = subprocess.run(['which', 'chromium-browser'], capture_output=True, text=True)
-                    if result.returncode == 0:
-                        binary_path = result.stdout.strip()
-                        options.binary_location = binary_path
-                        chrome_found = True
-                        logger.info(f"Found Chrome/Chromium using 'which': {binary_path}")
-                except Exception as e:
-                    logger.warning(f"Could not find Chrome/Chromium using 'which': {e}")
-            
-            if not chrome_found:
-                logger.warning("No Chrome/Chromium binary found, trying default")
-            
-            # Try to use system ChromeDriver first
-            try:
-                logger.info("Trying system ChromeDriver...")
-                # Check if system chromedriver exists
-                chromedriver_paths = [
-                    '/usr/bin/chromedriver',
-                    '/usr/bin/chromium-chromedriver',
-                    '/usr/local/bin/chromedriver'
-                ]
-                
-                chromedriver_found = None
-                for path in chromedriver_paths:
-                    if os.path.exists(path):
-                        chromedriver_found = path
-                        break
-                
-                if chromedriver_found:
-                    logger.info(f"Using system ChromeDriver at: {chromedriver_found}")
-                    service = Service(chromedriver_found)
-                    self.driver = webdriver.Chrome(service=service, options=options)
-                    logger.info("Chrome WebDriver setup successful with system ChromeDriver")
-                else:
-                    raise Exception("No system ChromeDriver found")
-                    
-            except Exception as system_error:
-                logger.warning(f"System ChromeDriver failed: {system_error}")
-                
-                # Fallback: Try webdriver-manager
-                try:
-                    logger.info("Trying webdriver-manager...")
-                    service = Service(ChromeDriverManager().install())
-                    self.driver = webdriver.Chrome(service=service, options=options)
-                    logger.info("Chrome WebDriver setup successful with webdriver-manager")
-                except Exception as wdm_error:
-                    logger.warning(f"WebDriver-manager failed: {wdm_error}")
-                    
-                    # Final fallback: Try without service
-                    try:
-                        logger.info("Trying fallback without service...")
-                        self.driver = webdriver.Chrome(options=options)
-                        logger.info("Chrome WebDriver setup successful without service")
-                    except Exception as final_error:
-                        logger.error(f"All Chrome setup attempts failed: {final_error}")
-                        raise Exception(f"Could not setup Chrome WebDriver. Please install Chrome/Chromium: sudo apt install -y chromium-browser")
-                        
-        except Exception as e:
-            logger.error(f"Failed to setup Chrome WebDriver: {str(e)}")
-            raise
+        with self.timer.phase("setup_driver"):
+            self.virtual_display = start_virtual_display()
+            self.driver = create_chrome_driver()
+        self.owns_driver = True
 
     def construct_linkedin_url(self, search_query, location=None, start=0):
-        base_url = "https://www.linkedin.com/jobs/search?"
-        params = {
-            "keywords": search_query,
-            "location": location if location else "",
-            "position": 1,
-            "pageNum": start // self.jobs_per_page,
-            "start": start,
-            "sortBy": "DD"  # Most recent
-        }
-        url = base_url + urllib.parse.urlencode({k: v for k, v in params.items() if v})
-        logger.info(f"Constructed URL: {url}")
-        return url
+        return construct_linkedin_url(search_query, location, start, self.jobs_per_page, self.base_url)
+
+    def check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            logger.info("Scrape cancelled. Stopping scraping.")
+            raise ScrapeCancelled()
+
+    def pause(self, kind):
+        """Sleep for the pacing policy's delay before the given kind of step"""
+        self.timer.sleep(self.pacing.delay(kind))
 
     def wait_and_get_element(self, by, value, timeout=60, multiple=False):
         try:
-            if multiple:
-                elements = self.driver.find_elements(by, value)
-                return elements
-            else:
-                element = self.driver.find_element(by, value)
-                return element
+            if timeout <= 0:
+                if multiple:
+                    return self.driver.find_elements(by, value)
+                return self.driver.find_element(by, value)
+
+            started = time.monotonic()
+            try:
+                condition = EC.presence_of_all_elements_located if multiple else EC.presence_of_element_located
+                return WebDriverWait(self.driver, timeout).until(condition((by, value)))
+            finally:
+                self.timer.add_wait(time.monotonic() - started)
         except TimeoutException:
             logger.warning(f"Timeout waiting for element: {value}")
-            self.driver.quit()
             return [] if multiple else None
 
+    def navigate(self, url):
+        wait_for_request_slot(self.rate_limiter, self.timer, self.cancel_event)
+        with self.timer.phase("navigation"):
+            if self.driver.capabilities.get("pageLoadStrategy") == "none":
+                # get() returns before the new document replaces the current
+                # one; mark the current one so wait_for_job_cards ignores it
+                self.driver.execute_script("window.__previousPage = true;")
+            self.driver.get(url)
+
+    def check_blocked(self):
+        """Raise ScrapeBlocked if the current tab was redirected to LinkedIn's authwall"""
+        url = self.driver.current_url
+        if is_authwall_url(url):
+            self.rate_limiter.record_block("authwall")
+            raise ScrapeBlocked("authwall", url)
+
+    def is_no_results_page(self):
+        """Whether the current tab is a results page that matched no jobs"""
+        if self.driver.execute_script("return document.querySelector(arguments[0]) !== null;", NO_RESULTS_SELECTOR):
+            logger.info("Search returned no results")
+            self.timer.count("no_results_page")
+            return True
+        return False
+
+    def record_page_bytes(self):
+        num_bytes = page_transfer_bytes(self.driver)
+        if num_bytes is not None:
+            self.timer.record_bytes(num_bytes)
+
+    def wait_for_job_cards(self):
+        """Wait until the document has parsed and any job card selector matches, or we hit the authwall"""
+        started = time.monotonic()
+        try:
+            WebDriverWait(self.driver, self.pacing.page_ready_timeout, poll_frequency=0.2).until(
+                lambda driver: driver.execute_script(
+                    "return !window.__previousPage && (new RegExp(arguments[1]).test(location.pathname) || "
+                    "document.readyState !== 'loading' && "
+                    "arguments[0].concat(arguments[2]).some(selector => document.querySelector(selector) !== null));",
+                    JOB_CARD_SELECTORS, AUTHWALL_PATH_PATTERN.pattern, NO_RESULTS_SELECTOR
+                )
+            )
+            return True
+        except TimeoutException:
+            logger.warning(f"No job cards appeared within {self.pacing.page_ready_timeout} seconds")
+            return False
+        finally:
+            self.timer.add_wait(time.monotonic() - started)
+
+    def fetch_pages_in_tabs(self, urls, retries=2):
+        """Load each URL in its own tab so the pages download concurrently.
+
+        Returns the card fields of each page, in the same order as urls.
+        """
+        main_window = self.driver.current_window_handle
+        names = [f"results-page-{i}" for i in range(len(urls))]
+        try:
+            for _ in urls:
+                wait_for_request_slot(self.rate_limiter, self.timer, self.cancel_event)
+            opened_at = time.monotonic()
+            with self.timer.phase("navigation"):
+                # Resource blocking is per tab, so each tab opens blank and
+                # gets the profile before it navigates
+                for name in names:
+                    self.driver.execute_script("window.open('about:blank', arguments[0]);", name)
+                for url, name in zip(urls, names):
+                    self.driver.switch_to.window(name)
+                    apply_block_profile(self.driver, self.block_profile)
+                    # Assigning location returns immediately, so all tabs load at once
+                    self.driver.execute_script("window.location.href = arguments[0];", url)
+            pages = []
+            for name in names:
+                self.driver.switch_to.window(name)
+                with self.timer.phase("get_job_cards"):
+                    pages.append(self.get_job_card_records(retries=retries))
+                self.timer.record_page(time.monotonic() - opened_at)
+                self.record_page_bytes()
+            return pages
+        finally:
+            for handle in self.driver.window_handles:
+                if handle != main_window:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+            self.driver.switch_to.window(main_window)
+
+    def fetch_batch_in_tabs(self, search_query, location, offsets):
+        urls = [self.construct_linkedin_url(search_query, location, offset) for offset in offsets]
+        logger.info(f"Fetching {len(urls)} result pages in parallel tabs")
+        return self.fetch_pages_in_tabs(urls)
+
+    def load_results_page(self, url, retries=2):
+        """Navigate the current tab to a full results page and extract its cards"""
+        page_started = time.monotonic()
+        self.navigate(url)
+        self.pause("navigation")
+        with self.timer.phase("get_job_cards"):
+            page_fields = self.get_job_card_records(retries=retries)
+        self.timer.record_page(time.monotonic() - page_started)
+        self.record_page_bytes()
+        return page_fields
+
+    def fetch_fragments(self, urls):
+        """Fetch "see more jobs" fragments concurrently from inside the current page.
+
+        Returns the card fields of each fragment, in the same order as urls,
+        or None for a fragment that couldn't be fetched.
+        """
+        fields = {
+            "title": TITLE_SELECTOR,
+            "company": COMPANY_SELECTOR,
+            "location": LOCATION_SELECTOR,
+            "link": LINK_SELECTOR,
+            "fallbackLink": FALLBACK_LINK_SELECTOR
+        }
+        for _ in urls:
+            wait_for_request_slot(self.rate_limiter, self.timer, self.cancel_event)
+        with self.timer.phase("fetch_fragment"):
+            responses = self.driver.execute_async_script(FETCH_FRAGMENTS_SCRIPT, urls, JOB_CARD_SELECTORS, fields)
+
+        pages = []
+        for url, response in zip(urls, responses):
+            status = response["status"]
+            if status in RATE_LIMIT_STATUS_CODES:
+                self.rate_limiter.record_block("rate_limited")
+                raise ScrapeBlocked("rate_limited", url)
+            if is_authwall_url(response.get("url")):
+                self.rate_limiter.record_block("authwall")
+                raise ScrapeBlocked("authwall", response["url"])
+            if status in (400, 404):
+                # The endpoint's way of saying the results ran out
+                pages.append([])
+                continue
+            if not response.get("result"):
+                logger.warning(f"Could not fetch results fragment {url}: {response.get('error') or f'HTTP {status}'}")
+                pages.append(None)
+                continue
+            self.timer.record_page(response["seconds"])
+            self.timer.record_bytes(response["bytes"])
+            result = response["result"]
+            if result["cards"]:
+                count_card_events(self.timer, result["selector"], result["cards"])
+            pages.append([card_record_to_fields(record) for record in result["cards"]])
+        return pages
+
+    def fetch_batch_with_fragments(self, search_query, location, offsets):
+        """Load the first results page in the browser, then fetch the rest as fragments from inside it.
+
+        A fragment that fails is loaded as a full page instead.
+        """
+        pages = {}
+        fragment_offsets = [offset for offset in offsets if offset > 0]
+        if len(fragment_offsets) < len(offsets):
+            pages[0] = self.load_results_page(self.construct_linkedin_url(search_query, location, 0))
+        if fragment_offsets:
+            urls = [construct_fragment_url(search_query, location, offset, self.base_url) for offset in fragment_offsets]
+            logger.info(f"Fetching {len(urls)} result pages as fragments")
+            for offset, page_fields in zip(fragment_offsets, self.fetch_fragments(urls)):
+                if page_fields is None:
+                    self.timer.count("fragment_fallback")
+                    page_fields = self.load_results_page(self.construct_linkedin_url(search_query, location, offset))
+                pages[offset] = page_fields
+        return [pages[offset] for offset in offsets]
+
+    def scrape_page_batches(self, search_query, location, num_jobs, known_job_ids, fetch_batch):
+        """Fetch result pages page_parallelism at a time with fetch_batch, merging in rank order.
+
+        fetch_batch(search_query, location, offsets) returns the card fields
+        of each page: fetch_batch_in_tabs or fetch_batch_with_fragments.
+        """
+        jobs = []
+        seen_ids = set()
+        start = 0
+        pages_without_new_jobs = 0
+        max_pages_without_new_jobs = 2
+        start_time = time.time()
+        timeout = 60
+
+        while len(jobs) < num_jobs and pages_without_new_jobs < max_pages_without_new_jobs:
+            self.check_cancelled()
+            if time.time() - start_time > timeout:
+                logger.info("Timeout reached (60 seconds). Stopping scraping.")
+                break
+
+            # Only open as many pages as could still be needed
+            pages_needed = -(-(num_jobs - len(jobs)) // self.jobs_per_page)
+            offsets = [start + i * self.jobs_per_page for i in range(min(self.page_parallelism, pages_needed))]
+
+            reached_known_jobs = False
+            for offset, page_fields in zip(offsets, fetch_batch(search_query, location, offsets)):
+                self.check_cancelled()
+                page_number = offset // self.jobs_per_page + 1
+                record_page_outcome(self.rate_limiter, offset, page_fields)
+                if not page_fields:
+                    logger.warning(f"No job cards found on page {page_number}")
+                    pages_without_new_jobs += 1
+                    continue
+
+                initial_jobs_count = len(jobs)
+                logger.info(f"Found {len(page_fields)} job cards on page {page_number}")
+                self.timer.count("cards_skipped", page_fields.count(None))
+                reached_known_jobs = add_page_jobs(
+                    jobs, seen_ids, page_fields, num_jobs, known_job_ids, self.on_job
+                )
+                if len(jobs) == initial_jobs_count:
+                    pages_without_new_jobs += 1
+                else:
+                    pages_without_new_jobs = 0
+
+                if len(jobs) >= num_jobs or reached_known_jobs:
+                    break
+
+            if reached_known_jobs:
+                logger.info("Reached jobs already stored for this search. Stopping scraping.")
+                break
+
+            start = offsets[-1] + self.jobs_per_page
+            if len(jobs) < num_jobs:
+                self.pause("page")
+
+        logger.info(f"Completed scraping with {len(jobs)} jobs found")
+        return jobs
+
     def scroll_to_element(self, element):
         self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        time.sleep(random.uniform(1, 2))  # Random delay to appear more human-like
 
     def get_job_cards(self, retries=3):
         while retries > 0:
             try:
+                self.wait_for_job_cards()
+                self.check_blocked()
+
                 # Try different selectors for job cards
-                selectors = [
-                    "div.job-card-container",
-                    "li.jobs-search-results__list-item",
-                    "div.base-card",
-                    "div.job-search-card"
-                ]
-                
-                for selector in selectors:
+                for selector in JOB_CARD_SELECTORS:
                     job_cards = self.wait_and_get_element(
                         By.CSS_SELECTOR, 
                         selector,
+                        timeout=0,
                         multiple=True
                     )
                     if job_cards:
                         logger.info(f"Found job cards using selector: {selector}")
-
+                        count_card_events(self.timer, selector, [])
                         return job_cards
-                
+                if self.is_no_results_page():
+                    return NoResultsPage()
+
                 retries -= 1
-                time.sleep(random.uniform(2, 3))
+                if retries > 0:
+                    self.pause("retry")
+            except ScrapeBlocked:
+                # Retrying the same page won't get past a block
+                raise
             except Exception as e:
                 logger.error(f"Error finding job cards: {e}")
                 retries -= 1
         return []
 
-    def scrape_jobs(self, search_query, location=None, num_jobs=8):
+    def get_job_card_records(self, retries=3):
+        """Extract the fields of every job card on the page in one round trip"""
+        fields = {
+            "title": TITLE_SELECTOR,
+            "company": COMPANY_SELECTOR,
+            "location": LOCATION_SELECTOR,
+            "link": LINK_SELECTOR,
+            "fallbackLink": FALLBACK_LINK_SELECTOR
+        }
+        while retries > 0:
+            try:
+                self.wait_for_job_cards()
+                self.check_blocked()
+                result = self.driver.execute_script(
+                    EXTRACT_CARDS_SCRIPT, JOB_CARD_SELECTORS, fields, self.scroll_cards
+                )
+                if result and result["cards"]:
+                    logger.info(f"Found job cards using selector: {result['selector']}")
+                    count_card_events(self.timer, result["selector"], result["cards"])
+                    return [card_record_to_fields(record) for record in result["cards"]]
+                if self.is_no_results_page():
+                    return NoResultsPage()
+
+                retries -= 1
+                if retries > 0:
+                    self.pause("retry")
+            except ScrapeBlocked:
+                # Retrying the same page won't get past a block
+                raise
+            except Exception as e:
+                logger.error(f"Error extracting job cards: {e}")
+                retries -= 1
+        return []
+
+    def extract_card_fields(self, card):
+        """Extract title, company, location and URL from a single card element"""
+        if self.scroll_cards:
+            self.scroll_to_element(card)
+            self.pause("card")
+
+        # Extract job details with better error handling
+        title = company = location_text = "Not available"
+        job_link = None
+
+        try:
+            title_elem = card.find_element(By.CSS_SELECTOR, TITLE_SELECTOR)
+            title = title_elem.text.strip()
+        except Exception as e:
+            logger.warning(f"Could not extract title: {e}")
+            return None
+
+        try:
+            company_elem = card.find_element(By.CSS_SELECTOR, COMPANY_SELECTOR)
+            company = company_elem.text.strip()
+        except Exception as e:
+            logger.warning(f"Could not extract company: {e}")
+
+        try:
+            location_elem = card.find_element(By.CSS_SELECTOR, LOCATION_SELECTOR)
+            location_text = location_elem.text.strip()
+        except Exception as e:
+            logger.warning(f"Could not extract location: {e}")
+
+        # Get job link without clicking
+        try:
+            link_elem = card.find_element(By.CSS_SELECTOR, LINK_SELECTOR)
+            job_link = link_elem.get_attribute('href')
+        except Exception:
+            try:
+                # Fallback: try to find any link in the card
+                link_elem = card.find_element(By.CSS_SELECTOR, FALLBACK_LINK_SELECTOR)
+                job_link = link_elem.get_attribute('href')
+                self.timer.count("link_selector_fallback")
+            except Exception as e:
+                logger.warning(f"Could not extract job URL: {e}")
+                return None
+
+        if not job_link:
+            return None
+
+        return {"title": title, "company": company, "location": location_text, "url": job_link}
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        """Scrape up to num_jobs jobs, most recent first.
+
+        With known_job_ids (incremental mode), known jobs are skipped and
+        pagination stops after the first page that contains one, since
+        results are sorted by date and everything after it was seen before.
+        on_job is called with each job as soon as it is parsed, and setting
+        cancel_event (a threading.Event) aborts with ScrapeCancelled. Phase
+        timings and counters are recorded on timer (a new RunTimer by default).
+        """
+        self.timer = timer or RunTimer()
+        self.on_job = on_job
+        self.cancel_event = cancel_event
         try:
             if not self.driver:
                 self.setup_driver()
+            if self.block_profile:
+                apply_block_profile(self.driver, self.block_profile)
+
+            # Several result pages are needed: fetch the later ones as
+            # fragments, or load them concurrently in tabs
+            if self.extraction_mode == "bulk" and num_jobs > self.jobs_per_page:
+                if self.pagination == "fragment":
+                    return self.scrape_page_batches(
+                        search_query, location, num_jobs, known_job_ids, self.fetch_batch_with_fragments
+                    )
+                if self.page_parallelism > 1:
+                    return self.scrape_page_batches(
+                        search_query, location, num_jobs, known_job_ids, self.fetch_batch_in_tabs
+                    )
 
             jobs = []
             start = 0
@@ -224,18 +779,28 @@ class LinkedInJobScraper:
             timeout = 60  # 90 seconds timeout
 
             while len(jobs) < num_jobs and pages_without_new_jobs < max_pages_without_new_jobs:
+                self.check_cancelled()
+
                 # Check if timeout reached
                 if time.time() - start_time > timeout:
                     logger.info("Timeout reached (60 seconds). Stopping scraping.")
                     break
 
                 url = self.construct_linkedin_url(search_query, location, start)
-                self.driver.get(url)
-                time.sleep(random.uniform(2, 3))
+                page_started = time.monotonic()
+                self.navigate(url)
+                self.pause("navigation")
 
                 # Get initial job cards
-                job_cards = self.get_job_cards(retries=max_retries_per_page)
-                
+                with self.timer.phase("get_job_cards"):
+                    if self.extraction_mode == "bulk":
+                        job_cards = self.get_job_card_records(retries=max_retries_per_page)
+                    else:
+                        job_cards = self.get_job_cards(retries=max_retries_per_page)
+                self.timer.record_page(time.monotonic() - page_started)
+                self.record_page_bytes()
+                record_page_outcome(self.rate_limiter, start, job_cards)
+
                 if not job_cards:
                     logger.warning(f"No job cards found on page {start // self.jobs_per_page + 1}")
                     pages_without_new_jobs += 1
@@ -245,73 +810,42 @@ class LinkedInJobScraper:
                 initial_jobs_count = len(jobs)
                 logger.info(f"Found {len(job_cards)} job cards on page {start // self.jobs_per_page + 1}")
 
-                # Process only enough cards to reach num_jobs
-                cards_to_process = min(len(job_cards), num_jobs - len(jobs))
+                # Process only enough cards to reach num_jobs (in incremental
+                # mode known cards don't count, so look at all of them)
+                if known_job_ids:
+                    cards_to_process = len(job_cards)
+                else:
+                    cards_to_process = min(len(job_cards), num_jobs - len(jobs))
                 logger.info(f"Processing {cards_to_process} cards to reach target of {num_jobs} jobs")
+                reached_known_jobs = False
 
                 for i in range(cards_to_process):
+                    self.check_cancelled()
+
                     # Check timeout again for each card
                     if time.time() - start_time > timeout:
                         logger.info("Timeout reached (60 seconds). Stopping scraping.")
                         break
 
                     try:
-                        card = job_cards[i]
-                        self.scroll_to_element(card)
-                        time.sleep(random.uniform(0.5, 1))
-                        
-                        # Extract job details with better error handling
-                        title = company = location_text = "Not available"
-                        job_link = None
-                        
-                        try:
-                            title_elem = card.find_element(By.CSS_SELECTOR, "h3.base-search-card__title, h3.job-card-list__title")
-                            title = title_elem.text.strip()
-                        except Exception as e:
-                            logger.warning(f"Could not extract title: {e}")
+                        if self.extraction_mode == "bulk":
+                            fields = job_cards[i]
+                        else:
+                            with self.timer.phase("card_extraction"):
+                                fields = self.extract_card_fields(job_cards[i])
+                        if not fields:
+                            self.timer.count("cards_skipped")
                             continue
 
-                        try:
-                            company_elem = card.find_element(By.CSS_SELECTOR, "h4.base-search-card__subtitle, h4.job-card-container__company-name")
-                            company = company_elem.text.strip()
-                        except Exception as e:
-                            logger.warning(f"Could not extract company: {e}")
-
-                        try:
-                            location_elem = card.find_element(By.CSS_SELECTOR, "span.job-search-card__location, div.job-card-container__metadata-item")
-                            location_text = location_elem.text.strip()
-                        except Exception as e:
-                            logger.warning(f"Could not extract location: {e}")
-
-                        # Get job link without clicking
-                        try:
-                            link_elem = card.find_element(By.CSS_SELECTOR, "a.base-card__full-link, a.job-card-list__title-link")
-                            job_link = link_elem.get_attribute('href')
-                        except Exception:
-                            try:
-                                # Fallback: try to find any link in the card
-                                link_elem = card.find_element(By.CSS_SELECTOR, "a[href*='/jobs/view/']")
-                                job_link = link_elem.get_attribute('href')
-                            except Exception as e:
-                                logger.warning(f"Could not extract job URL: {e}")
-                                continue
-
-                        if not job_link:
+                        job = build_job(len(jobs) + 1, fields)
+                        if known_job_ids and job["id"] in known_job_ids:
+                            reached_known_jobs = True
                             continue
-
-                        # Create job object without description (since we're not clicking)
-                        job = {
-                            "id": str(len(jobs) + 1),
-                            "title": title,
-                            "company": company,
-                            "location": location_text,
-                            "description": "Click the link to view full job description on LinkedIn",
-                            "postedDate": datetime.now().strftime("%Y-%m-%d"),
-                            "url": job_link
-                        }
                         
                         logger.info(f"Scraped job {len(jobs) + 1}/{num_jobs}: {job['title']} at {job['company']}")
                         jobs.append(job)
+                        if self.on_job:
+                            self.on_job(job)
 
                         if len(jobs) >= num_jobs:
                             logger.info(f"Reached target of {num_jobs} jobs")
@@ -329,26 +863,26 @@ class LinkedInJobScraper:
                 if len(jobs) >= num_jobs:
                     break
 
+                if reached_known_jobs:
+                    logger.info("Reached jobs already stored for this search. Stopping scraping.")
+                    break
+
                 start += self.jobs_per_page
-                time.sleep(random.uniform(1.5, 2))
+                self.pause("page")
 
             logger.info(f"Completed scraping with {len(jobs)} jobs found")
             return jobs
 
         finally:
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except Exception as e:
-                    logger.error(f"Error closing WebDriver: {str(e)}")
-            
-            # Clean up virtual display
-            if self.virtual_display:
-                try:
-                    self.virtual_display.stop()
-                    logger.info("Virtual display stopped")
-                except Exception as e:
-                    logger.error(f"Error stopping virtual display: {str(e)}")
+            if self.owns_driver:
+                with self.timer.phase("teardown"):
+                    self.cleanup()
+            self.run_stats = self.timer.summary()
+            logger.info(
+                f"Scrape took {self.run_stats['total_seconds']:.2f}s: "
+                f"{self.run_stats['wait_seconds']:.2f}s waiting, {self.run_stats['work_seconds']:.2f}s working "
+                f"({self.pacing.name} pacing)"
+            )
 
     def cleanup(self):
         """Clean up resources"""
@@ -358,6 +892,7 @@ class LinkedInJobScraper:
                 logger.info("WebDriver closed")
             except Exception as e:
                 logger.error(f"Error closing WebDriver: {str(e)}")
+            self.driver = None
         
         if self.virtual_display:
             try:
@@ -365,13 +900,28 @@ class LinkedInJobScraper:
                 logger.info("Virtual display stopped")
             except Exception as e:
                 logger.error(f"Error stopping virtual display: {str(e)}")
+            self.virtual_display = None
 
     def save_to_file(self, jobs, filename="jobs.json"):
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump({"jobs": jobs}, f, indent=2, ensure_ascii=False)
 
 if __name__ == "__main__":
+    # One search; bulk_scrape.py runs a file of them with workers and checkpoints
+    import argparse
+    from exporters import open_exporter
+
+    parser = argparse.ArgumentParser(description="Scrape one LinkedIn job search")
+    parser.add_argument("query", nargs="?", default="python developer")
+    parser.add_argument("location", nargs="?", default="Remote")
+    parser.add_argument("--num-jobs", type=int, default=8)
+    parser.add_argument("--output", "-o", default="jobs.ndjson", help="Output file (.ndjson, .csv) or directory (.parquet)")
+    args = parser.parse_args()
+
     scraper = LinkedInJobScraper()
-    jobs = scraper.scrape_jobs("python developer", "Remote")
-    scraper.save_to_file(jobs)
+    with open_exporter(args.output) as exporter:
+        jobs = scraper.scrape_jobs(
+            args.query, args.location, args.num_jobs,
+            on_job=lambda job: exporter.write({**job, "query": args.query, "searchLocation": args.location}),
+        )
     print(f"Scraped {len(jobs)} jobs successfully!") 
\ No newline at end of file
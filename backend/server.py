@@ -1,7 +1,25 @@
+import asyncio
+import json
 import logging
+import os
+import threading
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from scraper import LinkedInJobScraper
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from dedupe import JobDeduper
+from driver_pool import DRIVER_POOL_MAX_SIZE, DriverPool, DriverPoolTimeout
+from engines import SCRAPE_ENGINE, create_engines
+from enrichment import JobEnricher
+from metrics import (
+    DRIVER_POOL_SIZE, JOB_SEARCH_REQUESTS, JOB_SEARCH_SECONDS, SCRAPE_CIRCUIT_OPEN, SCRAPE_QUEUE_DEPTH,
+    SCRAPE_REQUEST_RATE, SCRAPE_RUNNING
+)
+from rate_limiter import CircuitOpen, get_rate_limiter
+from result_cache import RESULT_CACHE_PATH, ResultCache, SharedResultCache
+from job_store import JobStore
+from scrape_executor import ScrapeExecutor, ScrapeQueueFull
+from timing import RunTimer
 from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime
@@ -13,7 +31,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+BATCH_MAX_SEARCHES = int(os.environ.get("BATCH_MAX_SEARCHES", "50"))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", "4"))
+INDEX_SEARCH_MAX_LIMIT = int(os.environ.get("INDEX_SEARCH_MAX_LIMIT", "100"))
+# Server processes started by `python server.py`; with more than one they
+# share the result cache and a machine-wide browser limit
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", "1"))
+
 app = FastAPI()
+# Built by create_app() in the process that serves requests, so the
+# multi-worker launcher and its re-imports of this file start none of them
+driver_pool = None
+scrape_executor = None
+engines = None
+result_cache = None
+job_store = None
+enricher = None
+deduper = None
+rate_limiter = None
+
+
+def create_app():
+    """Build the browser pool, scrape executor, caches and stores; returns the app.
+
+    uvicorn calls it once in each worker (factory=True).
+    """
+    global driver_pool, scrape_executor, engines, result_cache, job_store, enricher, deduper, rate_limiter
+    if driver_pool is not None:
+        return app
+    driver_pool = DriverPool()
+    scrape_executor = ScrapeExecutor()
+    engines = create_engines(driver_pool)
+    result_cache = SharedResultCache() if RESULT_CACHE_PATH else ResultCache()
+    job_store = JobStore()
+    enricher = JobEnricher(job_store)
+    deduper = JobDeduper(job_store)
+    rate_limiter = get_rate_limiter()
+
+    # Gauges are read from the live objects whenever /metrics is scraped
+    SCRAPE_QUEUE_DEPTH.set_function(lambda: scrape_executor.stats()["queued"])
+    SCRAPE_RUNNING.set_function(lambda: scrape_executor.stats()["running"])
+    DRIVER_POOL_SIZE.labels(state="idle").set_function(lambda: driver_pool.stats()["idle"])
+    DRIVER_POOL_SIZE.labels(state="in_use").set_function(lambda: driver_pool.stats()["in_use"])
+    SCRAPE_REQUEST_RATE.set_function(lambda: rate_limiter.rate)
+    SCRAPE_CIRCUIT_OPEN.set_function(lambda: 1 if rate_limiter.breaker.stats()["retry_after"] > 0 else 0)
+    return app
 
 # Add CORS middleware
 app.add_middleware(
@@ -28,6 +90,10 @@ class JobSearchRequest(BaseModel):
     query: str
     location: Optional[str] = None
     num_jobs: Optional[int] = 10
+    engine: Optional[str] = None  # "auto", "http" or "selenium"; defaults to SCRAPE_ENGINE
+    incremental: bool = False  # Only return jobs posted since this search was last scraped
+    include_timings: bool = False  # Add the scrape's per-phase timing breakdown to the response
+    enrich: bool = False  # Fetch each job's detail page for description, seniority, employment type and posted date
 
 class Job(BaseModel):
     id: str
@@ -37,6 +103,16 @@ class Job(BaseModel):
     description: str
     postedDate: str
     url: str
+    seniority: Optional[str] = None  # Only set on enriched jobs
+    employmentType: Optional[str] = None
+    clusterId: Optional[str] = None  # Shared by near-duplicate postings, across searches and runs
+
+class CacheInfo(BaseModel):
+    status: str  # "hit", "stale", "coalesced", "miss", or "circuit_open" for old results served while scraping is paused
+    hits: int
+    stale_hits: int
+    coalesced: int
+    misses: int
 
 class JobSearchResponse(BaseModel):
     jobs: List[Job]
@@ -44,54 +120,500 @@ class JobSearchResponse(BaseModel):
     search_time: float
     query: str
     location: Optional[str]
+    queue_time: Optional[float] = None
+    cache: Optional[CacheInfo] = None
+    timings: Optional[dict] = None  # Only when include_timings is set and this request scraped
+
+class IndexSearchResponse(BaseModel):
+    jobs: List[Job]
+    total_results: int  # Matches across all pages
+    next_cursor: Optional[str]  # Pass as cursor to get the next page; null on the last page
+    search_time: float
+    query: Optional[str]
+    location: Optional[str]
+
+class BatchSearchRequest(BaseModel):
+    searches: List[JobSearchRequest]
+    max_concurrency: Optional[int] = None  # Capped at BATCH_MAX_CONCURRENCY
+
+class BatchQueryResult(BaseModel):
+    query: str
+    location: Optional[str]
+    job_ids: List[str]  # This search's jobs, in rank order, as ids into BatchSearchResponse.jobs
+    total_results: int
+    search_time: float
+    queue_time: Optional[float] = None
+    cache: Optional[CacheInfo] = None
+    error: Optional[str] = None
+
+class BatchSearchResponse(BaseModel):
+    results: List[BatchQueryResult]
+    jobs: List[Job]  # Every search's jobs merged, duplicates removed
+    total_results: int
+    duplicates_removed: int
+    near_duplicates: int  # Merged jobs whose clusterId an earlier merged job already has
+    search_time: float
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting up the FastAPI server...")
+    # Pre-start browsers so requests don't pay for Chrome cold start, without
+    # holding up startup; GET /ready reports when they're warm
+    driver_pool.start_in_background()
+    # Cluster jobs stored before near-duplicate detection existed
+    deduper.start_backfill()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Shutting down the FastAPI server...")
+    scrape_executor.shutdown()
+    enricher.shutdown()
+    deduper.shutdown()
+    driver_pool.close()
+    job_store.close()
+
+def run_scrape(request: JobSearchRequest, num_jobs: int, on_job=None, cancel_event=None, timer=None):
+    """Blocking scrape with the requested engine; runs on a scrape executor thread"""
+    engine = engines[request.engine or SCRAPE_ENGINE]
+    known_job_ids = None
+    if request.incremental:
+        known_job_ids = job_store.known_job_ids(request.query, request.location)
+        logger.info(f"Incremental scrape, {len(known_job_ids)} jobs already stored for this search")
+    jobs = engine.scrape_jobs(
+        search_query=request.query,
+        location=request.location,
+        num_jobs=num_jobs,
+        known_job_ids=known_job_ids,
+        on_job=on_job,
+        cancel_event=cancel_event,
+        timer=timer
+    )
     try:
-        # Test the scraper setup
-        scraper = LinkedInJobScraper()
-        scraper.setup_driver()
-        logger.info("Selenium WebDriver setup successful")
+        new_ids = job_store.save_jobs(jobs, request.query, request.location)
+        logger.info(f"Stored {len(jobs)} jobs, {len(new_ids)} new")
     except Exception as e:
-        logger.error(f"Failed to setup WebDriver: {str(e)}")
-        raise
+        logger.error(f"Failed to store jobs: {str(e)}")
+    return deduper.annotate(jobs)
+
+def circuit_open_fallback(request: JobSearchRequest):
+    """Old results for a search while scraping is paused: cached ones however old, else the job store's"""
+    if request.incremental:
+        return None
+    jobs = result_cache.peek(request.query, request.location, request.num_jobs)
+    if jobs is None:
+        jobs = job_store.get_search_results(request.query, request.location, request.num_jobs) or None
+    return jobs
+
+def validate_engine(request: JobSearchRequest):
+    if request.engine and request.engine not in engines:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown engine: {request.engine}. Choose from: {', '.join(engines)}"
+        )
+
+async def execute_search(request: JobSearchRequest) -> JobSearchResponse:
+    """Run one search through the result cache and scrape executor"""
+    start_time = datetime.now()
+    queue_time = None
+    timer = None
+
+    async def load(num_jobs):
+        nonlocal queue_time, timer
+        # Fail fast instead of queueing a scrape that would be turned away
+        await asyncio.to_thread(rate_limiter.breaker.raise_if_open)
+        timer = RunTimer()
+        jobs, queue_time = await scrape_executor.run(run_scrape, request, num_jobs, timer=timer)
+        return jobs
+
+    if request.incremental:
+        # The delta depends on what's stored, so it can't come from the cache
+        jobs = await load(request.num_jobs)
+        cache_info = None
+    else:
+        try:
+            jobs, cache_status = await result_cache.get_or_load(
+                request.query, request.location, request.num_jobs, load
+            )
+        except CircuitOpen:
+            jobs = await asyncio.to_thread(circuit_open_fallback, request)
+            if jobs is None:
+                raise
+            logger.warning(f"Scraping is paused; serving {len(jobs)} previously scraped jobs")
+            cache_status = "circuit_open"
+        cache_info = CacheInfo(
+            status=cache_status,
+            hits=result_cache.hits,
+            stale_hits=result_cache.stale_hits,
+            coalesced=result_cache.coalesced,
+            misses=result_cache.misses
+        )
+
+    if request.enrich:
+        # Cached results are enriched too; details already fetched come from the job store
+        jobs = await asyncio.to_thread(enricher.enrich, jobs, timer)
+        # Descriptions make clustering more precise, so enriched jobs are clustered again
+        jobs = await asyncio.to_thread(deduper.annotate, jobs)
+    search_time = (datetime.now() - start_time).total_seconds()
+    
+    logger.info(f"Successfully scraped {len(jobs)} jobs in {search_time:.2f} seconds")
+
+    timings = None
+    if request.include_timings and timer is not None:
+        timings = timer.summary()
+        if queue_time is not None:
+            timings["queue_seconds"] = round(queue_time, 3)
+
+    return JobSearchResponse(
+        jobs=jobs,
+        total_results=len(jobs),
+        search_time=search_time,
+        query=request.query,
+        location=request.location,
+        queue_time=queue_time,
+        cache=cache_info,
+        timings=timings
+    )
 
 @app.post("/jobs/", response_model=JobSearchResponse)
 async def search_jobs(request: JobSearchRequest):
     logger.info(f"Received job search request - Query: {request.query}, Location: {request.location}")
+    validate_engine(request)
     
     try:
-        start_time = datetime.now()
-        scraper = LinkedInJobScraper()
-        jobs = scraper.scrape_jobs(
-            search_query=request.query,
-            location=request.location,
-            num_jobs=request.num_jobs
-        )
-        search_time = (datetime.now() - start_time).total_seconds()
-        
-        logger.info(f"Successfully scraped {len(jobs)} jobs in {search_time:.2f} seconds")
-        
-        return JobSearchResponse(
-            jobs=jobs,
-            total_results=len(jobs),
-            search_time=search_time,
-            query=request.query,
-            location=request.location
+        with JOB_SEARCH_SECONDS.labels(endpoint="jobs").time():
+            response = await execute_search(request)
+        JOB_SEARCH_REQUESTS.labels(endpoint="jobs", outcome="success").inc()
+        return response
+    except ScrapeQueueFull as e:
+        logger.warning(f"Rejecting job search request: {str(e)}")
+        JOB_SEARCH_REQUESTS.labels(endpoint="jobs", outcome="rejected").inc()
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
         )
+    except DriverPoolTimeout as e:
+        logger.warning(f"No browser available: {str(e)}")
+        JOB_SEARCH_REQUESTS.labels(endpoint="jobs", outcome="rejected").inc()
+        raise HTTPException(status_code=503, detail=str(e))
+    except CircuitOpen as e:
+        logger.warning(f"Rejecting job search request: {str(e)}")
+        JOB_SEARCH_REQUESTS.labels(endpoint="jobs", outcome="rejected").inc()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         logger.error(f"Error during job scraping: {str(e)}")
+        JOB_SEARCH_REQUESTS.labels(endpoint="jobs", outcome="error").inc()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch jobs: {str(e)}"
         )
 
+@app.post("/jobs/batch", response_model=BatchSearchResponse)
+async def batch_search_jobs(batch: BatchSearchRequest):
+    """Run many searches over the shared workers and merge their jobs without duplicates.
+
+    A failed search is reported in its own result and doesn't fail the batch.
+    """
+    logger.info(f"Received batch job search request with {len(batch.searches)} searches")
+    if not batch.searches:
+        raise HTTPException(status_code=400, detail="At least one search is required")
+    if len(batch.searches) > BATCH_MAX_SEARCHES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {BATCH_MAX_SEARCHES} searches"
+        )
+    for request in batch.searches:
+        validate_engine(request)
+
+    start_time = datetime.now()
+    limit = min(batch.max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run_one(request: JobSearchRequest):
+        async with semaphore:
+            query_start = datetime.now()
+            try:
+                return await execute_search(request), None, 0.0
+            except Exception as e:
+                logger.error(f"Batch search failed - Query: {request.query}, Location: {request.location}: {str(e)}")
+                return None, str(e), (datetime.now() - query_start).total_seconds()
+
+    outcomes = await asyncio.gather(*(run_one(request) for request in batch.searches))
+
+    merged = {}
+    results = []
+    for request, (response, error, failed_after) in zip(batch.searches, outcomes):
+        if response is None:
+            results.append(BatchQueryResult(
+                query=request.query,
+                location=request.location,
+                job_ids=[],
+                total_results=0,
+                search_time=failed_after,
+                error=error
+            ))
+            continue
+        for job in response.jobs:
+            merged.setdefault(job.id, job)
+        results.append(BatchQueryResult(
+            query=request.query,
+            location=request.location,
+            job_ids=[job.id for job in response.jobs],
+            total_results=response.total_results,
+            search_time=response.search_time,
+            queue_time=response.queue_time,
+            cache=response.cache
+        ))
+
+    scraped = sum(result.total_results for result in results)
+    clusters = {job.clusterId for job in merged.values() if job.clusterId}
+    near_duplicates = sum(1 for job in merged.values() if job.clusterId) - len(clusters)
+    search_time = (datetime.now() - start_time).total_seconds()
+    JOB_SEARCH_SECONDS.labels(endpoint="batch").observe(search_time)
+    JOB_SEARCH_REQUESTS.labels(endpoint="batch", outcome="success").inc()
+    logger.info(f"Batch finished in {search_time:.2f} seconds: {len(merged)} unique jobs from {scraped} results")
+    return BatchSearchResponse(
+        results=results,
+        jobs=list(merged.values()),
+        total_results=len(merged),
+        duplicates_removed=scraped - len(merged),
+        near_duplicates=near_duplicates,
+        search_time=search_time
+    )
+
+def format_stream_event(event_type: str, data: dict, stream_format: str) -> str:
+    if stream_format == "sse":
+        return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"type": event_type, **data}) + "\n"
+
+@app.post("/jobs/stream")
+async def stream_jobs(request: JobSearchRequest, format: str = "ndjson"):
+    """Stream each job as soon as it is parsed, then a summary event.
+
+    format is "ndjson" (one JSON object per line, with a "type" field) or
+    "sse" (Server-Sent Events). Searches go through the result cache like
+    /jobs/, so identical streams share one scrape; jobs that come from the
+    cache or another request's scrape arrive all at once. If the client
+    disconnects, an incremental scrape is cancelled and its browser returned
+    to the pool, while a cached search's scrape finishes to fill the cache.
+    """
+    logger.info(f"Received streaming job search request - Query: {request.query}, Location: {request.location}")
+    validate_engine(request)
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    if request.enrich:
+        # Jobs are sent before their detail pages could be fetched
+        raise HTTPException(status_code=400, detail="enrich is not supported when streaming; use /jobs/")
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    start_time = datetime.now()
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    cancel_event = threading.Event()
+    timer = None
+    queue_time = None
+
+    def on_job(job):
+        loop.call_soon_threadsafe(events.put_nowait, job)
+
+    async def load(num_jobs):
+        nonlocal timer, queue_time
+        # Fail fast instead of queueing a scrape that would be turned away
+        await asyncio.to_thread(rate_limiter.breaker.raise_if_open)
+        timer = RunTimer()
+        jobs, queue_time = await scrape_executor.run(
+            run_scrape, request, num_jobs, on_job=on_job, cancel_event=cancel_event, timer=timer
+        )
+        return jobs
+
+    async def lookup():
+        if request.incremental:
+            # The delta depends on what's stored, so it can't come from the cache
+            return await load(request.num_jobs), None
+        try:
+            return await result_cache.get_or_load(request.query, request.location, request.num_jobs, load)
+        except CircuitOpen:
+            jobs = await asyncio.to_thread(circuit_open_fallback, request)
+            if jobs is None:
+                raise
+            logger.warning(f"Scraping is paused; streaming {len(jobs)} previously scraped jobs")
+            return jobs, "circuit_open"
+
+    search = asyncio.ensure_future(lookup())
+    # Jobs are queued with call_soon_threadsafe before the scrape returns, so
+    # this sentinel always arrives after the last job
+    search.add_done_callback(lambda _: events.put_nowait(None))
+
+    def stop_search():
+        if search.done():
+            return
+        if request.incremental:
+            logger.info("Client disconnected, cancelling scrape")
+            cancel_event.set()
+        search.cancel()
+
+    # Wait for the first job, so a full queue or a paused scraper is still an HTTP error
+    try:
+        first = await events.get()
+    except asyncio.CancelledError:
+        stop_search()
+        raise
+    if first is None and not search.cancelled() and search.exception() is not None:
+        e = search.exception()
+        if isinstance(e, (ScrapeQueueFull, CircuitOpen)):
+            logger.warning(f"Rejecting job search request: {str(e)}")
+            JOB_SEARCH_REQUESTS.labels(endpoint="stream", outcome="rejected").inc()
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    streamed = set()
+    clusters = {}
+
+    async def job_events(jobs):
+        # The auto engine may re-send jobs if it falls back mid-scrape
+        fresh = []
+        for job in jobs:
+            if job["id"] not in streamed:
+                streamed.add(job["id"])
+                fresh.append(dict(job))
+        # Jobs parsed together are clustered in one batch
+        unclustered = [job for job in fresh if "clusterId" not in job]
+        if unclustered:
+            await asyncio.to_thread(deduper.annotate, unclustered)
+        clusters.update((job["id"], job.get("clusterId")) for job in fresh)
+        return [format_stream_event("job", {"job": job}, format) for job in fresh]
+
+    def summary(jobs, cache_status):
+        data = {
+            "total_results": len(jobs),
+            "search_time": (datetime.now() - start_time).total_seconds(),
+            "query": request.query,
+            "location": request.location,
+            "cache": cache_status,
+            "clusters": {job["id"]: clusters.get(job["id"]) for job in jobs}
+        }
+        # Only when this request ran the scrape, as on /jobs/
+        if request.include_timings and timer is not None:
+            data["timings"] = timer.summary()
+            if queue_time is not None:
+                data["timings"]["queue_seconds"] = round(queue_time, 3)
+        return format_stream_event("summary", data, format)
+
+    async def scrape_events():
+        try:
+            pending = [first]
+            while True:
+                while not events.empty():
+                    pending.append(events.get_nowait())
+                finished = None in pending
+                if finished:
+                    pending = pending[:pending.index(None)]
+                for event in await job_events(pending):
+                    yield event
+                if finished:
+                    break
+                pending = [await events.get()]
+
+            try:
+                jobs, cache_status = search.result()
+            except Exception as e:
+                logger.error(f"Error during job scraping: {str(e)}")
+                JOB_SEARCH_REQUESTS.labels(endpoint="stream", outcome="error").inc()
+                yield format_stream_event("error", {"detail": f"Failed to fetch jobs: {str(e)}"}, format)
+                return
+            # Cached jobs, and jobs from a scrape another request started, come all at once
+            for event in await job_events(jobs):
+                yield event
+            JOB_SEARCH_REQUESTS.labels(endpoint="stream", outcome="success").inc()
+            JOB_SEARCH_SECONDS.labels(endpoint="stream").observe((datetime.now() - start_time).total_seconds())
+            yield summary(jobs, cache_status)
+        finally:
+            # Runs when the client disconnects too
+            stop_search()
+
+    return StreamingResponse(scrape_events(), media_type=media_type)
+
+@app.get("/jobs/search", response_model=IndexSearchResponse)
+def search_stored_jobs(q: Optional[str] = None, location: Optional[str] = None, limit: int = 20,
+                       cursor: Optional[str] = None):
+    """Ranked full-text search over every job scraped so far, without contacting LinkedIn"""
+    if not 1 <= limit <= INDEX_SEARCH_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {INDEX_SEARCH_MAX_LIMIT}")
+    start_time = datetime.now()
+    try:
+        jobs, total, next_cursor = job_store.search(q, location, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    search_time = (datetime.now() - start_time).total_seconds()
+    JOB_SEARCH_REQUESTS.labels(endpoint="index", outcome="success").inc()
+    JOB_SEARCH_SECONDS.labels(endpoint="index").observe(search_time)
+    return IndexSearchResponse(
+        jobs=jobs,
+        total_results=total,
+        next_cursor=next_cursor,
+        search_time=search_time,
+        query=q,
+        location=location
+    )
+
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+def health_check():
+    """Pool, queue, cache, rate limiter and job store stats.
+
+    A plain def, so the SQLite counts run on the threadpool instead of the event loop.
+    """
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "driver_pool": driver_pool.stats(),
+        "scrape_queue": scrape_executor.stats(),
+        "result_cache": result_cache.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "job_store": job_store.stats()
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """200 once the driver pool has warmed up, 503 before that.
+
+    A failed warm-up only makes the server unready when Selenium is the
+    default engine; otherwise searches can still use the HTTP engine.
+    """
+    warmed_up = driver_pool.warmed_up.is_set()
+    browser_ok = warmed_up and driver_pool.warmup_error is None
+    ready = warmed_up and (browser_ok or SCRAPE_ENGINE != "selenium")
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "driver_pool": "warming_up" if not warmed_up else "ready" if browser_ok else "unavailable",
+            "warmup_error": driver_pool.warmup_error,
+        }
+    )
+
+@app.get("/admin/browsers")
+async def browser_stats():
+    """Every pooled browser's age, page loads and memory, plus recycling and reaping counts"""
+    return await asyncio.to_thread(driver_pool.browser_stats)
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint: phase histograms, scrape event counters and queue/pool gauges"""
+    return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
 
 if __name__ == "__main__":
+    # Only launches uvicorn; each worker builds its own app with create_app()
     import uvicorn
-    logger.info("Starting the server...")
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info") 
\ No newline at end of file
+    if SERVER_WORKERS > 1:
+        # Read by each worker as it imports the modules that use them
+        backend_dir = os.path.dirname(os.path.abspath(__file__))
+        os.environ.setdefault("RESULT_CACHE_PATH", os.path.join(backend_dir, "result_cache.db"))
+        os.environ.setdefault("CIRCUIT_STATE_PATH", os.environ["RESULT_CACHE_PATH"])
+        os.environ.setdefault("BROWSER_SLOTS", str(DRIVER_POOL_MAX_SIZE))
+        logger.info(
+            f"Starting the server with {SERVER_WORKERS} workers, sharing {os.environ['RESULT_CACHE_PATH']} "
+            f"and {os.environ['BROWSER_SLOTS']} browser slots..."
+        )
+        uvicorn.run("server:create_app", factory=True, host="0.0.0.0", port=8000, log_level="info",
+                    workers=SERVER_WORKERS)
+    else:
+        logger.info("Starting the server...")
+        uvicorn.run(create_app(), host="0.0.0.0", port=8000, log_level="info")
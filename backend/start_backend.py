@@ -1,10 +1,40 @@
 #!/usr/bin/env python3
+import hashlib
 import os
 import sys
 import subprocess
 import venv
 from pathlib import Path
 
+# Written into the venv after a successful install; a matching hash means
+# the venv is already up to date and the install can be skipped
+REQUIREMENTS_HASH_FILE = ".requirements-hash"
+
+def requirements_hash(backend_dir, python_path):
+    """Hash of requirements.txt and the version of the Python the venv runs.
+
+    Hashes the same bytes as start_server.sh, requirements.txt followed by
+    what `python -c 'import sys; print(sys.version)'` prints, so either
+    script recognises a venv the other installed.
+    """
+    digest = hashlib.sha256((backend_dir / "requirements.txt").read_bytes())
+    version = subprocess.run(
+        [str(python_path), "-c", "import sys; print(sys.version)"], capture_output=True, check=True
+    ).stdout
+    digest.update(version)
+    return digest.hexdigest()
+
+def venv_paths(venv_path):
+    if os.name == 'nt':  # Windows
+        return venv_path / "Scripts" / "pip.exe", venv_path / "Scripts" / "python.exe"
+    return venv_path / "bin" / "pip", venv_path / "bin" / "python"
+
+def venv_is_usable(python_path):
+    if not python_path.exists():
+        return False
+    result = subprocess.run([str(python_path), "-c", "import sys"], capture_output=True)
+    return result.returncode == 0
+
 def install_system_dependencies():
     """Install system dependencies if needed"""
     print("Checking system dependencies...")
@@ -46,50 +76,53 @@ def main():
         print("Or manually: sudo apt install -y chromium-browser xvfb")
         print("\nContinuing with server startup...\n")
     
+    pip_path, python_path = venv_paths(venv_path)
+    hash_path = venv_path / REQUIREMENTS_HASH_FILE
+    rebuild = "--rebuild-venv" in sys.argv[1:]
+
     # Remove existing venv if it's corrupted
-    if venv_path.exists():
+    if venv_path.exists() and (rebuild or not venv_is_usable(python_path)):
         print("Removing existing virtual environment...")
         import shutil
         shutil.rmtree(venv_path)
-    
-    # Create virtual environment
-    print("Creating virtual environment...")
-    try:
-        # Use python3 -m venv instead of venv.create() for better reliability
-        subprocess.run([sys.executable, "-m", "venv", str(venv_path)], check=True)
-        print("Virtual environment created successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error creating virtual environment: {e}")
-        sys.exit(1)
-    
-    # Get the pip and python paths
-    if os.name == 'nt':  # Windows
-        pip_path = venv_path / "Scripts" / "pip.exe"
-        python_path = venv_path / "Scripts" / "python.exe"
-    else:  # Unix/Linux
-        pip_path = venv_path / "bin" / "pip"
-        python_path = venv_path / "bin" / "python"
-    
-    # Ensure pip is available
-    print("Ensuring pip is available...")
-    try:
-        # Use ensurepip to install pip
-        subprocess.run([str(python_path), "-m", "ensurepip", "--upgrade"], 
-                      check=True, cwd=backend_dir)
-        print("Pip ensured successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error ensuring pip: {e}")
-        sys.exit(1)
-    
-    # Install requirements
-    print("Installing Python requirements...")
-    try:
-        subprocess.run([str(pip_path), "install", "-r", "requirements.txt"], 
-                      check=True, cwd=backend_dir)
-        print("Requirements installed successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error installing requirements: {e}")
-        sys.exit(1)
+
+    # A missing venv is created from this interpreter
+    wanted_hash = requirements_hash(backend_dir, python_path if venv_path.exists() else Path(sys.executable))
+    if hash_path.exists() and hash_path.read_text().strip() == wanted_hash:
+        print("✅ Virtual environment is up to date, skipping install.")
+    else:
+        if not venv_path.exists():
+            # Create virtual environment
+            print("Creating virtual environment...")
+            try:
+                # Use python3 -m venv instead of venv.create() for better reliability
+                subprocess.run([sys.executable, "-m", "venv", str(venv_path)], check=True)
+                print("Virtual environment created successfully.")
+            except subprocess.CalledProcessError as e:
+                print(f"Error creating virtual environment: {e}")
+                sys.exit(1)
+
+            # Ensure pip is available
+            print("Ensuring pip is available...")
+            try:
+                # Use ensurepip to install pip
+                subprocess.run([str(python_path), "-m", "ensurepip", "--upgrade"], 
+                              check=True, cwd=backend_dir)
+                print("Pip ensured successfully.")
+            except subprocess.CalledProcessError as e:
+                print(f"Error ensuring pip: {e}")
+                sys.exit(1)
+
+        # Install requirements
+        print("Installing Python requirements...")
+        try:
+            subprocess.run([str(pip_path), "install", "-r", "requirements.txt"], 
+                          check=True, cwd=backend_dir)
+            hash_path.write_text(wanted_hash)
+            print("Requirements installed successfully.")
+        except subprocess.CalledProcessError as e:
+            print(f"Error installing requirements: {e}")
+            sys.exit(1)
     
     # Start the server
     print("Starting FastAPI server on port 8000...")
@@ -34,12 +34,19 @@ fi
 echo "Activating virtual environment..."
 . venv/bin/activate
 
-# Install requirements
-echo "Installing Python requirements..."
-pip install -r requirements.txt
-if [ $? -ne 0 ]; then
-    echo "Error: Failed to install requirements."
-    exit 1
+# Install requirements, unless they haven't changed since the last install;
+# hashed the same way as requirements_hash() in start_backend.py
+REQUIREMENTS_HASH=$( (cat requirements.txt; python -c 'import sys; print(sys.version)') | sha256sum | cut -d' ' -f1)
+if [ -f "venv/.requirements-hash" ] && [ "$(cat venv/.requirements-hash)" = "$REQUIREMENTS_HASH" ]; then
+    echo "Virtual environment is up to date, skipping install."
+else
+    echo "Installing Python requirements..."
+    pip install -r requirements.txt
+    if [ $? -ne 0 ]; then
+        echo "Error: Failed to install requirements."
+        exit 1
+    fi
+    echo "$REQUIREMENTS_HASH" > venv/.requirements-hash
 fi
 
 # Check if Chrome/Chromium is installed
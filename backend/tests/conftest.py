@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer
+
+
+@pytest.fixture(scope="session")
+def fixture_server():
+    with FixtureServer() as server:
+        yield server
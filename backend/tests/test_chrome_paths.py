@@ -0,0 +1,25 @@
+import chrome_paths
+
+
+def test_cache_is_checked_per_executable(tmp_path, monkeypatch):
+    monkeypatch.setattr(chrome_paths, "CHROME_PATHS_CACHE", str(tmp_path / "chrome_paths.json"))
+    monkeypatch.setattr(chrome_paths, "SEARCH_LOCATIONS", {
+        "chrome_binary": ([str(tmp_path / "chrome")], []),
+        "chromedriver": ([str(tmp_path / "chromedriver")], []),
+    })
+    chrome = tmp_path / "chrome"
+    chrome.write_text("chrome")
+    chrome_paths._save({
+        "chrome_binary": str(chrome),
+        "chrome_binary_signature": chrome_paths._file_signature(str(chrome)),
+        "chromedriver": None,
+        "chromedriver_signature": None,
+    })
+    # A missing driver stays missing without searching again
+    assert chrome_paths._load_cached()["chromedriver"] is None
+
+    (tmp_path / "chromedriver").write_text("driver")
+    assert chrome_paths._load_cached() is None
+    (tmp_path / "chromedriver").unlink()
+    chrome.write_text("upgraded chrome")
+    assert chrome_paths._load_cached() is None
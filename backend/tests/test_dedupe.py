@@ -0,0 +1,66 @@
+import pytest
+
+from dedupe import NUMPY_AVAILABLE, JobDeduper, job_features, normalize_title
+from job_store import JobStore
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="near-duplicate detection needs numpy")
+
+
+def make_job(job_id, title, company, description=None):
+    return {
+        "title": title,
+        "company": company,
+        "location": "Remote",
+        "description": description or "Click the link to view full job description on LinkedIn",
+        "postedDate": "2024-06-01",
+        "url": f"https://www.linkedin.com/jobs/view/{job_id}",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def test_title_normalization():
+    assert normalize_title("Sr. Python Dev (Remote) - m/w/d") == "senior python developer"
+    assert job_features(make_job(1, "Sr Python Dev", "Acme Inc.")) == job_features(make_job(2, "Senior Python Developer", "acme"))
+
+
+def test_reposts_join_one_cluster(store):
+    deduper = JobDeduper(store)
+    jobs = [
+        make_job(1, "Senior Python Developer", "Acme Inc"),
+        make_job(2, "Sr. Python Developer (Remote)", "ACME"),
+        make_job(3, "Senior Python Developer", "Globex Corporation"),
+        make_job(4, "Marketing Manager", "Acme Inc"),
+    ]
+    store.save_jobs(jobs)
+    clusters = deduper.assign_clusters(jobs)
+    assert clusters["1"] == clusters["2"] == "1"
+    assert clusters["3"] == "3"
+    assert clusters["4"] == "4"
+
+    # A later batch joins the stored cluster, and stored assignments are kept
+    repost = make_job(5, "Senior Python Developer - Hybrid", "Acme")
+    store.save_jobs([repost])
+    assert deduper.assign_clusters([repost, jobs[0]]) == {"5": "1", "1": "1"}
+    assert store.stats()["clusters"] == 3
+
+
+def test_clusters_survive_a_new_deduper(store):
+    jobs = [make_job(1, "Data Engineer", "Initech"), make_job(2, "Data Engineer", "Initech LLC")]
+    store.save_jobs(jobs)
+    JobDeduper(store).assign_clusters(jobs)
+    assert JobDeduper(store).assign_clusters(jobs) == {"1": "1", "2": "1"}
+
+
+def test_annotate_and_backfill(store):
+    jobs = [make_job(i, "Site Reliability Engineer", "Umbrella") for i in range(1, 4)]
+    store.save_jobs(jobs)
+    deduper = JobDeduper(store)
+    assert deduper.backfill(batch_size=2) == 3
+    annotated = deduper.annotate([dict(job) for job in jobs])
+    assert {job["clusterId"] for job in annotated} == {"1"}
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from browser_lifecycle import ProcessRegistry
+from driver_pool import DriverPool, DriverPoolTimeout
+
+
+class FakeDriver:
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.current_window_handle = "main"
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+class DriverFactory:
+    """Starts fake browsers slowly, so concurrent acquires overlap, tracking how many are live"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.started = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(0.05)
+        if self.fail:
+            raise RuntimeError("Chrome failed to start")
+        with self._lock:
+            self.started += 1
+        return FakeDriver()
+
+
+def make_pool(tmp_path, factory, min_size=0, max_size=2):
+    pool = DriverPool(min_size=min_size, max_size=max_size, acquire_timeout=5, driver_factory=factory)
+    pool.registry = ProcessRegistry(str(tmp_path))
+    return pool
+
+
+def run_concurrently(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_acquires_never_exceed_max_size(tmp_path):
+    factory = DriverFactory()
+    pool = make_pool(tmp_path, factory)
+    leased = []
+    timed_out = []
+
+    def lease():
+        try:
+            leased.append(pool.acquire(timeout=0.2))
+        except DriverPoolTimeout:
+            timed_out.append(True)
+
+    run_concurrently(lease, 6)
+    # Only two get a browser; the rest time out
+    assert factory.started == 2
+    assert len(leased) == 2
+    assert len(timed_out) == 4
+    assert pool._size == 2
+
+
+def test_failed_start_gives_the_slot_back(tmp_path):
+    pool = make_pool(tmp_path, DriverFactory(fail=True), max_size=1)
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=1)
+    assert pool._size == 0
+
+    pool.driver_factory = DriverFactory()
+    session = pool.acquire(timeout=1)
+    assert pool._size == 1
+    pool.release(session)
+
+
+def test_warm_up_and_acquires_share_max_size(tmp_path, monkeypatch):
+    monkeypatch.setattr("driver_pool.start_virtual_display", lambda: None)
+    factory = DriverFactory()
+    pool = make_pool(tmp_path, factory, min_size=2, max_size=2)
+    leased = []
+
+    def lease():
+        leased.append(pool.acquire(timeout=2))
+
+    threads = [threading.Thread(target=pool.start)] + [threading.Thread(target=lease) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert factory.started == 2
+    assert pool._size == 2
+    for session in leased:
+        pool.release(session)
+    pool.close()
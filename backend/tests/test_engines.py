@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from engines import FallbackEngine, ScrapeEngine
+from rate_limiter import AdaptiveRateLimiter, CircuitBreaker, ScrapeBlocked
+from scraper import wait_for_request_slot
+from timing import RunTimer
+
+
+class BlockedEngine(ScrapeEngine):
+    """Gets turned away by LinkedIn on every search"""
+
+    def __init__(self, name, rate_limiter, signal="empty_page"):
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.signal = signal
+        self.calls = 0
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        self.calls += 1
+        self.rate_limiter.record_block(self.signal)
+        if self.signal == "empty_page":
+            return []
+        raise ScrapeBlocked(self.signal)
+
+
+class NoResultsEngine(ScrapeEngine):
+    name = "no_results"
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        timer.count("no_results_page")
+        return []
+
+
+class RequestingEngine(ScrapeEngine):
+    """Takes a request slot, then fails with an ordinary error or returns a job"""
+
+    def __init__(self, name, rate_limiter, error=None):
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.error = error
+
+    def scrape_jobs(self, search_query, location=None, num_jobs=8, known_job_ids=None,
+                    on_job=None, cancel_event=None, timer=None):
+        wait_for_request_slot(self.rate_limiter, timer, cancel_event)
+        if self.error:
+            raise self.error
+        return [{"id": "1"}]
+
+
+def limiter():
+    return AdaptiveRateLimiter(breaker=CircuitBreaker(failure_threshold=2))
+
+
+def test_fallback_counts_one_block_signal_per_search():
+    rate_limiter = limiter()
+    primary = BlockedEngine("primary", rate_limiter, signal="rate_limited")
+    fallback = BlockedEngine("fallback", rate_limiter)
+    engine = FallbackEngine(primary, fallback, rate_limiter)
+
+    assert engine.scrape_jobs("python developer") == []
+    assert fallback.calls == 1
+    assert rate_limiter.blocks == {"rate_limited": 1}
+    assert rate_limiter.breaker.state == "closed"
+
+    # The next search is counted again
+    engine.scrape_jobs("python developer")
+    assert rate_limiter.breaker.state == "open"
+
+
+def test_no_fallback_when_search_matched_nothing():
+    rate_limiter = limiter()
+    fallback = BlockedEngine("fallback", rate_limiter)
+    engine = FallbackEngine(NoResultsEngine(), fallback, rate_limiter)
+
+    assert engine.scrape_jobs("no such job") == []
+    assert fallback.calls == 0
+    assert rate_limiter.blocks == {}
+
+
+@pytest.mark.parametrize("timer", [RunTimer(), None])
+def test_fallback_shares_the_primarys_probe(timer):
+    rate_limiter = AdaptiveRateLimiter(
+        rate=100, max_rate=100, breaker=CircuitBreaker(failure_threshold=1, open_seconds=0.01)
+    )
+    rate_limiter.record_block("rate_limited")
+    time.sleep(0.02)
+    primary = RequestingEngine("primary", rate_limiter, error=RuntimeError("connection reset"))
+    engine = FallbackEngine(primary, RequestingEngine("fallback", rate_limiter), rate_limiter)
+
+    # The primary takes the probe and fails without a block signal; the fallback still goes out
+    assert engine.scrape_jobs("python developer", timer=timer) == [{"id": "1"}]
@@ -0,0 +1,106 @@
+import pytest
+import requests
+
+from http_scraper import LinkedInHttpScraper, parse_job_cards
+from fixture_server import FIXTURES_DIR
+from rate_limiter import AdaptiveRateLimiter
+from scraper import NoResultsPage, parse_job_id
+
+# Jobs LinkedIn shows again at the top of the next page
+REPEATED_JOB_IDS = {"3979947451", "3979906657", "3979849241"}
+
+
+def read_fixture(name):
+    with open(f"{FIXTURES_DIR}/{name}", encoding="utf-8") as f:
+        return f.read()
+
+
+def make_scraper(server, **kwargs):
+    limiter = AdaptiveRateLimiter(rate=100, max_rate=100, burst=10)
+    return LinkedInHttpScraper(
+        session=requests.Session(), pacing="fast", base_url=server.base_url, rate_limiter=limiter, **kwargs
+    )
+
+
+def test_parses_search_page_cards():
+    records = parse_job_cards(read_fixture("search_page_1.html"), "https://www.linkedin.com/jobs/search")
+    assert len(records) == 25
+    assert records[0] == {
+        "title": "Backend Engineer (Python)",
+        "company": "Wayne Enterprises",
+        "location": "Remote",
+        "url": "https://www.linkedin.com/jobs/view/backend-engineer-python-at-wayne-enterprises-3979998673"
+               "?position=1&pageNum=0&refId=fixture&trackingId=fixture",
+        "linkFallback": False,
+    }
+    assert all(record["title"] and record["url"] for record in records)
+
+
+def test_fragment_cards_match_the_full_page():
+    page_url = "https://www.linkedin.com/jobs/search"
+    for page in range(1, 5):
+        assert parse_job_cards(read_fixture(f"search_fragment_{page}.html"), page_url) == \
+            parse_job_cards(read_fixture(f"search_page_{page}.html"), page_url)
+
+
+def test_card_fallbacks_and_relative_links():
+    html = """
+    <ul>
+      <li><div class="base-card">
+        <h3 class="base-search-card__title">  Data
+           Engineer </h3>
+        <a href="/jobs/view/data-engineer-123">View</a>
+      </div></li>
+    </ul>
+    """
+    [record] = parse_job_cards(html, "https://www.linkedin.com/jobs/search?keywords=data")
+    assert record["title"] == "Data Engineer"
+    assert record["company"] is None
+    assert record["url"] == "https://www.linkedin.com/jobs/view/data-engineer-123"
+    assert record["linkFallback"] is True
+
+
+def test_empty_pages():
+    assert parse_job_cards("", "https://www.linkedin.com/jobs/search") == []
+    no_results = parse_job_cards(read_fixture("search_empty.html"), "https://www.linkedin.com/jobs/search")
+    assert no_results == [] and isinstance(no_results, NoResultsPage)
+    assert not isinstance(parse_job_cards("<html><body>Please sign in</body></html>", "https://x"), NoResultsPage)
+
+
+@pytest.mark.parametrize("pagination", ["page", "fragment"])
+def test_fetches_later_pages(fixture_server, pagination):
+    scraper = make_scraper(fixture_server, pagination=pagination, page_parallelism=1)
+    served = fixture_server.requests_served
+    jobs = scraper.scrape_jobs("python developer", "Remote", num_jobs=40)
+
+    assert len(jobs) == 40
+    assert fixture_server.requests_served - served == 2
+    assert scraper.run_stats["pages"] == 2
+    # The guest pages' usual cards aren't a selector fallback
+    assert "card_selector_fallback" not in scraper.run_stats["counters"]
+    first_page = [parse_job_id(record["url"]) for record in
+                  parse_job_cards(read_fixture("search_page_1.html"), fixture_server.base_url)]
+    assert [job["id"] for job in jobs[:25]] == first_page
+
+
+@pytest.mark.parametrize("page_parallelism", [1, 3])
+def test_dedupes_jobs_repeated_across_pages(fixture_server, page_parallelism):
+    scraper = make_scraper(fixture_server, pagination="fragment", page_parallelism=page_parallelism)
+    jobs = scraper.scrape_jobs("python developer", "Remote", num_jobs=200)
+
+    ids = [job["id"] for job in jobs]
+    # 4 pages of 25 with 3 repeats, then empty pages end the scrape
+    assert len(ids) == 97
+    assert len(set(ids)) == 97
+    assert REPEATED_JOB_IDS <= set(ids)
+
+
+def test_incremental_scrape_stops_at_known_jobs(fixture_server):
+    page_two = parse_job_cards(read_fixture("search_page_2.html"), fixture_server.base_url)
+    known = {parse_job_id(page_two[10]["url"])}
+    scraper = make_scraper(fixture_server, page_parallelism=1)
+    jobs = scraper.scrape_jobs("python developer", "Remote", num_jobs=100, known_job_ids=known)
+
+    assert scraper.run_stats["pages"] == 2
+    assert known.isdisjoint(job["id"] for job in jobs)
+    assert len(jobs) == 48  # Page one, then page two apart from the known job and a repeat
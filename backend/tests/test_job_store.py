@@ -0,0 +1,82 @@
+import pytest
+
+from job_store import JobStore
+
+
+def make_job(job_id, title, company="Acme", location="Remote"):
+    return {
+        "title": title,
+        "company": company,
+        "location": location,
+        "description": "Click the link to view full job description on LinkedIn",
+        "postedDate": "2024-06-01",
+        "url": f"https://www.linkedin.com/jobs/view/{job_id}",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def all_pages(store, keywords=None, location=None, limit=3):
+    pages = []
+    cursor = None
+    while True:
+        jobs, total, cursor = store.search(keywords, location, limit=limit, cursor=cursor)
+        pages.append(jobs)
+        if cursor is None:
+            return pages, total
+
+
+def test_search_cursors_walk_every_match_once(store):
+    store.save_jobs([make_job(1000 + i, f"Python Developer {i}") for i in range(10)])
+    store.save_jobs([make_job(2000 + i, f"Java Developer {i}") for i in range(4)])
+
+    pages, total = all_pages(store, "python")
+    ids = [job["id"] for page in pages for job in page]
+    assert total == 10
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert sorted(ids) == [str(1000 + i) for i in range(10)]
+
+    # Same order as one big page
+    everything, _, cursor = store.search("python", limit=50)
+    assert [job["id"] for job in everything] == ids
+    assert cursor is None
+
+
+def test_search_without_keywords_is_newest_first(store):
+    store.save_jobs([make_job(1, "Old Role")])
+    store.save_jobs([make_job(2, "New Role")])
+    jobs, total, _ = store.search()
+    assert total == 2
+    assert [job["id"] for job in jobs] == ["2", "1"]
+
+
+def test_search_filters_by_location(store):
+    store.save_jobs([make_job(1, "Python Developer", location="Berlin, Germany"),
+                     make_job(2, "Python Developer", location="Remote")])
+    jobs, total, cursor = store.search("python", "berlin")
+    assert [job["id"] for job in jobs] == ["1"]
+    assert total == 1 and cursor is None
+
+
+def test_exact_page_boundary_has_no_next_cursor(store):
+    store.save_jobs([make_job(i, f"Python Developer {i}") for i in range(1, 7)])
+    pages, _ = all_pages(store, "python", limit=3)
+    assert [len(page) for page in pages] == [3, 3]
+
+
+def test_saved_search_results(store):
+    new_ids = store.save_jobs([make_job(1, "Python Developer"), make_job(2, "Data Engineer")], "Python", "Remote")
+    assert new_ids == ["1", "2"]
+    assert store.save_jobs([make_job(1, "Python Developer")], "python", "remote") == []
+    assert store.known_job_ids(" PYTHON ", "Remote") == {"1", "2"}
+    assert {job["id"] for job in store.get_search_results("python", "remote")} == {"1", "2"}
+
+
+def test_lsh_candidates_are_the_highest_job_ids(store):
+    store.save_clusters([(job_id, job_id, b"", False, [7]) for job_id in ("998", "999", "1000", "1001")])
+    assert set(store.get_lsh_candidates([7], 2)[7]) == {"1001", "1000"}
@@ -0,0 +1,137 @@
+import os
+import shutil
+import time
+
+import pytest
+import requests
+
+from fixture_server import FIXTURES_DIR, FixtureServer
+from http_scraper import LinkedInHttpScraper
+from rate_limiter import AdaptiveRateLimiter, CircuitBreaker, CircuitOpen, SharedCircuitBreaker
+
+
+def open_breaker(limiter):
+    for _ in range(limiter.breaker.failure_threshold):
+        limiter.record_block("rate_limited")
+    assert limiter.breaker.state == "open"
+
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=0.05)
+    breaker.record_block()
+    breaker.before_request()
+    breaker.record_block()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        breaker.before_request()
+
+    time.sleep(0.06)
+    probe = object()
+    breaker.before_request(probe)
+    assert breaker.state == "half_open"
+    # The probing scrape's other pages go out, anyone else waits for the verdict
+    breaker.before_request(probe)
+    with pytest.raises(CircuitOpen):
+        breaker.before_request(object())
+    with pytest.raises(CircuitOpen):
+        breaker.raise_if_open()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_request(object())
+
+
+def test_blocked_probe_doubles_the_pause():
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=0.05, max_open_seconds=1)
+    breaker.record_block()
+    time.sleep(0.06)
+    breaker.before_request()
+    breaker.record_block()
+    assert breaker.state == "open"
+    assert breaker.pause == pytest.approx(0.1)
+    assert breaker.retry_after() > 0.05
+
+
+def test_abandoned_probe_times_out():
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=0.01, probe_timeout=0.05)
+    breaker.record_block()
+    time.sleep(0.02)
+    breaker.before_request(object())
+    with pytest.raises(CircuitOpen):
+        breaker.before_request(object())
+    time.sleep(0.06)
+    breaker.before_request(object())
+
+
+def test_shared_breaker_pauses_every_worker(tmp_path):
+    # Two breakers on one file stand in for two server workers
+    path = str(tmp_path / "circuit.db")
+    first = SharedCircuitBreaker(path, failure_threshold=2, open_seconds=0.05)
+    second = SharedCircuitBreaker(path, failure_threshold=2, open_seconds=0.05)
+    first.record_block()
+    second.record_block()
+    with pytest.raises(CircuitOpen):
+        first.before_request()
+    assert second.stats()["state"] == "open"
+
+    time.sleep(0.06)
+    probe = object()
+    first.before_request(probe)
+    first.before_request(probe)
+    with pytest.raises(CircuitOpen):
+        second.before_request(object())
+
+    first.record_success()
+    second.before_request(object())
+    assert second.stats() == {"state": "closed", "consecutive_blocks": 0, "retry_after": 0.0}
+
+
+def test_limiter_adapts_rate():
+    limiter = AdaptiveRateLimiter(rate=2, min_rate=0.5, max_rate=3, step=0.5, backoff=0.5)
+    limiter.record_success()
+    assert limiter.rate == 2.5
+    limiter.record_block("authwall")
+    assert limiter.rate == 1.25
+    assert limiter.blocks == {"authwall": 1}
+
+
+@pytest.mark.parametrize("pagination", ["page", "fragment"])
+def test_multi_page_scrape_closes_half_open_circuit(fixture_server, pagination):
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=0.05)
+    limiter = AdaptiveRateLimiter(rate=100, max_rate=100, burst=10, breaker=breaker)
+    open_breaker(limiter)
+    time.sleep(0.06)
+
+    # Four pages reserved in one batch: the probe is the whole first batch
+    scraper = LinkedInHttpScraper(
+        session=requests.Session(), pacing="fast", page_parallelism=4,
+        base_url=fixture_server.base_url, rate_limiter=limiter, pagination=pagination
+    )
+    jobs = scraper.scrape_jobs("python developer", "Remote", num_jobs=75)
+
+    assert len(jobs) == 75
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_one_block_signal_per_search():
+    limiter = AdaptiveRateLimiter(breaker=CircuitBreaker(failure_threshold=2))
+    with limiter.search():
+        limiter.record_block("empty_page")
+        limiter.record_block("empty_page")
+    assert limiter.blocks == {"empty_page": 1}
+    assert limiter.breaker.failures == 1
+
+
+def test_zero_result_search_is_not_a_block(tmp_path):
+    # Only the empty results page, so every search matches nothing
+    shutil.copy(os.path.join(FIXTURES_DIR, "search_empty.html"), tmp_path)
+    limiter = AdaptiveRateLimiter(rate=100, max_rate=100, breaker=CircuitBreaker(failure_threshold=1))
+    with FixtureServer(fixtures_dir=str(tmp_path)) as server:
+        scraper = LinkedInHttpScraper(
+            session=requests.Session(), pacing="fast", base_url=server.base_url, rate_limiter=limiter
+        )
+        assert scraper.scrape_jobs("no such job", num_jobs=10) == []
+    assert limiter.blocks == {}
+    assert limiter.breaker.state == "closed"
+    assert scraper.run_stats["counters"]["no_results_page"] >= 1
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+
+from result_cache import ResultCache, SharedResultCache
+
+
+def jobs(count, tag="job"):
+    return [{"id": f"{tag}-{i}"} for i in range(count)]
+
+
+class Loader:
+    """Scrapes made-up jobs, finishing when the test releases them"""
+
+    def __init__(self, tag="job"):
+        self.tag = tag
+        self.calls = []
+        self.gates = {}
+
+    async def __call__(self, num_jobs):
+        self.calls.append(num_jobs)
+        gate = self.gates.get(num_jobs)
+        if gate is not None:
+            await gate.wait()
+        return jobs(num_jobs, self.tag)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_miss_then_hit_and_smaller_requests_are_covered():
+    async def scenario():
+        cache = ResultCache(ttl=60, stale_ttl=60)
+        loader = Loader()
+        assert await cache.get_or_load("Python", "Remote", 10, loader) == (jobs(10), "miss")
+        assert await cache.get_or_load(" python ", "remote", 5, loader) == (jobs(5), "hit")
+        assert (await cache.get_or_load("python", "remote", 20, loader))[1] == "miss"
+        assert loader.calls == [10, 20]
+    run(scenario())
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache = ResultCache()
+        loader = Loader()
+        loader.gates[10] = asyncio.Event()
+        requests = [asyncio.ensure_future(cache.get_or_load("python", None, 10, loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        loader.gates[10].set()
+        statuses = sorted(status for _, status in await asyncio.gather(*requests))
+        assert statuses == ["coalesced", "coalesced", "miss"]
+        assert loader.calls == [10]
+    run(scenario())
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    async def scenario():
+        cache = ResultCache(ttl=0.05, stale_ttl=60)
+        await cache.get_or_load("python", None, 10, Loader("old"))
+        time.sleep(0.06)
+
+        loader = Loader("new")
+        loader.gates[10] = asyncio.Event()
+        assert await cache.get_or_load("python", None, 5, loader) == (jobs(5, "old"), "stale")
+        assert await cache.get_or_load("python", None, 10, loader) == (jobs(10, "old"), "stale")
+        await asyncio.sleep(0)
+        # The refresh scrapes as many jobs as the entry had, once
+        assert loader.calls == [10]
+
+        loader.gates[10].set()
+        await asyncio.sleep(0.01)
+        assert await cache.get_or_load("python", None, 10, loader) == (jobs(10, "new"), "hit")
+    run(scenario())
+
+
+def test_expired_entry_is_reloaded():
+    async def scenario():
+        cache = ResultCache(ttl=0.01, stale_ttl=0.01)
+        loader = Loader()
+        await cache.get_or_load("python", None, 10, loader)
+        time.sleep(0.03)
+        assert (await cache.get_or_load("python", None, 10, loader))[1] == "miss"
+        assert cache.peek("python", None, 10) == jobs(10)
+    run(scenario())
+
+
+def test_late_smaller_load_keeps_the_bigger_result():
+    async def scenario():
+        cache = ResultCache()
+        loader = Loader()
+        loader.gates[5] = asyncio.Event()
+        small = asyncio.ensure_future(cache.get_or_load("python", None, 5, loader))
+        await asyncio.sleep(0)
+        # Too big to share the small load, so it starts its own and finishes first
+        assert (await cache.get_or_load("python", None, 25, loader))[1] == "miss"
+        loader.gates[5].set()
+        assert await small == (jobs(5), "miss")
+        assert cache.get("python", None, 25) == jobs(25)
+    run(scenario())
+
+
+def test_empty_results_are_not_cached():
+    async def scenario():
+        cache = ResultCache()
+
+        async def blocked(num_jobs):
+            return []
+
+        await cache.get_or_load("python", None, 10, blocked)
+        assert cache.peek("python", None, 1) is None
+    run(scenario())
+
+
+def test_shared_cache_coalesces_and_refreshes(tmp_path):
+    async def scenario():
+        cache = SharedResultCache(str(tmp_path / "cache.db"), ttl=0.05, stale_ttl=60)
+        loader = Loader("old")
+        loader.gates[10] = asyncio.Event()
+        requests = [asyncio.ensure_future(cache.get_or_load("python", None, 10, loader)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        loader.gates[10].set()
+        statuses = sorted(status for _, status in await asyncio.gather(*requests))
+        assert statuses == ["coalesced", "coalesced", "miss"]
+        assert loader.calls == [10]
+
+        await asyncio.sleep(0.06)
+        refresh = Loader("new")
+        assert await cache.get_or_load("python", None, 10, refresh) == (jobs(10, "old"), "stale")
+        assert (await cache.get_or_load("python", None, 10, refresh))[1] == "stale"
+        await asyncio.sleep(0.05)
+        assert refresh.calls == [10]
+        assert cache.peek("python", None, 10) == jobs(10, "new")
+        assert cache.stats()["leases"] == 0
+    run(scenario())
+
+
+def test_shared_cache_keeps_the_bigger_result(tmp_path):
+    async def scenario():
+        cache = SharedResultCache(str(tmp_path / "cache.db"))
+        loader = Loader()
+        loader.gates[5] = asyncio.Event()
+        small = asyncio.ensure_future(cache.get_or_load("python", None, 5, loader))
+        await asyncio.sleep(0.05)
+        assert (await cache.get_or_load("python", None, 25, loader))[1] == "miss"
+        loader.gates[5].set()
+        await small
+        assert cache.get("python", None, 25) == jobs(25)
+    run(scenario())
+
+
+def test_bigger_load_takes_over_this_workers_lease(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "cache.db")
+        cache = SharedResultCache(path)
+        other_worker = SharedResultCache(path)
+        loader = Loader()
+        loader.gates[5] = asyncio.Event()
+        loader.gates[25] = asyncio.Event()
+        small = asyncio.ensure_future(cache.get_or_load("python", None, 5, loader))
+        await asyncio.sleep(0.05)
+        big = asyncio.ensure_future(cache.get_or_load("python", None, 25, loader))
+        await asyncio.sleep(0.05)
+        loader.gates[5].set()
+        await small
+
+        # The small load is done, but the lease stays with the big one
+        other_loader = Loader("other")
+        waiting = asyncio.ensure_future(other_worker.get_or_load("python", None, 25, other_loader))
+        await asyncio.sleep(0.05)
+        loader.gates[25].set()
+        assert await big == (jobs(25), "miss")
+        assert await waiting == (jobs(25), "coalesced")
+        assert other_loader.calls == []
+        assert cache.stats()["leases"] == 0
+    run(scenario())
+
+
+def test_shared_cache_does_not_block_the_event_loop(tmp_path):
+    async def scenario():
+        cache = SharedResultCache(str(tmp_path / "cache.db"))
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        # Another thread holds the connection, as a slow write would
+        cache._lock.acquire()
+        threading.Timer(0.3, cache._lock.release).start()
+        assert (await cache.get_or_load("python", None, 10, Loader()))[1] == "miss"
+        ticking.cancel()
+        assert ticks >= 10
+    run(scenario())
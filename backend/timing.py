@@ -0,0 +1,77 @@
+import time
+from contextlib import contextmanager
+
+
+class RunTimer:
+    """Per-scrape timing: waiting (sleeps, readiness waits) versus working,
+    per-page latency and bytes, named phases and event counters"""
+
+    def __init__(self, owner=None):
+        self.started_at = time.monotonic()
+        # Who the circuit breaker sees making this run's requests; attempts
+        # at the same search share one so they share the half-open probe
+        self.owner = owner or self
+        self.wait_seconds = 0.0
+        self.page_seconds = []
+        self.page_bytes = []
+        self.phases = {}
+        self.counters = {}
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+            self.wait_seconds += seconds
+
+    def add_wait(self, seconds):
+        self.wait_seconds += seconds
+
+    def record_page(self, seconds):
+        """Time from requesting a result page to having its cards parsed"""
+        self.page_seconds.append(seconds)
+
+    def record_bytes(self, num_bytes):
+        """Bytes downloaded for one result page, including its subresources"""
+        self.page_bytes.append(num_bytes)
+
+    def add_phase(self, name, seconds):
+        self.phases.setdefault(name, []).append(seconds)
+
+    @contextmanager
+    def phase(self, name):
+        """Time one occurrence of a scrape phase, e.g. navigation or get_job_cards"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.monotonic() - started)
+
+    def count(self, name, amount=1):
+        if amount:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, other):
+        """Add another timer's waits, pages, phases and counters to this one"""
+        self.wait_seconds += other.wait_seconds
+        self.page_seconds.extend(other.page_seconds)
+        self.page_bytes.extend(other.page_bytes)
+        for name, durations in other.phases.items():
+            self.phases.setdefault(name, []).extend(durations)
+        for name, amount in other.counters.items():
+            self.count(name, amount)
+
+    def summary(self):
+        total = time.monotonic() - self.started_at
+        return {
+            "total_seconds": round(total, 3),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "work_seconds": round(max(total - self.wait_seconds, 0.0), 3),
+            "pages": len(self.page_seconds),
+            "page_seconds": [round(seconds, 4) for seconds in self.page_seconds],
+            "page_bytes": list(self.page_bytes),
+            "bytes_downloaded": sum(self.page_bytes),
+            "phases": {
+                name: {"count": len(durations), "seconds": round(sum(durations), 4)}
+                for name, durations in self.phases.items()
+            },
+            "counters": dict(self.counters),
+        }